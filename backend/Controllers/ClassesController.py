@@ -9,6 +9,7 @@ from Models.Users import Users
 from Utils.jwt_handler import verify_token
 from Schemas.subjectshcma import subjectschema
 from Models.Subjects import Subjects
+from Utils.cache import response_cache, invalidate_department_listings
 def add_class_to_department( 
     name:str =Form(...),
     capacity : int =Form(...),
@@ -59,6 +60,7 @@ def add_class_to_department(
     db.add(new_class)
     db.commit()
     db.refresh(new_class)
+    invalidate_department_listings(department_id)
     
     return{
         "msg":"class addded succesfully"
@@ -86,11 +88,15 @@ def fetch_classes(department_id: int,
     
     if not found_admin:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED,detail="dont come here")
+
+    cache_key = f"classes:department:{department_id}:administrative"
+    cached_classes = response_cache.get(cache_key)
+    if cached_classes is not None:
+        return cached_classes
     
     found_classes=db.query(Classes).filter(Classes.department_id==department_id).all()
-    print(found_classes)
     
-    return [
+    result = [
     {   
         "class_id":found_class.id,
         "name": found_class.name,
@@ -100,6 +106,8 @@ def fetch_classes(department_id: int,
     }
     for found_class in found_classes
 ]
+    response_cache.set(cache_key, result, tags=[f"department:{department_id}"])
+    return result
    
    
 def fetch_class_info(class_id: int,
@@ -133,8 +141,8 @@ def fetch_class_info(class_id: int,
     if not found_class:
         raise HTTPException(status_code=404, detail="class not found")
     
-    # Query users who have this class name
-    class_users = db.query(Users).filter(Users.class_name == found_class.name).all()
+    # Query users enrolled in this class
+    class_users = db.query(Users).filter(Users.class_id == found_class.id).all()
     
     return {
         "class_id": found_class.id,
@@ -178,11 +186,11 @@ def fetch_student_class(authorization: str | None = Header(None),db: Session = D
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    if not student.class_name:
+    if not student.class_id:
         raise HTTPException(status_code=404, detail="Student has no class assigned")
     
     # Get the class information
-    student_class = db.query(Classes).filter(Classes.name == student.class_name).first()
+    student_class = db.query(Classes).filter(Classes.id == student.class_id).first()
     if not student_class:
         raise HTTPException(status_code=404, detail="Class not found")
 
@@ -286,8 +294,8 @@ def fetch_class_info_pr(class_id: int,
     if not found_class:
         raise HTTPException(status_code=404, detail="class not found")
     
-    # Query users who have this class name
-    class_users = db.query(Users).filter(Users.class_name == found_class.name).all()
+    # Query users enrolled in this class
+    class_users = db.query(Users).filter(Users.class_id == found_class.id).all()
     
     return {
         "class_id": found_class.id,
@@ -330,11 +338,16 @@ def fetch_classes_dr(
     
     if not found_director:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED,detail="dont come here")
+
+    cache_key = "classes:all:director"
+    cached_classes = response_cache.get(cache_key)
+    if cached_classes is not None:
+        return cached_classes
     
     found_classes=db.query(Classes).filter(Classes.department_id==Department.id).all()
     
     
-    return [
+    result = [
     {   
         "class_id":found_class.id,
         "name": found_class.name,
@@ -344,6 +357,8 @@ def fetch_classes_dr(
     }
     for found_class in found_classes
 ]
+    response_cache.set(cache_key, result, tags=["department:all"])
+    return result
     
     
 def fetch_class_info_dir(class_id: int,
@@ -378,8 +393,8 @@ def fetch_class_info_dir(class_id: int,
     if not found_class:
         raise HTTPException(status_code=404, detail="class not found")
     
-    # Query users who have this class name
-    class_users = db.query(Users).filter(Users.class_name == found_class.name).all()
+    # Query users enrolled in this class
+    class_users = db.query(Users).filter(Users.class_id == found_class.id).all()
     
     return {
         "class_id": found_class.id,
@@ -399,6 +414,16 @@ def fetch_class_info_dir(class_id: int,
         ]
     }
     
+def get_class_students(found_class: Classes, db: Session):
+    """
+    Query for the students enrolled in a class (the roster used for roll calls)
+    """
+    return db.query(Users).filter(
+        Users.class_id == found_class.id,
+        Users.role == "student"
+    )
+
+
 def fetch_users_for_session(class_id: int,
                      authorization: str | None = Header(None),
                      db: Session = Depends(connect_databse)):
@@ -420,11 +445,7 @@ def fetch_users_for_session(class_id: int,
     if not found_class:
         raise HTTPException(status_code=404, detail="Class not found")
     
-    # Query students by class_name
-    students = db.query(Users).filter(
-        Users.class_name == found_class.name,
-        Users.role == "student"
-    ).all()
+    students = get_class_students(found_class, db).all()
     
     return [
             {
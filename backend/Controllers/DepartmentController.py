@@ -1,4 +1,4 @@
-from fastapi import Depends, File, Form, HTTPException, Header, Query, UploadFile,status
+from fastapi import Depends, File, Form, HTTPException, Header, Query, Response, UploadFile,status
 from Database.connection import connect_databse
 from sqlalchemy.orm import Session, joinedload
 from Models.Subjects import Subjects
@@ -6,6 +6,9 @@ from Models.Users import Users
 from Models.Department import Department
 from Schemas.subjectshcma import subjectschema
 from Utils.jwt_handler import verify_token
+from Utils.auth import invalidate_user
+from Utils.cache import response_cache
+from Utils.pagination import paginate_by_id
 from Utils.cloudinary_uploader import upload_user_profile_image
 from Schemas.director import directorcredentials
 from Utils.hasher import hash_password
@@ -270,7 +273,7 @@ def fetch_subjects_per_department(department_id:int,authorization: str | None =
         raise HTTPException(status_code=403, detail="Access denied")
     
     
-    found_subjects=db.query(Subjects).filter(Subjects.department_id==department_id).all()
+    found_subjects=db.query(Subjects.subject_name,Subjects.multiplier).filter(Subjects.department_id==department_id).all()
 
     return[
         {
@@ -349,7 +352,7 @@ def fetch_professors_students(authorization: str | None = Header(None), db: Sess
     
     
     
-def fetch_students_professors(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+def fetch_students_professors(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
     
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header missing")
@@ -369,7 +372,8 @@ def fetch_students_professors(authorization: str | None = Header(None), db: Sess
     if not found_user:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    students = db.query(Users).filter(Users.role == "student").all()
+    # user_id order, served by the (role, user_id) index
+    students = paginate_by_id(db.query(Users).filter(Users.role == "student"), Users.user_id, cursor, page_size, response)
 
     return [
         {
@@ -383,7 +387,7 @@ def fetch_students_professors(authorization: str | None = Header(None), db: Sess
         for std in students 
     ]
     
-def fetch_students_for_director(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+def fetch_students_for_director(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
     
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header missing")
@@ -403,7 +407,8 @@ def fetch_students_for_director(authorization: str | None = Header(None), db: Se
     if not found_user:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    students = db.query(Users).filter(Users.role == "student").all()
+    # user_id order, served by the (role, user_id) index
+    students = paginate_by_id(db.query(Users).filter(Users.role == "student"), Users.user_id, cursor, page_size, response)
 
     return [
         {
@@ -417,7 +422,7 @@ def fetch_students_for_director(authorization: str | None = Header(None), db: Se
         for std in students 
     ]
     
-def fetch_students_for_admin(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+def fetch_students_for_admin(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
     
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header missing")
@@ -437,7 +442,8 @@ def fetch_students_for_admin(authorization: str | None = Header(None), db: Sessi
     if not found_user:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    students = db.query(Users).filter(Users.role == "student").all()
+    # user_id order, served by the (role, user_id) index
+    students = paginate_by_id(db.query(Users).filter(Users.role == "student"), Users.user_id, cursor, page_size, response)
 
     return [
         {
@@ -478,6 +484,8 @@ def delete_department(department_id: int, authorization: str | None = Header(Non
     # Delete the department (cascade will handle related records)
     db.delete(department)
     db.commit()
+    # Its classes, rooms and their timetables go with it
+    response_cache.clear()
     
     return {"message": "Department deleted successfully"}
 
@@ -507,15 +515,26 @@ def fetch_subjects_for_director_and_admin(department_id: int, authorization: str
     if not found_user:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Fetch subjects with professor information
-    subjects = db.query(Subjects).filter(Subjects.department_id == department_id).all()
+    # Fetch subjects with their professor's name in one query
+    subjects = db.query(
+        Subjects.subject_id,
+        Subjects.subject_name,
+        Subjects.multiplier,
+        Users.user_id.label("professor_id"),
+        Users.first_name,
+        Users.last_name
+    ).outerjoin(
+        Users, Users.user_id == Subjects.professor_id
+    ).filter(
+        Subjects.department_id == department_id
+    ).all()
     
     return [
         {
             "subject_id": subject.subject_id,
             "subject_name": subject.subject_name,
             "multiplier": subject.multiplier,
-            "professor_name": f"{db.query(Users).filter(Users.user_id == subject.professor_id).first().first_name} {db.query(Users).filter(Users.user_id == subject.professor_id).first().last_name}" if subject.professor_id and db.query(Users).filter(Users.user_id == subject.professor_id).first() else "No professor assigned"
+            "professor_name": f"{subject.first_name} {subject.last_name}" if subject.professor_id else "No professor assigned"
         }
         for subject in subjects
     ]
@@ -615,5 +634,6 @@ def delete_director(department_id: int, authorization: str | None = Header(None)
     if director:
         db.delete(director)
         db.commit()
+        invalidate_user(director_id)
     
     return {"message": "Director removed successfully"}
\ No newline at end of file
@@ -1,10 +1,15 @@
+from datetime import date
 from Database.connection import connect_databse
 from fastapi import Depends, HTTPException, Header
 from sqlalchemy.orm import Session
 from Models.Users import Users
 from Utils.jwt_handler import verify_token
+from Utils.auth import CurrentUser, current_user
+from Utils.occupancy import available_rooms, weekday_of
+from Utils.timetable_conflicts import time_to_minutes, to_weekday
 from Schemas.roomscrd import roomscrd
 from Models.Rooms import Room
+from Utils.cache import response_cache, invalidate_department_listings
 
 
 def add_rooms_to_department(
@@ -34,6 +39,7 @@ def add_rooms_to_department(
     db.add(new_room)
     db.commit()
     db.refresh(new_room)
+    invalidate_department_listings(id)
     return {
         "msg": f"Room '{new_room.room_name}' inserted successfully",
         "room_id": new_room.room_id
@@ -55,10 +61,15 @@ def fetch_rooms_of_department(id:int,authorization: str | None = Header(None),
     ).first()
     if not found_admin:
         raise HTTPException(status_code=401, detail="Not authorized")
+
+    cache_key = f"rooms:department:{id}:administrative"
+    cached_rooms = response_cache.get(cache_key)
+    if cached_rooms is not None:
+        return cached_rooms
     
     rooms = db.query(Room).filter(Room.department_id == id).all()
 
-    return [
+    result = [
         {
             "room_id": room.room_id,
             "room_name": room.room_name,
@@ -66,5 +77,47 @@ def fetch_rooms_of_department(id:int,authorization: str | None = Header(None),
         }
         for room in rooms
     ]
+    response_cache.set(cache_key, result, tags=[f"department:{id}"])
+    return result
+    
     
-    
\ No newline at end of file
+
+
+def fetch_available_rooms(start_time: str, end_time: str, day: str | None, on_date: date | None,
+                          department_id: int | None, room_type: str | None,
+                          user: CurrentUser = Depends(current_user(roles=["administrative", "director"])),
+                          db: Session = Depends(connect_databse)):
+    """
+    Rooms with no weekly session during the slot on that weekday, nor any
+    ratrapage when a date is given
+    """
+    if on_date is not None:
+        weekday = weekday_of(on_date)
+    elif day is not None:
+        weekday = to_weekday(day)
+    else:
+        raise HTTPException(status_code=400, detail="Give a day or a date")
+
+    start_minute = time_to_minutes(start_time)
+    end_minute = time_to_minutes(end_time)
+    if end_minute <= start_minute:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+
+    rooms = available_rooms(db, weekday, start_minute, end_minute, on_date, department_id, room_type)
+
+    return {
+        "day": weekday,
+        "date": on_date,
+        "start_time": start_time,
+        "end_time": end_time,
+        "count": len(rooms),
+        "rooms": [
+            {
+                "room_id": room.room_id,
+                "room_name": room.room_name,
+                "type": room.type,
+                "department_id": room.department_id
+            }
+            for room in rooms
+        ]
+    }
@@ -1,12 +1,17 @@
 from Models.Department import Department
 from Models.Classes import Classes
-from Database.connection import connect_databse
+from Database.connection import connect_databse, connect_async_databse
 from Utils.cloudinary_uploader import upload_user_profile_image
 from fastapi import Depends, File, Form, HTTPException, Header, UploadFile,status
 from sqlalchemy.orm import Session as DBSession
 from sqlalchemy.orm import joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from Models.Users import Users
 from Utils.jwt_handler import verify_token
+from Utils.auth import CurrentUser, current_user_async
+from Utils.cache import response_cache, invalidate_timetables
+from Utils.timetable_conflicts import time_to_minutes, to_weekday, timetable_conflicts
 from Models.Subjects import Subjects
 from Schemas.roomscrd import roomscrd
 from Models.Rooms import Room
@@ -126,10 +131,15 @@ def fetch_rooms_of_department(id:int,authorization: str | None = Header(None),
     ).first()
     if not found_admin:
         raise HTTPException(status_code=401, detail="Not authorized")
+
+    cache_key = f"rooms:department:{id}:administrative"
+    cached_rooms = response_cache.get(cache_key)
+    if cached_rooms is not None:
+        return cached_rooms
     
     rooms = db.query(Room).filter(Room.department_id == id).all()
 
-    return [
+    result = [
         {
             "room_id": room.room_id,
             "room_name": room.room_name,
@@ -137,6 +147,8 @@ def fetch_rooms_of_department(id:int,authorization: str | None = Header(None),
         }
         for room in rooms
     ]
+    response_cache.set(cache_key, result, tags=[f"department:{id}"])
+    return result
 
 def add_session(data: sessionschema, authorization: str | None = Header(None), db: DBSession = Depends(connect_databse)):
 
@@ -171,41 +183,38 @@ def add_session(data: sessionschema, authorization: str | None = Header(None), d
     if not class_:
         raise HTTPException(status_code=404, detail="Class not found")
     
-    from datetime import datetime
-    
-    def parse_time(time_str):
-        return datetime.strptime(time_str, "%H:%M")
-    
-    def time_overlap(start1, end1, start2, end2):
-        s1 = parse_time(start1)
-        e1 = parse_time(end1)
-        s2 = parse_time(start2)
-        e2 = parse_time(end2)
-        return s1 < e2 and e1 > s2  
-    
-    existing_sessions = db.query(SessionModel).filter(SessionModel.day == data.day).all()
+    day = to_weekday(data.day)
+    start_minute = time_to_minutes(data.start_time)
+    end_minute = time_to_minutes(data.end_time)
+    if end_minute <= start_minute:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
 
-    for s in existing_sessions:
-        if time_overlap(data.start_time, data.end_time, s.start_time, s.end_time):
-            # Room conflict
-            if s.room_id == data.room_id:
-                raise HTTPException(status_code=409, detail=f"Room '{room.room_name}' is already occupied at this time.")
-            # Professor conflict
-            if s.professor_id == data.professor_id:
-                raise HTTPException(status_code=409, detail=f"Professor '{professor.first_name} {professor.last_name}' is already teaching another session at this time.")
+    conflict = timetable_conflicts.find_conflict(
+        db, day, start_minute, end_minute,
+        room_id=data.room_id, professor_id=data.professor_id, class_id=data.class_id
+    )
+    if conflict:
+        kind, _ = conflict
+        if kind == "room":
+            raise HTTPException(status_code=409, detail=f"Room '{room.room_name}' is already occupied at this time.")
+        if kind == "professor":
+            raise HTTPException(status_code=409, detail=f"Professor '{professor.first_name} {professor.last_name}' is already teaching another session at this time.")
+        raise HTTPException(status_code=409, detail=f"Class '{class_.name}' already has a session at this time.")
     new_session = SessionModel(
         class_id=data.class_id,
         room_id=data.room_id,
         professor_id=data.professor_id,
         subject_id=data.subject_id,
-        start_time=data.start_time,
-        end_time=data.end_time,
-        day=data.day
+        start_minute=start_minute,
+        end_minute=end_minute,
+        day=day
     )
 
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+    invalidate_timetables(new_session.class_id, new_session.professor_id)
+    timetable_conflicts.added(db, new_session)
 
     return {
         "message": "Session added successfully",
@@ -229,7 +238,13 @@ def fetch_subjects(id:int,authorization: str | None = Header(None),db: DBSession
         raise HTTPException(status_code=403, detail="Not authorized")
     
     
-    subjects = db.query(Subjects).filter(Subjects.department_id == id).all()
+    subjects = db.query(
+        Subjects.subject_id,
+        Subjects.subject_name,
+        Subjects.multiplier,
+        Subjects.professor_id,
+        Subjects.department_id
+    ).filter(Subjects.department_id == id).all()
 
     return [
         {
@@ -260,10 +275,15 @@ def fetch_sessions(id:int,authorization: str | None = Header(None),db: DBSession
     
     if not found_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
+
+    cache_key = f"timetable:class:{id}:administrative"
+    cached_sessions = response_cache.get(cache_key)
+    if cached_sessions is not None:
+        return cached_sessions
     
     found_sessions = db.query(SessionModel).filter(SessionModel.class_id == id).all()
 
-    return [
+    result = [
         {
             "session_id": found_session.session_id,
             "class_id": found_session.class_id,
@@ -276,47 +296,33 @@ def fetch_sessions(id:int,authorization: str | None = Header(None),db: DBSession
         }
         for found_session in found_sessions
     ]
+    response_cache.set(cache_key, result, tags=[f"class:{id}"])
+    return result
     
 
-def fetch_session_for_students(authorization: str | None = Header(None), db: DBSession = Depends(connect_databse)):
-   
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid or missing authorization header")
-
-    token = authorization.split(" ")[1]
-    payload = verify_token(token)
-    
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    student_id = payload["sub"]
-    
-    student = db.query(Users).filter(
-        Users.user_id == student_id,
-        Users.role == "student"
-    ).first()
-    
-    if not student:
-        raise HTTPException(status_code=403, detail="Student not found or unauthorized")
+async def fetch_session_for_students(student: CurrentUser = Depends(current_user_async(roles=["student"])), db: AsyncSession = Depends(connect_async_databse)):
     
-    if not student.class_name:
+    if not student.class_id:
         raise HTTPException(status_code=404, detail="Student is not assigned to any class")
+
+    cache_key = f"timetable:class:{student.class_id}:student"
+    cached_timetable = response_cache.get(cache_key)
+    if cached_timetable is not None:
+        return cached_timetable
     
-    # Find the class by name to get its ID
-    student_class = db.query(Classes).filter(Classes.name == student.class_name).first()
+    student_class = (await db.execute(select(Classes).filter(Classes.id == student.class_id))).scalars().first()
     if not student_class:
         raise HTTPException(status_code=404, detail="Class not found")
     
-    sessions = (
-        db.query(SessionModel)
+    sessions = (await db.execute(
+        select(SessionModel)
         .options(
             joinedload(SessionModel.professor),
             joinedload(SessionModel.subject),
             joinedload(SessionModel.room)
         )
         .filter(SessionModel.class_id == student_class.id)
-        .all()
-    )
+    )).scalars().all()
     
    
     result = []
@@ -333,44 +339,38 @@ def fetch_session_for_students(authorization: str | None = Header(None), db: DBS
         }
         result.append(session_data)
     
-    return {
+    timetable = {
         "class_id": student_class.id,
         "sessions": result
     }
+    response_cache.set(cache_key, timetable, tags=[f"class:{student_class.id}"] + [
+        f"professor:{session.professor_id}" for session in sessions
+    ])
+    return timetable
 
 
-def fetch_professor_sessions(authorization: str | None = Header(None), db: DBSession = Depends(connect_databse)):
+async def fetch_professor_sessions(professor: CurrentUser = Depends(current_user_async(roles=["professor"])), db: AsyncSession = Depends(connect_async_databse)):
 
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid or missing authorization header")
+    professor_id = professor.user_id
 
-    token = authorization.split(" ")[1]
-    payload = verify_token(token)
-    
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    professor_id = payload["sub"]
-    
-    professor = db.query(Users).filter(
-        Users.user_id == professor_id,
-        Users.role == "professor"
-    ).first()
-    
-    if not professor:
-        raise HTTPException(status_code=403, detail="Professor not found or unauthorized")
-    
+    cache_key = f"timetable:professor:{professor_id}"
+    cached_sessions = response_cache.get(cache_key)
+    if cached_sessions is not None:
+        return {
+            "professor_id": str(professor_id),
+            "professor_name": f"{professor.first_name} {professor.last_name}",
+            "sessions": cached_sessions
+        }
     
-    sessions = (
-        db.query(SessionModel)
+    sessions = (await db.execute(
+        select(SessionModel)
         .options(
             joinedload(SessionModel.class_),
             joinedload(SessionModel.subject),
             joinedload(SessionModel.room)
         )
         .filter(SessionModel.professor_id == professor_id)
-        .all()
-    )
+    )).scalars().all()
     
     
     result = []
@@ -386,9 +386,13 @@ def fetch_professor_sessions(authorization: str | None = Header(None), db: DBSes
             "room_name": session.room.room_name if session.room else None,
         }
         result.append(session_data)
+
+    response_cache.set(cache_key, result, tags=[f"professor:{professor_id}"] + [
+        f"class:{session.class_id}" for session in sessions
+    ])
     
     return {
-        "professor_id": professor_id,
+        "professor_id": str(professor_id),
         "professor_name": f"{professor.first_name} {professor.last_name}",
         "sessions": result
     }
@@ -413,6 +417,11 @@ def fetch_sessions_for_class(id:int,authorization: str | None = Header(None),db:
     
     if not found_professor:
         raise HTTPException(status_code=403, detail="Not authorized")
+
+    cache_key = f"timetable:class:{id}:professor:{professor_id}"
+    cached_sessions = response_cache.get(cache_key)
+    if cached_sessions is not None:
+        return cached_sessions
     
   
     found_sessions = (
@@ -427,7 +436,7 @@ def fetch_sessions_for_class(id:int,authorization: str | None = Header(None),db:
         .all()
         )
 
-    return [
+    result = [
         {
             "session_id": found_session.session_id,
             "class_id": found_session.class_id,
@@ -445,6 +454,8 @@ def fetch_sessions_for_class(id:int,authorization: str | None = Header(None),db:
         }
         for found_session in found_sessions
     ]
+    response_cache.set(cache_key, result, tags=[f"class:{id}", f"professor:{professor_id}"])
+    return result
     
     
 def fetch_sessions_for_class_for_director(id:int,authorization: str | None = Header(None),db: DBSession = Depends(connect_databse)):
@@ -465,6 +476,11 @@ def fetch_sessions_for_class_for_director(id:int,authorization: str | None = Hea
     
     if not found_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
+
+    cache_key = f"timetable:class:{id}:director"
+    cached_sessions = response_cache.get(cache_key)
+    if cached_sessions is not None:
+        return cached_sessions
     
     found_sessions = (
         db.query(SessionModel)
@@ -477,7 +493,7 @@ def fetch_sessions_for_class_for_director(id:int,authorization: str | None = Hea
         .all()
         )
 
-    return [
+    result = [
         {
             "session_id": found_session.session_id,
             "class_id": found_session.class_id,
@@ -493,6 +509,8 @@ def fetch_sessions_for_class_for_director(id:int,authorization: str | None = Hea
         }
         for found_session in found_sessions
     ]
+    response_cache.set(cache_key, result, tags=[f"class:{id}"])
+    return result
     
     
 def fetch_single_session(id:int,authorization: str | None = Header(None),db: DBSession = Depends(connect_databse)):
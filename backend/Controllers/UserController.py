@@ -1,14 +1,18 @@
-from fastapi import Depends,Form,UploadFile,HTTPException,status,Header
+from datetime import datetime, timezone
+from fastapi import Depends,Form,UploadFile,HTTPException,status,Header,Response
 from Database.connection import connect_databse
 from Utils.cloudinary_uploader import upload_user_profile_image
 from Utils.hasher import hash_password,verify_password
+from Utils.user_import import create_import_job
 from sqlalchemy.orm import Session
 from Models.Users import Users
-from Models.Classes import Classes
+from Models.Import_job import Import_job
+from Models.Import_job_row import Import_job_row
 from Schemas.userlogin import userlogin
 from Utils.jwt_handler import create_token,verify_token
-from Utils.email_sender import send_credentials_email
-import pandas as pd
+from Utils.auth import invalidate_user
+from Utils.cache import response_cache
+from Utils.pagination import paginate_by_id
 
 
 def UserRegistration(
@@ -121,7 +125,7 @@ def change_password(
     return {"message": "Password changed successfully"}
 
 
-async def add_users(file: UploadFile = Form(...), db: Session = Depends(connect_databse), authorization: str | None = Header(None)):
+def add_users(file: UploadFile = Form(...), db: Session = Depends(connect_databse), authorization: str | None = Header(None)):
 
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header missing")
@@ -146,57 +150,84 @@ async def add_users(file: UploadFile = Form(...), db: Session = Depends(connect_
     if not admin:
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="you are not supposed to come here")
 
-    try:
-        data = pd.read_csv(file.file)
-        required_cols = ["first_name", "last_name", "department", "email", 
-                          "password_hashed",  "role", "class_name"]
-        for col in required_cols:
-            if col not in data.columns:
-                raise HTTPException(status_code=400, detail=f"Missing column: {col}")
-
-        users_added = 0
-        emails_sent = 0
-        for _, row in data.iterrows():
-            plain_password = str(row["password_hashed"])
-            hashed_password = hash_password(plain_password)
-
-            new_user = Users(
-                first_name=row["first_name"],
-                last_name=row["last_name"],
-                email=row["email"],
-                password_hashed=hashed_password,
-                role=row["role"],
-                department=row["department"],
-                class_name=row["class_name"]
-            )
-            db.add(new_user)
-            users_added += 1
-            db.flush()
-            
-            found_class = db.query(Classes).filter(Classes.name == row["class_name"]).first()
-            if found_class:
-               new_user.class_id = found_class.id
-            
-            try:
-                await send_credentials_email(
-                    email=row["email"],
-                    first_name=row["first_name"],
-                    last_name=row["last_name"],
-                    password=plain_password
-                )
-                emails_sent += 1
-            except Exception as email_error:
-                print(f"Failed to send email to {row['email']}: {str(email_error)}")
-                
-        db.commit()
-        return {
-            "msg": f"{users_added} users added successfully",
-            "emails_sent": f"{emails_sent} credential emails sent"
-        }
+    job = create_import_job(db, admin.user_id, file)
+    job_id = job.id
+    db.commit()
+
+    return {
+        "msg": "User import started",
+        "job_id": job_id
+    }
+
+
+def fetch_import_job(job_id: str, error_limit: int = 100, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header missing")
 
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+
+    token = authorization.split(" ")[1]
+    payload = verify_token(token)
+
+    if not payload or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    admin_id = payload["sub"]
+
+    admin = db.query(Users).filter(
+        Users.user_id == admin_id,
+        Users.role == "administrative"
+    ).first()
+
+    if not admin:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="you are not supposed to come here")
+
+    job = db.query(Import_job).filter(Import_job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    error_rows = (
+        db.query(Import_job_row)
+        .filter(Import_job_row.job_id == job.id, Import_job_row.outcome != "inserted")
+        .order_by(Import_job_row.row_number)
+        .limit(min(max(error_limit, 0), 1000))
+        .all()
+    )
+
+    # SQLite hands back naive datetimes, they are stored in UTC
+    started_at = job.started_at.replace(tzinfo=job.started_at.tzinfo or timezone.utc) if job.started_at else None
+    finished_at = job.finished_at.replace(tzinfo=job.finished_at.tzinfo or timezone.utc) if job.finished_at else None
+    elapsed = ((finished_at or datetime.now(timezone.utc)) - started_at).total_seconds() if started_at else 0
+
+    return {
+        "job_id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "error": job.error,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "progress": round(job.processed_rows / job.total_rows * 100, 2) if job.total_rows else 0,
+        "inserted_rows": job.inserted_rows,
+        "duplicate_rows": job.duplicate_rows,
+        "unknown_class_rows": job.unknown_class_rows,
+        "invalid_rows": job.invalid_rows,
+        "emails_queued": job.emails_queued,
+        "rows_per_second": round(job.processed_rows / elapsed, 2) if elapsed > 0 else 0,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "error_rows": [
+            {
+                "row_number": row.row_number,
+                "email": row.email,
+                "outcome": row.outcome,
+                "detail": row.detail
+            }
+            for row in error_rows
+        ]
+    }
 
 
 def user_profile(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
@@ -233,7 +264,7 @@ def user_profile(authorization: str | None = Header(None), db: Session = Depends
     }
 
 
-def fetch_users(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+def fetch_users(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header missing")
     if not authorization.startswith("Bearer "):
@@ -254,7 +285,8 @@ def fetch_users(authorization: str | None = Header(None), db: Session = Depends(
     )
     if not admin:
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="you are not supposed to come here")
-    found_users = db.query(Users).all()
+    # user_id order, the primary key keeps the pages stable and indexed
+    found_users = paginate_by_id(db.query(Users), Users.user_id, cursor, page_size, response)
     
     return [
         {
@@ -319,6 +351,9 @@ def edit_profile(
     
     db.commit()
     db.refresh(found_user)
+    invalidate_user(found_user.user_id)
+    # Timetables show the professor's name
+    response_cache.invalidate_tags(f"professor:{found_user.user_id}")
     
     return {"message": "user profile has been updated"}
     
\ No newline at end of file
@@ -1,18 +1,26 @@
 from fastapi import Depends, HTTPException, Header, UploadFile,status,Form
-from Models.Session import Session
+from sqlalchemy import case, distinct, func, insert, select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from Models.Session import Session, format_minutes
 from Models.Absence import Absence
 from Models.Classes import Classes
 from Models.Users import Users
 from Models.Subjects import Subjects
+from Models.Rooms import Room
 from Utils.jwt_handler import verify_token
-from Utils.email_sender import send_absence_notification, send_absence_request_accepted, send_absence_request_rejected
-from Schemas.absenceshcema import absenceschema
-from Database.connection import connect_databse
-from datetime import datetime
+from Utils.auth import CurrentUser, current_user_async
+from Utils.email_sender import absence_notification_email, absence_request_accepted_email, absence_request_rejected_email
+from Utils.email_queue import enqueue_email
+from Utils.attendance_aggregates import apply_attendance_changes, attendance_change
+from Schemas.absenceshcema import absenceschema, bulkabsenceschema
+from Database.connection import connect_databse, connect_async_databse
+from datetime import date, datetime
 from Utils.cloudinary_uploader import upload_user_profile_image
 from Models.Demande import Demande
+from Controllers.ClassesController import get_class_students
 
-async def assign_absence(
+def assign_absence(
     data: absenceschema,
     authorization: str | None = Header(None),
     db: Session = Depends(connect_databse)
@@ -44,47 +52,192 @@ async def assign_absence(
     class_info = db.query(Classes).filter(Classes.id == data.class_id).first()
     session_info = db.query(Session).filter(Session.session_id == data.session_id).first()
 
+    today = date.today()
     new_absence = Absence(
         user_id=data.user_id,            
         class_id=data.class_id,
         session_id=data.session_id,
+        date=today,
         is_absent=data.is_absent    
     )
 
     
     db.add(new_absence)
+    apply_attendance_changes(db, [attendance_change(
+        data.user_id,
+        data.class_id,
+        session_info.subject_id if session_info else None,
+        today,
+        absent=1 if data.is_absent else 0,
+        present=0 if data.is_absent else 1
+    )])
+
+    # Queue the email notification in the same transaction if student is marked absent
+    email_queued = False
+    if data.is_absent and student.email:
+        student_name = f"{student.first_name} {student.last_name}"
+        class_name = class_info.name if class_info else "Unknown Class"
+        subject_name = session_info.subject.subject_name if session_info and session_info.subject else "Unknown Subject"
+
+        enqueue_email(db, student.email, *absence_notification_email(
+            student_name=student_name,
+            class_name=class_name,
+            subject=subject_name,
+            date=datetime.now().strftime("%B %d, %Y")
+        ))
+        email_queued = True
+
     db.commit()
     db.refresh(new_absence)
 
-    # Send email notification if student is marked absent
-    email_sent = False
-    if data.is_absent and student.email:
-        try:
-            student_name = f"{student.first_name} {student.last_name}"
-            class_name = class_info.name if class_info else "Unknown Class"
-            subject_name = session_info.subject.subject_name if session_info and session_info.subject else "Unknown Subject"
-            absence_date = new_absence.date.strftime("%B %d, %Y") if new_absence.date else datetime.now().strftime("%B %d, %Y")
-            
-            email_sent = await send_absence_notification(
-                email=student.email,
-                student_name=student_name,
-                class_name=class_name,
-                subject=subject_name,
-                date=absence_date
-            )
-        except Exception as e:
-            print(f"Failed to send absence notification: {str(e)}")
-
     return {
         "msg": "Absence recorded",
         "absence_id": new_absence.id,
         "user_id": new_absence.user_id,
         "student_email": student.email,
         "is_absent": new_absence.is_absent,
-        "email_sent": email_sent
+        # email_sent is kept for existing clients, the email is delivered by the outbox after the response
+        "email_sent": email_queued,
+        "email_queued": email_queued
     }
-    
-    
+
+
+def assign_absences_bulk(
+    data: bulkabsenceschema,
+    authorization: str | None = Header(None),
+    db: Session = Depends(connect_databse)
+):
+    """
+    Record a whole session's roll call in a single transaction
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+
+    token = authorization.split(" ")[1]
+    payload = verify_token(token)
+
+    if not payload or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    professor_id = payload["sub"]
+
+    found_professor = db.query(Users).filter(
+        Users.user_id == professor_id,
+        Users.role == "professor"
+    ).first()
+
+    if not found_professor:
+        raise HTTPException(status_code=401, detail="Not authorized")
+
+    session_info = (
+        db.query(Session)
+        .options(joinedload(Session.class_), joinedload(Session.subject))
+        .filter(
+            Session.session_id == data.session_id,
+            Session.professor_id == professor_id
+        )
+        .first()
+    )
+
+    if not session_info:
+        raise HTTPException(status_code=404, detail="Session not found or you don't have access to it")
+
+    # Validate the whole roll call against the class roster at once
+    roster = {
+        student.user_id: student
+        for student in get_class_students(session_info.class_, db).all()
+    }
+
+    today = date.today()
+    already_recorded = {
+        user_id
+        for (user_id,) in db.query(Absence.user_id).filter(
+            Absence.session_id == data.session_id,
+            Absence.date == today
+        ).all()
+    }
+
+    results = []
+    rows = []
+    seen = set()
+    for entry in data.absences:
+        if entry.user_id in seen:
+            results.append({"user_id": entry.user_id, "status": "duplicate_entry"})
+            continue
+        seen.add(entry.user_id)
+
+        if entry.user_id not in roster:
+            results.append({"user_id": entry.user_id, "status": "not_in_class"})
+            continue
+
+        if entry.user_id in already_recorded:
+            results.append({"user_id": entry.user_id, "status": "already_recorded"})
+            continue
+
+        rows.append({
+            "user_id": entry.user_id,
+            "class_id": session_info.class_id,
+            "session_id": session_info.session_id,
+            "date": today,
+            "is_absent": entry.is_absent
+        })
+        results.append({"user_id": entry.user_id, "status": "recorded", "is_absent": entry.is_absent})
+
+    session_id = session_info.session_id
+    class_id = session_info.class_id
+    class_name = session_info.class_.name if session_info.class_ else "Unknown Class"
+    subject_name = session_info.subject.subject_name if session_info.subject else "Unknown Subject"
+
+    inserted = {}
+    emails_queued = 0
+    if rows:
+        inserted_rows = db.execute(
+            insert(Absence).returning(Absence.id, Absence.user_id, sort_by_parameter_order=True),
+            rows
+        ).all()
+        inserted = {row.user_id: row.id for row in inserted_rows}
+
+        apply_attendance_changes(db, [
+            attendance_change(
+                row["user_id"],
+                class_id,
+                session_info.subject_id,
+                today,
+                absent=1 if row["is_absent"] else 0,
+                present=0 if row["is_absent"] else 1
+            )
+            for row in rows
+        ])
+
+        # Notifications go to the outbox in the same transaction as the roll call
+        for row in rows:
+            student = roster[row["user_id"]]
+            if row["is_absent"] and student.email:
+                enqueue_email(db, student.email, *absence_notification_email(
+                    student_name=f"{student.first_name} {student.last_name}",
+                    class_name=class_name,
+                    subject=subject_name,
+                    date=today.strftime("%B %d, %Y")
+                ))
+                emails_queued += 1
+
+        db.commit()
+
+    for result in results:
+        if result["status"] == "recorded":
+            result["absence_id"] = inserted[result["user_id"]]
+
+    return {
+        "msg": "Roll call recorded",
+        "session_id": session_id,
+        "class_id": class_id,
+        "total_recorded": len(rows),
+        "total_absent": sum(1 for row in rows if row["is_absent"]),
+        "emails_queued": emails_queued,
+        "results": results
+    }
+
+
 def fetch_absence_per_class_session(
     class_id: int,
     session_id: int,
@@ -309,11 +462,10 @@ def fetch_absence_in_session(class_id: int,
     if not found_student:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get student's class ID from class_name
-    if not found_student.class_name:
+    if not found_student.class_id:
         raise HTTPException(status_code=403, detail="Student is not enrolled in any class")
     
-    student_class = db.query(Classes).filter(Classes.name == found_student.class_name).first()
+    student_class = db.query(Classes).filter(Classes.id == found_student.class_id).first()
     if not student_class:
         raise HTTPException(status_code=404, detail="Student's class not found")
     
@@ -471,7 +623,7 @@ def fetch_requests( authorization: str | None = Header(None),db: Session = Depen
 
 
 
-async def accept_demand(demande_id: int,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
+def accept_demand(demande_id: int,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
 
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -507,27 +659,33 @@ async def accept_demand(demande_id: int,authorization: str | None = Header(None)
     class_info = absence.class_
 
     demande.is_accepted = True
+    if absence.is_absent and absence.date:
+        # The excused absence now counts as a presence
+        apply_attendance_changes(db, [attendance_change(
+            absence.user_id,
+            absence.class_id,
+            session.subject_id if session else None,
+            absence.date,
+            absent=-1,
+            present=1
+        )])
     absence.is_absent = False
 
-    db.commit()
-
-    # Send email notification to student
-    try:
-        await send_absence_request_accepted(
-            email=student.email,
+    # Queue the email notification to student with the update
+    if student.email:
+        enqueue_email(db, student.email, *absence_request_accepted_email(
             student_name=f"{student.first_name} {student.last_name}",
             class_name=class_info.name,
             subject=session.subject.subject_name if session and session.subject else "Unknown",
             date=absence.date.strftime("%Y-%m-%d") if absence.date else "Unknown"
-        )
-    except Exception as e:
-        print(f"Failed to send acceptance email: {str(e)}")
-        # Don't fail the request if email fails
+        ))
+
+    db.commit()
 
     return {"message": "Demande accepted and absence updated"}
 
 
-async def reject_demand(demande_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+def reject_demand(demande_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
 
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -560,18 +718,14 @@ async def reject_demand(demande_id: int, authorization: str | None = Header(None
         session = absence.session
         class_info = absence.class_
         
-        # Send email notification to student
-        try:
-            await send_absence_request_rejected(
-                email=student.email,
+        # Queue the email notification to student with the deletion
+        if student.email:
+            enqueue_email(db, student.email, *absence_request_rejected_email(
                 student_name=f"{student.first_name} {student.last_name}",
                 class_name=class_info.name,
                 subject=session.subject.subject_name if session and session.subject else "Unknown",
                 date=absence.date.strftime("%Y-%m-%d") if absence.date else "Unknown"
-            )
-        except Exception as e:
-            print(f"Failed to send rejection email: {str(e)}")
-            # Don't fail the request if email fails
+            ))
 
     # Delete the demande
     db.delete(demande)
@@ -580,43 +734,34 @@ async def reject_demand(demande_id: int, authorization: str | None = Header(None
     return {"message": "Demande rejected and deleted"}
 
 
-def fetch_student_own_absences_in_session(
+async def fetch_student_own_absences_in_session(
     session_id: int,
-    authorization: str | None = Header(None),
-    db: Session = Depends(connect_databse)
+    found_student: CurrentUser = Depends(current_user_async(roles=["student"])),
+    db: AsyncSession = Depends(connect_async_databse)
 ):
     """
     Fetch a student's own absence history for a specific session (all occurrences)
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-
-    token = authorization.split(" ")[1]
-    payload = verify_token(token)
-
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    student_id = payload["sub"]
-
-    found_student = db.query(Users).filter(
-        Users.user_id == student_id,
-        Users.role == "student"
-    ).first()
-
-    if not found_student:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    student_id = found_student.user_id
     
-    # Get student's class ID from class_name
-    if not found_student.class_name:
+    if not found_student.class_id:
         raise HTTPException(status_code=403, detail="Student is not enrolled in any class")
     
-    student_class = db.query(Classes).filter(Classes.name == found_student.class_name).first()
+    student_class = (await db.execute(select(Classes).filter(Classes.id == found_student.class_id))).scalars().first()
     if not student_class:
         raise HTTPException(status_code=404, detail="Student's class not found")
     
     # Verify the session exists
-    session = db.query(Session).filter(Session.session_id == session_id).first()
+    session = (await db.execute(
+        select(Session)
+        .options(
+            joinedload(Session.class_),
+            joinedload(Session.subject),
+            joinedload(Session.professor),
+            joinedload(Session.room)
+        )
+        .filter(Session.session_id == session_id)
+    )).scalars().first()
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -626,10 +771,12 @@ def fetch_student_own_absences_in_session(
         raise HTTPException(status_code=403, detail="You are not enrolled in this class")
     
     # Fetch all absence records for this student in this specific session
-    absences = db.query(Absence).filter(
-        Absence.session_id == session_id,
-        Absence.user_id == student_id
-    ).order_by(Absence.date.desc()).all()
+    absences = (await db.execute(
+        select(Absence).filter(
+            Absence.session_id == session_id,
+            Absence.user_id == student_id
+        ).order_by(Absence.date.desc())
+    )).scalars().all()
     
     absence_list = []
     for absence in absences:
@@ -663,36 +810,27 @@ def fetch_student_own_absences_in_session(
     }
 
 
-def fetch_all_student_absences_by_subject(
-    authorization: str | None = Header(None),
-    db: Session = Depends(connect_databse)
+async def fetch_all_student_absences_by_subject(
+    found_student: CurrentUser = Depends(current_user_async(roles=["student"])),
+    db: AsyncSession = Depends(connect_async_databse)
 ):
     """
     Fetch all absences for a student grouped by subject/session
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-
-    token = authorization.split(" ")[1]
-    payload = verify_token(token)
-
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    student_id = payload["sub"]
-
-    found_student = db.query(Users).filter(
-        Users.user_id == student_id,
-        Users.role == "student"
-    ).first()
-
-    if not found_student:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Fetch all absences for this student
-    absences = db.query(Absence).filter(
-        Absence.user_id == student_id
-    ).order_by(Absence.date.desc()).all()
+    student_id = found_student.user_id
+    
+    # Fetch all absences for this student, with everything the grouping below reads
+    absences = (await db.execute(
+        select(Absence)
+        .options(
+            joinedload(Absence.class_),
+            joinedload(Absence.session).joinedload(Session.subject),
+            joinedload(Absence.session).joinedload(Session.professor),
+            joinedload(Absence.session).joinedload(Session.room)
+        )
+        .filter(Absence.user_id == student_id)
+        .order_by(Absence.date.desc())
+    )).scalars().all()
     
     # Group absences by session
     sessions_dict = {}
@@ -750,7 +888,7 @@ def fetch_all_student_absences_by_subject(
     sessions_list.sort(key=lambda x: x["subject_name"])
     
     return {
-        "student_id": student_id,
+        "student_id": str(student_id),
         "student_name": f"{found_student.first_name} {found_student.last_name}",
         "total_sessions": len(sessions_list),
         "total_records": len(absences),
@@ -760,6 +898,135 @@ def fetch_all_student_absences_by_subject(
     }
 
 
+def build_subject_absence_report(db: Session, professor_id: int | None = None, include_professor: bool = True):
+    """
+    Absences grouped by subject then session, for every session or only the
+    given professor's. Runs three queries whatever the data size: the
+    sessions, the per-subject aggregates and the absence rows.
+    Returns (subjects, total_students, total_absences).
+    """
+    sessions_query = db.query(
+        Session.session_id,
+        Session.subject_id,
+        Session.class_id,
+        Session.day,
+        Session.start_minute,
+        Session.end_minute,
+        Subjects.subject_name,
+        Classes.name.label("class_name"),
+        Room.room_name,
+        Users.first_name.label("professor_first_name"),
+        Users.last_name.label("professor_last_name"),
+        Users.user_id.label("professor_user_id")
+    ).join(
+        Subjects, Subjects.subject_id == Session.subject_id
+    ).outerjoin(
+        Classes, Classes.id == Session.class_id
+    ).outerjoin(
+        Room, Room.room_id == Session.room_id
+    ).outerjoin(
+        Users, Users.user_id == Session.professor_id
+    )
+
+    absences_query = db.query(
+        Absence.id,
+        Absence.session_id,
+        Absence.is_absent,
+        Absence.date,
+        Users.user_id,
+        Users.first_name,
+        Users.last_name,
+        Users.email
+    ).join(
+        Users, Users.user_id == Absence.user_id
+    ).join(
+        Session, Session.session_id == Absence.session_id
+    )
+
+    totals_query = db.query(
+        Session.subject_id,
+        func.count(distinct(Absence.user_id)).label("total_students"),
+        func.sum(case((Absence.is_absent == True, 1), else_=0)).label("total_absences"),
+        func.sum(case((Absence.is_absent == True, 0), else_=1)).label("total_present")
+    ).join(
+        Session, Session.session_id == Absence.session_id
+    ).join(
+        Users, Users.user_id == Absence.user_id
+    )
+
+    if professor_id is not None:
+        sessions_query = sessions_query.filter(Session.professor_id == professor_id)
+        absences_query = absences_query.filter(Session.professor_id == professor_id)
+        totals_query = totals_query.filter(Session.professor_id == professor_id)
+
+    subjects_dict = {}
+    sessions_subject = {}
+    for session in sessions_query.order_by(Session.session_id).all():
+        if session.subject_id not in subjects_dict:
+            subjects_dict[session.subject_id] = {
+                "subject_id": session.subject_id,
+                "subject_name": session.subject_name,
+                "total_students": 0,
+                "total_absences": 0,
+                "total_present": 0,
+                "total_records": 0,
+                "sessions": {}
+            }
+
+        session_data = {
+            "session_id": session.session_id,
+            "class_id": session.class_id,
+            "class_name": session.class_name if session.class_name else "Unknown",
+            "room": session.room_name if session.room_name else "Unknown",
+            "day": session.day,
+            "start_time": format_minutes(session.start_minute),
+            "end_time": format_minutes(session.end_minute),
+        }
+        if include_professor:
+            session_data["professor"] = f"{session.professor_first_name} {session.professor_last_name}" if session.professor_user_id else "Unknown"
+        session_data["students"] = []
+
+        subjects_dict[session.subject_id]["sessions"][session.session_id] = session_data
+        sessions_subject[session.session_id] = session.subject_id
+
+    for totals in totals_query.group_by(Session.subject_id).all():
+        subject_data = subjects_dict.get(totals.subject_id)
+        if subject_data is None:
+            continue
+        subject_data["total_students"] = totals.total_students
+        subject_data["total_absences"] = totals.total_absences or 0
+        subject_data["total_present"] = totals.total_present or 0
+        subject_data["total_records"] = subject_data["total_absences"] + subject_data["total_present"]
+
+    all_students = set()
+    for absence in absences_query.order_by(Absence.session_id, Absence.id).all():
+        subject_id = sessions_subject.get(absence.session_id)
+        if subject_id is None:
+            continue
+        all_students.add(absence.user_id)
+        subjects_dict[subject_id]["sessions"][absence.session_id]["students"].append({
+            "user_id": absence.user_id,
+            "first_name": absence.first_name,
+            "last_name": absence.last_name,
+            "email": absence.email,
+            "absence_id": absence.id,
+            "is_absent": absence.is_absent,
+            "date": absence.date.isoformat() if absence.date else None,
+            "recorded_at": absence.date.strftime("%B %d, %Y") if absence.date else "Unknown"
+        })
+
+    subjects_list = []
+    for subject_data in subjects_dict.values():
+        subject_data["sessions"] = list(subject_data["sessions"].values())
+        subjects_list.append(subject_data)
+
+    # Sort by subject name
+    subjects_list.sort(key=lambda x: x["subject_name"])
+
+    total_absences = sum(subject_data["total_absences"] for subject_data in subjects_list)
+    return subjects_list, len(all_students), total_absences
+
+
 def fetch_professor_subject_absences(
     authorization: str | None = Header(None),
     db: Session = Depends(connect_databse)
@@ -786,115 +1053,18 @@ def fetch_professor_subject_absences(
     if not found_professor:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get all sessions taught by this professor
-    professor_sessions = db.query(Session).filter(
-        Session.professor_id == professor_id
-    ).all()
-    
-    if not professor_sessions:
-        return {
-            "professor_id": professor_id,
-            "professor_name": f"{found_professor.first_name} {found_professor.last_name}",
-            "total_subjects": 0,
-            "total_students": 0,
-            "total_absences": 0,
-            "subjects": []
-        }
-    
-    # Get unique subject IDs
-    subject_ids = list(set([s.subject_id for s in professor_sessions if s.subject_id]))
-    
-    # Group data by subject
-    subjects_dict = {}
-    
-    for session in professor_sessions:
-        if not session.subject:
-            continue
-            
-        subject_id = session.subject_id
-        subject_name = session.subject.subject_name
-        
-        if subject_id not in subjects_dict:
-            subjects_dict[subject_id] = {
-                "subject_id": subject_id,
-                "subject_name": subject_name,
-                "sessions": {},
-                "total_students": set(),
-                "total_absences": 0,
-                "total_present": 0
-            }
-        
-        # Get all absences for this session
-        session_absences = db.query(Absence).filter(
-            Absence.session_id == session.session_id
-        ).all()
-        
-        if session.session_id not in subjects_dict[subject_id]["sessions"]:
-            subjects_dict[subject_id]["sessions"][session.session_id] = {
-                "session_id": session.session_id,
-                "class_id": session.class_id,
-                "class_name": session.class_.name if session.class_ else "Unknown",
-                "room": session.room.room_name if session.room else "Unknown",
-                "day": session.day,
-                "start_time": session.start_time,
-                "end_time": session.end_time,
-                "students": []
-            }
-        
-        # Add student absences
-        for absence in session_absences:
-            student = absence.user
-            if student:
-                subjects_dict[subject_id]["total_students"].add(student.user_id)
-                
-                student_data = {
-                    "user_id": student.user_id,
-                    "first_name": student.first_name,
-                    "last_name": student.last_name,
-                    "email": student.email,
-                    "absence_id": absence.id,
-                    "is_absent": absence.is_absent,
-                    "date": absence.date.isoformat() if absence.date else None,
-                    "recorded_at": absence.date.strftime("%B %d, %Y") if absence.date else "Unknown"
-                }
-                
-                subjects_dict[subject_id]["sessions"][session.session_id]["students"].append(student_data)
-                
-                if absence.is_absent:
-                    subjects_dict[subject_id]["total_absences"] += 1
-                else:
-                    subjects_dict[subject_id]["total_present"] += 1
-    
-    # Convert to list format
-    subjects_list = []
-    total_all_students = set()
-    total_all_absences = 0
-    
-    for subject_data in subjects_dict.values():
-        sessions_list = list(subject_data["sessions"].values())
-        total_students_in_subject = len(subject_data["total_students"])
-        total_all_students.update(subject_data["total_students"])
-        total_all_absences += subject_data["total_absences"]
-        
-        subjects_list.append({
-            "subject_id": subject_data["subject_id"],
-            "subject_name": subject_data["subject_name"],
-            "total_students": total_students_in_subject,
-            "total_absences": subject_data["total_absences"],
-            "total_present": subject_data["total_present"],
-            "total_records": subject_data["total_absences"] + subject_data["total_present"],
-            "sessions": sessions_list
-        })
-    
-    # Sort by subject name
-    subjects_list.sort(key=lambda x: x["subject_name"])
+    subjects_list, total_students, total_absences = build_subject_absence_report(
+        db,
+        professor_id=found_professor.user_id,
+        include_professor=False
+    )
     
     return {
         "professor_id": professor_id,
         "professor_name": f"{found_professor.first_name} {found_professor.last_name}",
         "total_subjects": len(subjects_list),
-        "total_students": len(total_all_students),
-        "total_absences": total_all_absences,
+        "total_students": total_students,
+        "total_absences": total_absences,
         "subjects": subjects_list
     }
 
@@ -925,111 +1095,17 @@ def fetch_all_absences_by_subject_admin(
     if not found_admin:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get all sessions
-    all_sessions = db.query(Session).all()
-    
-    if not all_sessions:
-        return {
-            "admin_id": admin_id,
-            "admin_name": f"{found_admin.first_name} {found_admin.last_name}",
-            "total_subjects": 0,
-            "total_students": 0,
-            "total_absences": 0,
-            "subjects": []
-        }
-    
-    # Group data by subject
-    subjects_dict = {}
-    
-    for session in all_sessions:
-        if not session.subject:
-            continue
-            
-        subject_id = session.subject_id
-        subject_name = session.subject.subject_name
-        
-        if subject_id not in subjects_dict:
-            subjects_dict[subject_id] = {
-                "subject_id": subject_id,
-                "subject_name": subject_name,
-                "sessions": {},
-                "total_students": set(),
-                "total_absences": 0,
-                "total_present": 0
-            }
-        
-        # Get all absences for this session
-        session_absences = db.query(Absence).filter(
-            Absence.session_id == session.session_id
-        ).all()
-        
-        if session.session_id not in subjects_dict[subject_id]["sessions"]:
-            subjects_dict[subject_id]["sessions"][session.session_id] = {
-                "session_id": session.session_id,
-                "class_id": session.class_id,
-                "class_name": session.class_.name if session.class_ else "Unknown",
-                "room": session.room.room_name if session.room else "Unknown",
-                "day": session.day,
-                "start_time": session.start_time,
-                "end_time": session.end_time,
-                "professor": f"{session.professor.first_name} {session.professor.last_name}" if session.professor else "Unknown",
-                "students": []
-            }
-        
-        # Add student absences
-        for absence in session_absences:
-            student = absence.user
-            if student:
-                subjects_dict[subject_id]["total_students"].add(student.user_id)
-                
-                student_data = {
-                    "user_id": student.user_id,
-                    "first_name": student.first_name,
-                    "last_name": student.last_name,
-                    "email": student.email,
-                    "absence_id": absence.id,
-                    "is_absent": absence.is_absent,
-                    "date": absence.date.isoformat() if absence.date else None,
-                    "recorded_at": absence.date.strftime("%B %d, %Y") if absence.date else "Unknown"
-                }
-                
-                subjects_dict[subject_id]["sessions"][session.session_id]["students"].append(student_data)
-                
-                if absence.is_absent:
-                    subjects_dict[subject_id]["total_absences"] += 1
-                else:
-                    subjects_dict[subject_id]["total_present"] += 1
-    
-    # Convert to list format
-    subjects_list = []
-    total_all_students = set()
-    total_all_absences = 0
-    
-    for subject_data in subjects_dict.values():
-        sessions_list = list(subject_data["sessions"].values())
-        total_students_in_subject = len(subject_data["total_students"])
-        total_all_students.update(subject_data["total_students"])
-        total_all_absences += subject_data["total_absences"]
-        
-        subjects_list.append({
-            "subject_id": subject_data["subject_id"],
-            "subject_name": subject_data["subject_name"],
-            "total_students": total_students_in_subject,
-            "total_absences": subject_data["total_absences"],
-            "total_present": subject_data["total_present"],
-            "total_records": subject_data["total_absences"] + subject_data["total_present"],
-            "sessions": sessions_list
-        })
-    
-    # Sort by subject name
-    subjects_list.sort(key=lambda x: x["subject_name"])
+    subjects_list, total_students, total_absences = build_subject_absence_report(
+        db,
+        include_professor=True
+    )
     
     return {
         "admin_id": admin_id,
         "admin_name": f"{found_admin.first_name} {found_admin.last_name}",
         "total_subjects": len(subjects_list),
-        "total_students": len(total_all_students),
-        "total_absences": total_all_absences,
+        "total_students": total_students,
+        "total_absences": total_absences,
         "subjects": subjects_list
     }
 
@@ -1060,110 +1136,16 @@ def fetch_all_absences_by_subject_director(
     if not found_director:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get all sessions
-    all_sessions = db.query(Session).all()
-    
-    if not all_sessions:
-        return {
-            "director_id": director_id,
-            "director_name": f"{found_director.first_name} {found_director.last_name}",
-            "total_subjects": 0,
-            "total_students": 0,
-            "total_absences": 0,
-            "subjects": []
-        }
-    
-    # Group data by subject
-    subjects_dict = {}
-    
-    for session in all_sessions:
-        if not session.subject:
-            continue
-            
-        subject_id = session.subject_id
-        subject_name = session.subject.subject_name
-        
-        if subject_id not in subjects_dict:
-            subjects_dict[subject_id] = {
-                "subject_id": subject_id,
-                "subject_name": subject_name,
-                "sessions": {},
-                "total_students": set(),
-                "total_absences": 0,
-                "total_present": 0
-            }
-        
-        # Get all absences for this session
-        session_absences = db.query(Absence).filter(
-            Absence.session_id == session.session_id
-        ).all()
-        
-        if session.session_id not in subjects_dict[subject_id]["sessions"]:
-            subjects_dict[subject_id]["sessions"][session.session_id] = {
-                "session_id": session.session_id,
-                "class_id": session.class_id,
-                "class_name": session.class_.name if session.class_ else "Unknown",
-                "room": session.room.room_name if session.room else "Unknown",
-                "day": session.day,
-                "start_time": session.start_time,
-                "end_time": session.end_time,
-                "professor": f"{session.professor.first_name} {session.professor.last_name}" if session.professor else "Unknown",
-                "students": []
-            }
-        
-        # Add student absences
-        for absence in session_absences:
-            student = absence.user
-            if student:
-                subjects_dict[subject_id]["total_students"].add(student.user_id)
-                
-                student_data = {
-                    "user_id": student.user_id,
-                    "first_name": student.first_name,
-                    "last_name": student.last_name,
-                    "email": student.email,
-                    "absence_id": absence.id,
-                    "is_absent": absence.is_absent,
-                    "date": absence.date.isoformat() if absence.date else None,
-                    "recorded_at": absence.date.strftime("%B %d, %Y") if absence.date else "Unknown"
-                }
-                
-                subjects_dict[subject_id]["sessions"][session.session_id]["students"].append(student_data)
-                
-                if absence.is_absent:
-                    subjects_dict[subject_id]["total_absences"] += 1
-                else:
-                    subjects_dict[subject_id]["total_present"] += 1
-    
-    # Convert to list format
-    subjects_list = []
-    total_all_students = set()
-    total_all_absences = 0
-    
-    for subject_data in subjects_dict.values():
-        sessions_list = list(subject_data["sessions"].values())
-        total_students_in_subject = len(subject_data["total_students"])
-        total_all_students.update(subject_data["total_students"])
-        total_all_absences += subject_data["total_absences"]
-        
-        subjects_list.append({
-            "subject_id": subject_data["subject_id"],
-            "subject_name": subject_data["subject_name"],
-            "total_students": total_students_in_subject,
-            "total_absences": subject_data["total_absences"],
-            "total_present": subject_data["total_present"],
-            "total_records": subject_data["total_absences"] + subject_data["total_present"],
-            "sessions": sessions_list
-        })
-    
-    # Sort by subject name
-    subjects_list.sort(key=lambda x: x["subject_name"])
+    subjects_list, total_students, total_absences = build_subject_absence_report(
+        db,
+        include_professor=True
+    )
     
     return {
         "director_id": director_id,
         "director_name": f"{found_director.first_name} {found_director.last_name}",
         "total_subjects": len(subjects_list),
-        "total_students": len(total_all_students),
-        "total_absences": total_all_absences,
+        "total_students": total_students,
+        "total_absences": total_absences,
         "subjects": subjects_list
-    }
\ No newline at end of file
+    }
@@ -6,6 +6,7 @@ from Models.Users import Users
 from Models.Events import Events
 from Models.Event_association import Event_association
 from Schemas.event_schema import EventSchema
+from Utils.pagination import DEFAULT_PAGE_SIZE, page_window, total_pages
 
 def add_event(data:EventSchema,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
     
@@ -286,7 +287,7 @@ def remove_event_for_user(event_id: int, authorization: str | None = Header(None
         "user_id": user_id
     }
 
-def fetch_user_events(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+def fetch_user_events(page: int | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
     
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -305,30 +306,45 @@ def fetch_user_events(authorization: str | None = Header(None), db: Session = De
     if not found_user:
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="User not found")
     
-    # Fetch all events the user is registered for
-    user_registrations = db.query(Event_association).filter(
+    # Fetch the events the user is registered for, joined in one query
+    registrations = db.query(Events).join(
+        Event_association, Event_association.event_id == Events.event_id
+    ).filter(
         Event_association.user_id == user_id
-    ).all()
+    )
     
-    registered_events = []
-    for registration in user_registrations:
-        event = db.query(Events).filter(Events.event_id == registration.event_id).first()
-        if event:
-            registered_events.append({
-                "event_id": event.event_id,
-                "event_name": event.event_name,
-                "posted_at": event.posted_at,
-                "ends_at": event.ends_at,
-                "details": event.details,
-                "event_type": event.event_type
-            })
+    if page is None and page_size is None:
+        # Not paged: every event as a single page
+        events = registrations.order_by(Events.event_id).all()
+        total_events = len(events)
+        page, page_size = 1, max(total_events, 1)
+    else:
+        page, page_size, offset = page_window(page or 1, page_size or DEFAULT_PAGE_SIZE)
+        total_events = registrations.count()
+        events = registrations.order_by(Events.event_id).offset(offset).limit(page_size).all()
+    
+    registered_events = [
+        {
+            "event_id": event.event_id,
+            "event_name": event.event_name,
+            "posted_at": event.posted_at,
+            "ends_at": event.ends_at,
+            "details": event.details,
+            "event_type": event.event_type
+        }
+        for event in events
+    ]
     
     return {
         "message": "User registered events fetched successfully",
+        "page": page,
+        "page_size": page_size,
+        "total_events": total_events,
+        "total_pages": total_pages(total_events, page_size),
         "events": registered_events
     }
     
-def fetch_event_attendees(event_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+def fetch_event_attendees(event_id: int, page: int | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
     
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -353,28 +369,49 @@ def fetch_event_attendees(event_id: int, authorization: str | None = Header(None
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    # Fetch all attendees for this event
-    attendees_registrations = db.query(Event_association).filter(
+    # Fetch the attendees for this event, joined in one query
+    attendees = db.query(
+        Users.user_id,
+        Users.first_name,
+        Users.last_name,
+        Users.profile_picture,
+        Users.email,
+        Users.role
+    ).join(
+        Event_association, Event_association.user_id == Users.user_id
+    ).filter(
         Event_association.event_id == event_id
-    ).all()
-    
-    attendees_list = []
-    for registration in attendees_registrations:
-        user = db.query(Users).filter(Users.user_id == registration.user_id).first()
-        if user:
-            attendees_list.append({
-                "user_id": user.user_id,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "profile_picture":user.profile_picture,
-                "email": user.email,
-                "role": user.role
-            })
+    )
+    
+    if page is None and page_size is None:
+        # Not paged: every attendee as a single page
+        attendees_page = attendees.order_by(Users.user_id).all()
+        total_attendees = len(attendees_page)
+        page, page_size = 1, max(total_attendees, 1)
+    else:
+        page, page_size, offset = page_window(page or 1, page_size or DEFAULT_PAGE_SIZE)
+        total_attendees = attendees.count()
+        attendees_page = attendees.order_by(Users.user_id).offset(offset).limit(page_size).all()
+    
+    attendees_list = [
+        {
+            "user_id": user.user_id,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "profile_picture":user.profile_picture,
+            "email": user.email,
+            "role": user.role
+        }
+        for user in attendees_page
+    ]
     
     return {
         "message": "Event attendees fetched successfully",
         "event_id": event_id,
         "event_name": event.event_name,
-        "total_attendees": len(attendees_list),
+        "page": page,
+        "page_size": page_size,
+        "total_attendees": total_attendees,
+        "total_pages": total_pages(total_attendees, page_size),
         "attendees": attendees_list
-    }
\ No newline at end of file
+    }
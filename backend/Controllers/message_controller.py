@@ -1,68 +1,75 @@
-from fastapi import Depends, HTTPException, Header
+import asyncio
+import anyio
+from fastapi import Depends, HTTPException, Header, WebSocket, WebSocketDisconnect
 from Schemas.messageschema import messages
-from Database.connection import connect_databse
+from Database.connection import connect_databse, connect_async_databse, SessionLocal
+from sqlalchemy import case, func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from Utils.jwt_handler import verify_token
+from Utils.auth import CurrentUser, current_user, load_user, current_user_async
 from Models.Users import Users
-from Models.Message import Message
+from Models.Message import Message, conversation_pair
+from Utils.pagination import DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor, keyset_page
+from Utils.message_hub import message_hub
 
 
 
-def send_message(data:messages, authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-
-
-    token = authorization.split(" ")[1]
-    payload = verify_token(token)
-
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    student_id = payload["sub"]
+def message_event(event_type: str, message: Message) -> dict:
+    return {
+        "type": event_type,
+        "message": {
+            "id": message.id,
+            "sender_id": message.sender_id,
+            "receiver_id": message.receiver_id,
+            "content": message.content,
+            "sent_at": message.sent_at.isoformat() if message.sent_at else None,
+            "is_read": message.is_read
+        }
+    }
 
-    found_student = db.query(Users).filter(
-        Users.user_id == student_id,
-        Users.role.in_(["student", "professor","director","administrative"])
-    ).first()
 
-    if not found_student:
-        raise HTTPException(status_code=403, detail="Not authorized")
+def send_message(data:messages, sender: CurrentUser = Depends(current_user(roles=["student", "professor","director","administrative"])),db: Session = Depends(connect_databse)):
     
+    user_low_id, user_high_id = conversation_pair(sender.user_id, data.receiver_id)
     new_message=Message(
-        sender_id=student_id,
+        sender_id=sender.user_id,
         receiver_id=data.receiver_id,
+        user_low_id=user_low_id,
+        user_high_id=user_high_id,
         content=data.content
     )
     
     db.add(new_message)
     db.commit()
     db.refresh(new_message)
+    message_hub.publish([new_message.sender_id, new_message.receiver_id], message_event("message.created", new_message))
     return{"msg":"sent successfully"}
 
-def fetch_messages(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-
-    token = authorization.split(" ")[1]
-    payload = verify_token(token)
+async def fetch_messages(cursor: str | None = None, page_size: int | None = None, user: CurrentUser = Depends(current_user_async()), db: AsyncSession = Depends(connect_async_databse)):
+    """
+    All the user's messages in send order. With a cursor or a page_size they
+    are paged newest first instead, next_cursor pages back towards older ones.
+    """
+    user_id = user.user_id
 
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    user_id = payload["sub"]
-
-    # Verify user exists
-    found_user = db.query(Users).filter(Users.user_id == user_id).first()
-    if not found_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Fetch all messages where user is either sender or receiver
-    messages_list = db.query(Message).filter(
+    # Messages where user is either sender or receiver
+    query = select(Message).filter(
         (Message.sender_id == user_id) | (Message.receiver_id == user_id)
-    ).order_by(Message.sent_at.asc()).all()
+    )
+    if cursor is None and page_size is None:
+        messages_list = (await db.execute(query.order_by(Message.id))).scalars().all()
+        next_cursor = None
+    else:
+        page_size = clamp_page_size(page_size or DEFAULT_PAGE_SIZE)
+        before_id = decode_cursor(cursor)
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+        messages_list, next_cursor = keyset_page(
+            (await db.execute(query.order_by(Message.id.desc()).limit(page_size + 1))).scalars().all(),
+            page_size,
+            key=lambda msg: msg.id
+        )
 
     # Format the response
     result = []
@@ -75,7 +82,7 @@ def fetch_messages(authorization: str | None = Header(None), db: Session = Depen
             "sent_at": msg.sent_at.isoformat() if msg.sent_at else None
         })
 
-    return {"messages": result, "count": len(result)}
+    return {"messages": result, "count": len(result), "next_cursor": next_cursor}
 
 
 def delete_message(message_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
@@ -102,8 +109,10 @@ def delete_message(message_id: int, authorization: str | None = Header(None), db
         raise HTTPException(status_code=403, detail="You can only delete your own messages")
 
     # Delete the message
+    event = {"type": "message.deleted", "message": {"id": message.id, "sender_id": message.sender_id, "receiver_id": message.receiver_id}}
     db.delete(message)
     db.commit()
+    message_hub.publish([event["message"]["sender_id"], event["message"]["receiver_id"]], event)
 
     return {"message": "Message deleted successfully"}
 
@@ -135,9 +144,190 @@ def edit_message(message_id: int, new_content: str, authorization: str | None =
     message.content = new_content
     db.commit()
     db.refresh(message)
+    message_hub.publish([message.sender_id, message.receiver_id], message_event("message.updated", message))
 
     return {"message": "Message updated successfully", "updated_content": message.content}
-    
-    
-    
-    
\ No newline at end of file
+
+
+CONVERSATION_PREVIEW_LENGTH = 120
+
+
+async def fetch_conversations(user: CurrentUser = Depends(current_user_async()), db: AsyncSession = Depends(connect_async_databse)):
+    """
+    One entry per peer, most recent first, with the last message and the
+    number of messages the user has not read yet
+    """
+    user_id = user.user_id
+
+    threads = (
+        select(
+            Message.user_low_id,
+            Message.user_high_id,
+            func.max(Message.id).label("last_message_id"),
+            func.sum(case(((Message.receiver_id == user_id) & (Message.is_read == False), 1), else_=0)).label("unread_count")
+        )
+        .filter((Message.sender_id == user_id) | (Message.receiver_id == user_id))
+        .group_by(Message.user_low_id, Message.user_high_id)
+        .subquery()
+    )
+    peer_id = case((threads.c.user_low_id == user_id, threads.c.user_high_id), else_=threads.c.user_low_id)
+
+    rows = (await db.execute(
+        select(
+            Message,
+            threads.c.unread_count,
+            Users.user_id,
+            Users.first_name,
+            Users.last_name,
+            Users.role,
+            Users.profile_picture
+        )
+        .join(threads, Message.id == threads.c.last_message_id)
+        .join(Users, Users.user_id == peer_id)
+        .order_by(Message.id.desc())
+    )).all()
+
+    conversations = [
+        {
+            "peer_id": peer_user_id,
+            "peer_name": f"{first_name} {last_name}",
+            "peer_role": role,
+            "peer_profile_picture": profile_picture,
+            "unread_count": int(unread_count or 0),
+            "last_message": {
+                "id": message.id,
+                "sender_id": message.sender_id,
+                "content": message.content[:CONVERSATION_PREVIEW_LENGTH],
+                "sent_at": message.sent_at.isoformat() if message.sent_at else None,
+                "is_read": message.is_read
+            }
+        }
+        for message, unread_count, peer_user_id, first_name, last_name, role, profile_picture in rows
+    ]
+
+    return {
+        "conversations": conversations,
+        "count": len(conversations),
+        "unread_total": sum(conversation["unread_count"] for conversation in conversations)
+    }
+
+
+async def fetch_conversation(peer_id: int, cursor: str | None = None, page_size: int = DEFAULT_PAGE_SIZE, user: CurrentUser = Depends(current_user_async()), db: AsyncSession = Depends(connect_async_databse)):
+    """
+    Messages exchanged with peer_id, newest first. next_cursor pages back
+    towards older messages.
+    """
+    page_size = clamp_page_size(page_size)
+    before_id = decode_cursor(cursor)
+    user_low_id, user_high_id = conversation_pair(user.user_id, peer_id)
+
+    query = select(Message).filter(
+        Message.user_low_id == user_low_id,
+        Message.user_high_id == user_high_id
+    )
+    if before_id is not None:
+        query = query.filter(Message.id < before_id)
+    messages_list, next_cursor = keyset_page(
+        (await db.execute(query.order_by(Message.id.desc()).limit(page_size + 1))).scalars().all(),
+        page_size,
+        key=lambda msg: msg.id
+    )
+
+    result = [
+        {
+            "id": msg.id,
+            "sender_id": msg.sender_id,
+            "receiver_id": msg.receiver_id,
+            "content": msg.content,
+            "sent_at": msg.sent_at.isoformat() if msg.sent_at else None,
+            "is_read": msg.is_read
+        }
+        for msg in messages_list
+    ]
+
+    return {"peer_id": peer_id, "messages": result, "count": len(result), "next_cursor": next_cursor}
+
+
+def mark_conversation_read(peer_id: int, user: CurrentUser = Depends(current_user()), db: Session = Depends(connect_databse)):
+    user_low_id, user_high_id = conversation_pair(user.user_id, peer_id)
+
+    marked = db.execute(
+        update(Message)
+        .where(
+            Message.user_low_id == user_low_id,
+            Message.user_high_id == user_high_id,
+            Message.receiver_id == user.user_id,
+            Message.is_read == False
+        )
+        .values(is_read=True)
+    ).rowcount
+    db.commit()
+
+    if marked:
+        # Read receipt for the peer and the reader's other devices
+        message_hub.publish([user.user_id, peer_id], {"type": "conversation.read", "reader_id": user.user_id, "peer_id": peer_id})
+
+    return {"message": "Conversation marked as read", "marked": marked}
+
+
+def _socket_user(token: str) -> CurrentUser | None:
+    payload = verify_token(token)
+    if not payload or "sub" not in payload:
+        return None
+    try:
+        user_id = int(payload["sub"])
+    except (TypeError, ValueError):
+        return None
+
+    db = SessionLocal()
+    try:
+        return load_user(db, user_id)
+    finally:
+        db.close()
+
+
+async def message_socket(websocket: WebSocket, token: str | None = None):
+    """
+    Pushes message.created, message.updated, message.deleted and
+    conversation.read events for the connected user as JSON.
+
+    Browsers cannot set headers on a WebSocket, so the JWT is accepted as the
+    token query parameter as well as a Bearer authorization header.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if not token and authorization.startswith("Bearer "):
+        token = authorization.split(" ")[1]
+
+    user = await asyncio.to_thread(_socket_user, token) if token else None
+    if not user:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    connection = message_hub.subscribe(user.user_id)
+
+    async def forward_events(cancel_scope):
+        while True:
+            event = await connection.queue.get()
+            await websocket.send_json(event)
+            if connection.overflowed:
+                # Client too slow to keep up, it reconnects and refetches
+                await websocket.close(code=1013)
+                cancel_scope.cancel()
+                return
+
+    async def read_client(cancel_scope):
+        # Only used to notice the disconnect, answer keepalive pings
+        try:
+            while True:
+                if await websocket.receive_text() == "ping":
+                    await websocket.send_text("pong")
+        except WebSocketDisconnect:
+            cancel_scope.cancel()
+
+    try:
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(forward_events, task_group.cancel_scope)
+            task_group.start_soon(read_client, task_group.cancel_scope)
+    finally:
+        message_hub.unsubscribe(connection)
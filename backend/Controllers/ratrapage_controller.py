@@ -1,7 +1,10 @@
+import os
+from datetime import date, datetime, time, timedelta
 from Database.connection import connect_databse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, Header, Depends, status
 from Utils.jwt_handler import verify_token
+from Utils.auth import CurrentUser, current_user
 from Models.Users import Users
 from Models.Ratrapage import Ratrapage
 from Models.Classes import Classes
@@ -9,6 +12,30 @@ from Models.Rooms import Room
 from Models.Department import Department
 from Models.Subjects import Subjects
 from Schemas.ratrapage_schema import RatrapageSchema
+from Utils.occupancy import find_occupancy, suggest_slots
+from Utils.timetable_conflicts import time_to_minutes
+
+# Longest date window GET /ratrapages/suggest searches, a semester and a half
+RATRAPAGE_SUGGEST_MAX_DAYS = int(os.getenv("RATRAPAGE_SUGGEST_MAX_DAYS", 200))
+
+
+def check_availability(db: Session, data: RatrapageSchema, professor: Users, class_: Classes, exclude_ratrapage_id: int | None = None):
+    if data.end_time <= data.start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+
+    occupancy = find_occupancy(
+        db, data.date, data.start_time, data.end_time,
+        room_id=data.room_id, professor_id=data.user_id, class_id=data.class_id,
+        exclude_ratrapage_id=exclude_ratrapage_id
+    )
+    if not occupancy:
+        return
+    if occupancy.kind == "room":
+        raise HTTPException(status_code=400, detail="Room is already booked for this time slot")
+    if occupancy.kind == "professor":
+        raise HTTPException(status_code=400, detail=f"Professor '{professor.first_name} {professor.last_name}' is already teaching at this time")
+    raise HTTPException(status_code=400, detail=f"Class '{class_.name}' already has a session at this time")
+
 
 def add_ratrapage(data: RatrapageSchema, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
     
@@ -52,17 +79,8 @@ def add_ratrapage(data: RatrapageSchema, authorization: str | None = Header(None
     if not subject:
         raise HTTPException(status_code=404, detail="Subject not found")
     
-    # Check for time conflicts in the same room
-    conflicting_ratrapage = db.query(Ratrapage).filter(
-        Ratrapage.room_id == data.room_id,
-        Ratrapage.date == data.date,
-        ((Ratrapage.start_time <= data.start_time) & (Ratrapage.end_time > data.start_time)) |
-        ((Ratrapage.start_time < data.end_time) & (Ratrapage.end_time >= data.end_time)) |
-        ((Ratrapage.start_time >= data.start_time) & (Ratrapage.end_time <= data.end_time))
-    ).first()
-    
-    if conflicting_ratrapage:
-        raise HTTPException(status_code=400, detail="Room is already booked for this time slot")
+    # The room, the professor and the class must be free of weekly sessions and other ratrapages
+    check_availability(db, data, user, class_)
     
     # Create new ratrapage
     new_ratrapage = Ratrapage(
@@ -121,15 +139,23 @@ def fetch_ratrapages(class_id: int, authorization: str | None = Header(None), db
     if not class_:
         raise HTTPException(status_code=404, detail="Class not found")
     
-    # Fetch all ratrapages for the class
-    ratrapages = db.query(Ratrapage).filter(Ratrapage.class_id == class_id).all()
+    # Fetch all ratrapages for the class with their professor, room and subject in one query
+    ratrapages = (
+        db.query(Ratrapage)
+        .options(
+            joinedload(Ratrapage.user),
+            joinedload(Ratrapage.room),
+            joinedload(Ratrapage.subject)
+        )
+        .filter(Ratrapage.class_id == class_id)
+        .all()
+    )
     
     result = []
     for ratrapage in ratrapages:
-        # Get related user (professor)
-        user = db.query(Users).filter(Users.user_id == ratrapage.user_id).first()
-        room = db.query(Room).filter(Room.room_id == ratrapage.room_id).first()
-        subject = db.query(Subjects).filter(Subjects.subject_id == ratrapage.subject_id).first()
+        user = ratrapage.user
+        room = ratrapage.room
+        subject = ratrapage.subject
         
         result.append({
             "ratrapage_id": ratrapage.id,
@@ -210,18 +236,8 @@ def update_ratrapage(ratrapage_id: int, data: RatrapageSchema, authorization: st
     if not subject:
         raise HTTPException(status_code=404, detail="Subject not found")
     
-    # Check for time conflicts in the same room (excluding current ratrapage)
-    conflicting_ratrapage = db.query(Ratrapage).filter(
-        Ratrapage.id != ratrapage_id,
-        Ratrapage.room_id == data.room_id,
-        Ratrapage.date == data.date,
-        ((Ratrapage.start_time <= data.start_time) & (Ratrapage.end_time > data.start_time)) |
-        ((Ratrapage.start_time < data.end_time) & (Ratrapage.end_time >= data.end_time)) |
-        ((Ratrapage.start_time >= data.start_time) & (Ratrapage.end_time <= data.end_time))
-    ).first()
-    
-    if conflicting_ratrapage:
-        raise HTTPException(status_code=400, detail="Room is already booked for this time slot")
+    # The room, the professor and the class must be free (excluding current ratrapage)
+    check_availability(db, data, user, class_, exclude_ratrapage_id=ratrapage_id)
     
     # Update ratrapage fields
     ratrapage.user_id = data.user_id
@@ -309,16 +325,25 @@ def fetch_ratrapages_for_professor(authorization: str | None = Header(None), db:
     if not found_professor:
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Unauthorized access or not a professor")
     
-    # Fetch all ratrapages for the professor
-    ratrapages = db.query(Ratrapage).filter(Ratrapage.user_id == professor_id).all()
+    # Fetch all ratrapages for the professor with their related entities in one query
+    ratrapages = (
+        db.query(Ratrapage)
+        .options(
+            joinedload(Ratrapage.class_),
+            joinedload(Ratrapage.room),
+            joinedload(Ratrapage.subject),
+            joinedload(Ratrapage.department)
+        )
+        .filter(Ratrapage.user_id == professor_id)
+        .all()
+    )
     
     result = []
     for ratrapage in ratrapages:
-        # Get related entities
-        class_ = db.query(Classes).filter(Classes.id == ratrapage.class_id).first()
-        room = db.query(Room).filter(Room.room_id == ratrapage.room_id).first()
-        subject = db.query(Subjects).filter(Subjects.subject_id == ratrapage.subject_id).first()
-        department = db.query(Department).filter(Department.id == ratrapage.department_id).first()
+        class_ = ratrapage.class_
+        room = ratrapage.room
+        subject = ratrapage.subject
+        department = ratrapage.department
         
         result.append({
             "ratrapage_id": ratrapage.id,
@@ -332,7 +357,7 @@ def fetch_ratrapages_for_professor(authorization: str | None = Header(None), db:
                 "type": room.type
             } if room else None,
             "department_id": ratrapage.department_id,
-            "department_name": department.name if department else None,
+            "department_name": department.dept_name if department else None,
             "subject_id": ratrapage.subject_id,
             "subject": {
                 "subject_id": subject.subject_id,
@@ -347,3 +372,60 @@ def fetch_ratrapages_for_professor(authorization: str | None = Header(None), db:
     
     return result
     
+
+
+def suggest_ratrapage_slots(class_id: int, professor_id: int, subject_id: int, duration: int,
+                            date_from: date, date_to: date, limit: int, day_start: str, day_end: str,
+                            room_type: str | None,
+                            user: CurrentUser = Depends(current_user(roles=["administrative"])),
+                            db: Session = Depends(connect_databse)):
+    """
+    Earliest slots between date_from and date_to where the class, the
+    professor and a room of the subject's department are all free
+    """
+    class_ = db.query(Classes.id).filter(Classes.id == class_id).first()
+    if not class_:
+        raise HTTPException(status_code=404, detail="Class not found")
+
+    professor = db.query(Users.user_id).filter(Users.user_id == professor_id, Users.role == "professor").first()
+    if not professor:
+        raise HTTPException(status_code=404, detail="Professor not found")
+
+    subject = db.query(Subjects.department_id).filter(Subjects.subject_id == subject_id).first()
+    if not subject:
+        raise HTTPException(status_code=404, detail="Subject not found")
+
+    day_start_minute = time_to_minutes(day_start)
+    day_end_minute = time_to_minutes(day_end)
+    if duration <= 0 or duration > day_end_minute - day_start_minute:
+        raise HTTPException(status_code=400, detail="duration must be positive and fit between day_start and day_end")
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    if (date_to - date_from).days >= RATRAPAGE_SUGGEST_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"The date window is limited to {RATRAPAGE_SUGGEST_MAX_DAYS} days")
+    if not 1 <= limit <= 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+
+    slots = suggest_slots(
+        db, class_id, professor_id, subject.department_id, duration, date_from, date_to,
+        day_start_minute, day_end_minute, limit, room_type
+    )
+
+    # Shaped like a RatrapageSchema, ready to be posted to /add_ratrappage
+    return {
+        "count": len(slots),
+        "suggestions": [
+            {
+                "user_id": professor_id,
+                "class_id": class_id,
+                "room_id": slot["room_id"],
+                "room_name": slot["room_name"],
+                "department_id": subject.department_id,
+                "subject_id": subject_id,
+                "date": slot["date"],
+                "start_time": datetime.combine(slot["date"], time()) + timedelta(minutes=slot["start_minute"]),
+                "end_time": datetime.combine(slot["date"], time()) + timedelta(minutes=slot["end_minute"])
+            }
+            for slot in slots
+        ]
+    }
@@ -1,16 +1,20 @@
 from fastapi import Depends, HTTPException, Header
 from grpc import Status
-from Database.connection import connect_databse
+from Database.connection import connect_databse, connect_async_databse
 from sqlalchemy.orm import Session as DBSession, joinedload
-from sqlalchemy import func, distinct
+from sqlalchemy import func, distinct, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from Models.Session import Session
 from Models.Classes import Classes
 from Models.Subjects import Subjects
 from Models.Users import Users
 from Models.Rooms import Room
 from Models.Department import Department
-from Models.Absence import Absence
+from Models.Attendance_aggregate import Attendance_aggregate
 from Utils.jwt_handler import verify_token
+from Utils.auth import CurrentUser, current_user, current_user_async
+from Utils.cache import stats_cache, response_cache, invalidate_timetables
+from Utils.timetable_conflicts import timetable_conflicts
 
 
 def fetch_sessions_for_department(department_id: int, authorization: str | None = Header(None), db: DBSession = Depends(connect_databse)):
@@ -92,8 +96,11 @@ def delete_session(session_id: int, authorization: str | None = Header(None), db
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
+    class_id, professor_id = session.class_id, session.professor_id
     db.delete(session)
     db.commit()
+    invalidate_timetables(class_id, professor_id)
+    timetable_conflicts.removed(db, session_id)
 
     return {
         "success": True,
@@ -102,82 +109,70 @@ def delete_session(session_id: int, authorization: str | None = Header(None), db
     }
 
 
-def get_class_statistics(class_id: int, authorization: str | None = Header(None), db: DBSession = Depends(connect_databse)):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-
-    token = authorization.split(" ")[1]
-    payload = verify_token(token)
-
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
-    user_id = payload["sub"]
-    found_user = db.query(Users).filter(
-        Users.user_id == user_id,
-        Users.role.in_(["administrative", "director"])
-    ).first()
-
-    if not found_user:
-        raise HTTPException(status_code=403, detail="Access denied")
-
+async def get_class_statistics(class_id: int, user: CurrentUser = Depends(current_user_async(roles=["administrative", "director"])), db: AsyncSession = Depends(connect_async_databse)):
     # Get class info
-    class_info = db.query(Classes).filter(Classes.id == class_id).first()
+    class_info = (await db.execute(select(Classes).filter(Classes.id == class_id))).scalars().first()
     if not class_info:
         raise HTTPException(status_code=404, detail="Class not found")
 
     # Count total students in the class
-    total_students = db.query(func.count(Users.user_id)).join(
-        Classes, Users.class_name == Classes.name
-    ).filter(
-        Classes.id == class_id,
-        Users.role == "student"
-    ).scalar()
+    total_students = (await db.execute(
+        select(func.count(Users.user_id)).filter(
+            Users.class_id == class_id,
+            Users.role == "student"
+        )
+    )).scalar()
 
     # Count total sessions for the class
-    total_sessions = db.query(func.count(Session.session_id)).filter(
-        Session.class_id == class_id
-    ).scalar()
+    total_sessions = (await db.execute(
+        select(func.count(Session.session_id)).filter(
+            Session.class_id == class_id
+        )
+    )).scalar()
 
     # Count total absences for the class
-    total_absences = db.query(func.count(Absence.id)).filter(
-        Absence.class_id == class_id,
-        Absence.is_absent == True
-    ).scalar()
+    total_absences = (await db.execute(
+        select(func.coalesce(func.sum(Attendance_aggregate.absent_count), 0)).filter(
+            Attendance_aggregate.class_id == class_id
+        )
+    )).scalar()
 
     # Get absence rate per student
-    student_absence_stats = db.query(
-        Users.user_id,
-        Users.first_name,
-        Users.last_name,
-        func.count(Absence.id).label("absence_count")
-    ).join(
-        Absence, Users.user_id == Absence.user_id
-    ).join(
-        Classes, Users.class_name == Classes.name
-    ).filter(
-        Classes.id == class_id,
-        Users.role == "student",
-        Absence.is_absent == True
-    ).group_by(
-        Users.user_id,
-        Users.first_name,
-        Users.last_name
-    ).all()
+    student_absence_stats = (await db.execute(
+        select(
+            Users.user_id,
+            Users.first_name,
+            Users.last_name,
+            func.sum(Attendance_aggregate.absent_count).label("absence_count")
+        ).join(
+            Attendance_aggregate, Users.user_id == Attendance_aggregate.user_id
+        ).filter(
+            Users.class_id == class_id,
+            Users.role == "student"
+        ).group_by(
+            Users.user_id,
+            Users.first_name,
+            Users.last_name
+        ).having(
+            func.sum(Attendance_aggregate.absent_count) > 0
+        )
+    )).all()
 
     # Get subjects taught in this class
-    subjects_in_class = db.query(
-        Subjects.subject_id,
-        Subjects.subject_name,
-        func.count(Session.session_id).label("session_count")
-    ).join(
-        Session, Subjects.subject_id == Session.subject_id
-    ).filter(
-        Session.class_id == class_id
-    ).group_by(
-        Subjects.subject_id,
-        Subjects.subject_name
-    ).all()
+    subjects_in_class = (await db.execute(
+        select(
+            Subjects.subject_id,
+            Subjects.subject_name,
+            func.count(Session.session_id).label("session_count")
+        ).join(
+            Session, Subjects.subject_id == Session.subject_id
+        ).filter(
+            Session.class_id == class_id
+        ).group_by(
+            Subjects.subject_id,
+            Subjects.subject_name
+        )
+    )).all()
 
     return {
         "success": True,
@@ -240,10 +235,9 @@ def get_department_statistics(department_id: int, authorization: str | None = He
     ).scalar()
 
     # Count total students in all classes of the department
-    total_students = db.query(func.count(Users.user_id)).join(
-        Classes, Users.class_name == Classes.name
-    ).filter(
-        Classes.department_id == department_id,
+    # An IN list keeps SQLite on the (class_id, role) index; as a join it starts from every student
+    total_students = db.query(func.count(Users.user_id)).filter(
+        Users.class_id.in_(select(Classes.id).filter(Classes.department_id == department_id)),
         Users.role == "student"
     ).scalar()
 
@@ -265,11 +259,10 @@ def get_department_statistics(department_id: int, authorization: str | None = He
     ).scalar()
 
     # Count total absences
-    total_absences = db.query(func.count(Absence.id)).join(
-        Classes, Absence.class_id == Classes.id
+    total_absences = db.query(func.coalesce(func.sum(Attendance_aggregate.absent_count), 0)).join(
+        Classes, Attendance_aggregate.class_id == Classes.id
     ).filter(
-        Classes.department_id == department_id,
-        Absence.is_absent == True
+        Classes.department_id == department_id
     ).scalar()
 
     # Get statistics per class
@@ -279,7 +272,7 @@ def get_department_statistics(department_id: int, authorization: str | None = He
         func.count(distinct(Users.user_id)).label("student_count"),
         func.count(distinct(Session.session_id)).label("session_count")
     ).outerjoin(
-        Users, Classes.name == Users.class_name
+        Users, Classes.id == Users.class_id
     ).outerjoin(
         Session, Classes.id == Session.class_id
     ).filter(
@@ -292,12 +285,11 @@ def get_department_statistics(department_id: int, authorization: str | None = He
     # Get absence statistics per class
     class_absence_stats = db.query(
         Classes.id,
-        func.count(Absence.id).label("absence_count")
+        func.sum(Attendance_aggregate.absent_count).label("absence_count")
     ).join(
-        Absence, Classes.id == Absence.class_id
+        Attendance_aggregate, Classes.id == Attendance_aggregate.class_id
     ).filter(
-        Classes.department_id == department_id,
-        Absence.is_absent == True
+        Classes.department_id == department_id
     ).group_by(
         Classes.id
     ).all()
@@ -379,48 +371,54 @@ def get_all_departments_statistics(authorization: str | None = Header(None), db:
     if not found_user:
         raise HTTPException(status_code=403, detail="Only administrators can view all department statistics")
 
+    cached_overview = stats_cache.get("all_departments")
+    if cached_overview is not None:
+        return cached_overview
+
     # Get all departments
     departments = db.query(Department).all()
 
-    dept_stats = []
-    for dept in departments:
-        # Count classes
-        class_count = db.query(func.count(Classes.id)).filter(
-            Classes.department_id == dept.id
-        ).scalar()
-
-        # Count students
-        student_count = db.query(func.count(Users.user_id)).join(
-            Classes, Users.class_name == Classes.name
-        ).filter(
-            Classes.department_id == dept.id,
-            Users.role == "student"
-        ).scalar()
+    # One grouped query per figure, keyed by department id
+    class_counts = dict(db.query(
+        Classes.department_id, func.count(Classes.id)
+    ).group_by(Classes.department_id).all())
+
+    student_counts = dict(db.query(
+        Classes.department_id, func.count(Users.user_id)
+    ).join(
+        Classes, Users.class_id == Classes.id
+    ).filter(
+        Users.role == "student"
+    ).group_by(Classes.department_id).all())
 
-        # Count professors
-        professor_count = db.query(func.count(distinct(Subjects.professor_id))).filter(
-            Subjects.department_id == dept.id
-        ).scalar()
+    professor_counts = dict(db.query(
+        Subjects.department_id, func.count(distinct(Subjects.professor_id))
+    ).group_by(Subjects.department_id).all())
 
-        # Count subjects
-        subject_count = db.query(func.count(Subjects.subject_id)).filter(
-            Subjects.department_id == dept.id
-        ).scalar()
+    subject_counts = dict(db.query(
+        Subjects.department_id, func.count(Subjects.subject_id)
+    ).group_by(Subjects.department_id).all())
 
-        # Count sessions
-        session_count = db.query(func.count(Session.session_id)).join(
-            Classes, Session.class_id == Classes.id
-        ).filter(
-            Classes.department_id == dept.id
-        ).scalar()
+    session_counts = dict(db.query(
+        Classes.department_id, func.count(Session.session_id)
+    ).join(
+        Classes, Session.class_id == Classes.id
+    ).group_by(Classes.department_id).all())
 
-        # Count absences
-        absence_count = db.query(func.count(Absence.id)).join(
-            Classes, Absence.class_id == Classes.id
-        ).filter(
-            Classes.department_id == dept.id,
-            Absence.is_absent == True
-        ).scalar()
+    absence_counts = dict(db.query(
+        Classes.department_id, func.sum(Attendance_aggregate.absent_count)
+    ).join(
+        Classes, Attendance_aggregate.class_id == Classes.id
+    ).group_by(Classes.department_id).all())
+
+    dept_stats = []
+    for dept in departments:
+        class_count = class_counts.get(dept.id, 0)
+        student_count = student_counts.get(dept.id, 0)
+        professor_count = professor_counts.get(dept.id, 0)
+        subject_count = subject_counts.get(dept.id, 0)
+        session_count = session_counts.get(dept.id, 0)
+        absence_count = absence_counts.get(dept.id, 0)
 
         dept_stats.append({
             "department_id": dept.id,
@@ -435,8 +433,18 @@ def get_all_departments_statistics(authorization: str | None = Header(None), db:
             "absence_rate": round((absence_count / (student_count * session_count)) * 100, 2) if student_count > 0 and session_count > 0 else 0
         })
 
-    return {
+    overview = {
         "success": True,
         "total_departments": len(departments),
         "departments": dept_stats
-    }
\ No newline at end of file
+    }
+    stats_cache.set("all_departments", overview)
+    return overview
+
+
+def get_cache_statistics(user: CurrentUser = Depends(current_user(roles=["administrative"]))):
+    return {
+        "success": True,
+        "response_cache": response_cache.metrics(),
+        "stats_cache": stats_cache.metrics()
+    }
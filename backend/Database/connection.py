@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os 
 from dotenv import load_dotenv
@@ -6,10 +8,73 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def env_flag(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
 DATABASE_URL=os.getenv("DATABASE_URL")
 
-engine=create_engine(DATABASE_URL,echo=True)
+# Statement logging is for local debugging only, it floods stdout under load
+DB_ECHO=env_flag("DB_ECHO")
+DB_POOL_SIZE=int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW=int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT=float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE=int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING=env_flag("DB_POOL_PRE_PING", True)
+
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+
+def _engine_options(url: str) -> dict:
+    """
+    Pool settings from the environment.
+    SQLite keeps SQLAlchemy's default pool, the sizing options do not apply to it.
+    """
+    options = {"echo": DB_ECHO}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING
+        )
+    return options
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    return create_engine(url, **_engine_options(url))
+
+
+def async_database_url(url: str) -> str:
+    """
+    Same database as url, through the backend's async driver
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}, set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str):
+    return create_async_engine(url, **_engine_options(url))
+
+
+ASYNC_DATABASE_URL=os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+engine=create_db_engine(DATABASE_URL)
 SessionLocal=sessionmaker(autocommit=False,autoflush=True,bind=engine)
+
+async_engine=create_async_db_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal=async_sessionmaker(async_engine,class_=AsyncSession,expire_on_commit=False)
+
 Base=declarative_base()
 
 def connect_databse():
@@ -17,4 +82,12 @@ def connect_databse():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def connect_async_databse():
+    """
+    AsyncSession dependency for endpoints declared with async def.
+    Relationships are not lazy-loaded on this path, load them in the query.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+from Database.connection import engine
+from Models.Users import Users
+from Models.Absence import Absence
+from Models.Session import Session as SessionModel, Weekday
+from Models.Ratrapage import Ratrapage
+from Models.Subjects import Subjects
+from Models.Rooms import Room
+from Models.Classes import Classes
+from Models.Demande import Demande
+from Models.Event_association import Event_association
+from Models.Message import Message
+from Models.Attendance_aggregate import Attendance_aggregate
+from Utils.timetable_conflicts import session_overlaps
+
+load_dotenv()
+
+# A full scan of a table holding more rows than this fails the audit
+EXPLAIN_AUDIT_MAX_SCAN_ROWS = int(os.getenv("EXPLAIN_AUDIT_MAX_SCAN_ROWS", 1000))
+
+
+def _sample(connection: Connection, column, default=1):
+    value = connection.execute(select(column).where(column.is_not(None)).limit(1)).scalar()
+    return default if value is None else value
+
+
+def hot_queries(connection: Connection) -> dict:
+    """
+    The filters the controllers run on every request, with parameter values
+    taken from the database so the planner sees realistic selectivity
+    """
+    email = _sample(connection, Users.email, "audit@example.com")
+    class_id = _sample(connection, Classes.id)
+    department_id = _sample(connection, Classes.department_id)
+    session_id = _sample(connection, SessionModel.session_id)
+    professor_id = _sample(connection, SessionModel.professor_id)
+    day = _sample(connection, SessionModel.day, Weekday.MONDAY)
+    student_id = _sample(connection, Absence.user_id)
+    absence_date = _sample(connection, Absence.date, None)
+    room_id = _sample(connection, Ratrapage.room_id)
+    ratrapage_date = _sample(connection, Ratrapage.date, absence_date)
+    absence_id = _sample(connection, Demande.absence_id)
+    event_id = _sample(connection, Event_association.event_id)
+    low_id = _sample(connection, Message.user_low_id)
+    high_id = _sample(connection, Message.user_high_id)
+
+    return {
+        "login by email": select(Users).where(Users.email == email),
+        "class roster": select(Users).where(Users.class_id == class_id, Users.role == "student"),
+        "role listing page": select(Users).where(Users.role == "student", Users.user_id > 0).order_by(Users.user_id).limit(50),
+        "class attendance sheet": select(Absence).where(Absence.class_id == class_id, Absence.session_id == session_id),
+        "bulk attendance check": select(Absence.user_id).where(Absence.session_id == session_id, Absence.date == absence_date),
+        "student absence history": select(Absence).where(Absence.user_id == student_id),
+        "class timetable": select(SessionModel).where(SessionModel.class_id == class_id),
+        "professor timetable": select(SessionModel).where(SessionModel.professor_id == professor_id),
+        "room session conflicts": select(SessionModel.session_id).where(SessionModel.room_id == room_id, session_overlaps(day, 600, 690)),
+        "professor session conflicts": select(SessionModel.session_id).where(SessionModel.professor_id == professor_id, session_overlaps(day, 600, 690)),
+        "class session conflicts": select(SessionModel.session_id).where(SessionModel.class_id == class_id, session_overlaps(day, 600, 690)),
+        "room make-up bookings": select(Ratrapage).where(Ratrapage.room_id == room_id, Ratrapage.date == ratrapage_date),
+        "professor make-up sessions": select(Ratrapage).where(Ratrapage.user_id == professor_id),
+        "department subjects": select(Subjects).where(Subjects.department_id == department_id),
+        "department rooms": select(Room).where(Room.department_id == department_id),
+        "department classes": select(Classes).where(Classes.department_id == department_id),
+        "absence demands": select(Demande).where(Demande.absence_id == absence_id),
+        "event attendees": select(Event_association).where(Event_association.event_id == event_id),
+        "conversation page": (
+            select(Message)
+            .where(Message.user_low_id == low_id, Message.user_high_id == high_id)
+            .order_by(Message.id.desc())
+            .limit(50)
+        ),
+        "class attendance totals": (
+            select(Attendance_aggregate.user_id, func.sum(Attendance_aggregate.absent_count))
+            .where(Attendance_aggregate.class_id == class_id)
+            .group_by(Attendance_aggregate.user_id)
+        ),
+    }
+
+
+def _scanned_tables_sqlite(connection: Connection, sql: str) -> list[str]:
+    scanned = []
+    for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+        detail = row[-1].split()
+        # "SCAN users USING INDEX ..." walks an index, a bare "SCAN users" reads every row
+        if detail[0] == "SCAN" and "USING" not in detail:
+            scanned.append(detail[1])
+    return scanned
+
+
+def _scanned_tables_postgresql(connection: Connection, sql: str) -> list[str]:
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scanned = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scanned.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return scanned
+
+
+def _scanned_tables_mysql(connection: Connection, sql: str) -> list[str]:
+    return [row["table"] for row in connection.execute(text(f"EXPLAIN {sql}")).mappings() if row["type"] == "ALL"]
+
+
+EXPLAINERS = {
+    "sqlite": _scanned_tables_sqlite,
+    "postgresql": _scanned_tables_postgresql,
+    "mysql": _scanned_tables_mysql,
+    "mariadb": _scanned_tables_mysql,
+}
+
+
+def audit(connection: Connection, max_scan_rows: int = EXPLAIN_AUDIT_MAX_SCAN_ROWS) -> list[dict]:
+    """
+    EXPLAIN every hot query and report the full table scans it plans. A scan
+    fails the audit when its table holds more than max_scan_rows rows, below
+    that the planner is right to skip the index.
+    """
+    dialect = connection.dialect
+    explain = EXPLAINERS.get(dialect.name)
+    if explain is None:
+        raise ValueError(f"EXPLAIN audit does not support {dialect.name}")
+
+    table_rows = {}
+    results = []
+    for name, statement in hot_queries(connection).items():
+        sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        scans = []
+        for table in explain(connection, sql):
+            if table not in table_rows:
+                table_rows[table] = connection.execute(
+                    text(f"SELECT COUNT(*) FROM {dialect.identifier_preparer.quote(table)}")
+                ).scalar()
+            scans.append({"table": table, "rows": table_rows[table]})
+
+        results.append({
+            "query": name,
+            "scans": scans,
+            "failed": any(scan["rows"] > max_scan_rows for scan in scans)
+        })
+    return results
+
+
+if __name__ == "__main__":
+    import main  # noqa: F401  registers every model
+
+    parser = argparse.ArgumentParser(description="Fail when a hot query plans a full scan of a large table")
+    parser.add_argument("--max-scan-rows", type=int, default=EXPLAIN_AUDIT_MAX_SCAN_ROWS)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        results = audit(connection, args.max_scan_rows)
+
+    for result in results:
+        status = "FAIL" if result["failed"] else "ok"
+        scans = ", ".join(f"full scan of {scan['table']} ({scan['rows']} rows)" for scan in result["scans"])
+        print(f"{status:4}  {result['query']}" + (f": {scans}" if scans else ""))
+
+    sys.exit(1 if any(result["failed"] for result in results) else 0)
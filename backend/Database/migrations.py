@@ -0,0 +1,225 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, bindparam, case, column, func, insert, inspect, select, table, text, update
+from sqlalchemy.schema import AddConstraint
+from sqlalchemy.engine import Connection, Engine
+from Database.connection import Base
+from Models.Session import Weekday, parse_minutes
+
+# Base.metadata.create_all creates the missing tables, but never changes the
+# ones that already exist. Schema changes to existing tables are listed in
+# MIGRATIONS and applied once per database, in order, at startup.
+
+schema_migrations = Table(
+    "schema_migrations",
+    Base.metadata,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+# Indexes built by a shipped migration and dropped by a later one. They are no
+# longer declared on the models, but a database migrating from scratch still
+# creates them before the later migration drops them: name -> (table, columns)
+RETIRED_INDEXES = {
+    "ix_users_class_name_role": ("users", "class_name", "role"),
+    "ix_session_day_room": ("session", "day", "room_id"),
+}
+
+
+def _index(name: str):
+    if name in RETIRED_INDEXES:
+        # Bound to a throwaway table so create_all never builds it again
+        table_name, *columns = RETIRED_INDEXES[name]
+        retired = Table(table_name, MetaData(), *(Column(column_name) for column_name in columns))
+        return Index(name, *(retired.c[column_name] for column_name in columns))
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise KeyError(f"Index {name} is not declared on any model")
+
+
+def create_indexes(*names: str):
+    """
+    Migration creating indexes declared on the models, skipping the ones the
+    database already has (a fresh create_all builds them itself)
+    """
+
+    def migrate(connection: Connection):
+        for name in names:
+            _index(name).create(connection, checkfirst=True)
+
+    return migrate
+
+
+def add_columns(table_name: str, *names: str):
+    """
+    Migration adding columns declared on a model to an existing table.
+    Columns without a server default are added nullable so the existing rows
+    stay valid, backfill them in the same migration.
+    """
+
+    def migrate(connection: Connection):
+        table = Base.metadata.tables[table_name]
+        existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+        preparer = connection.dialect.identifier_preparer
+        for name in names:
+            if name in existing:
+                continue
+            column = table.c[name]
+            ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=connection.dialect)}"
+            if column.server_default is not None:
+                default = column.server_default.arg
+                default = f"'{default}'" if isinstance(default, str) else default.compile(dialect=connection.dialect)
+                ddl += f" DEFAULT {default}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            connection.execute(text(ddl))
+
+    return migrate
+
+
+def _add_message_conversations(connection: Connection):
+    add_columns("messages", "user_low_id", "user_high_id", "is_read")(connection)
+    messages = Base.metadata.tables["messages"]
+    sender_first = messages.c.sender_id <= messages.c.receiver_id
+    connection.execute(
+        update(messages)
+        .where(messages.c.user_low_id.is_(None))
+        .values(
+            user_low_id=case((sender_first, messages.c.sender_id), else_=messages.c.receiver_id),
+            user_high_id=case((sender_first, messages.c.receiver_id), else_=messages.c.sender_id)
+        )
+    )
+    create_indexes("ix_messages_conversation_id")(connection)
+
+
+def _add_users_class_id(connection: Connection):
+    add_columns("users", "class_id")(connection)
+    users = Base.metadata.tables["users"]
+    classes = Base.metadata.tables["classes"]
+
+    # SQLite cannot add a constraint to an existing table, the column stays a plain integer there
+    constraint = next(iter(users.c.class_id.foreign_keys)).constraint
+    existing = {fk["name"] for fk in inspect(connection).get_foreign_keys("users")}
+    if connection.dialect.name != "sqlite" and constraint.name not in existing:
+        connection.execute(AddConstraint(constraint))
+
+    # Class names are not unique, enroll into the first class of that name like the old lookups did
+    connection.execute(
+        update(users)
+        .where(users.c.class_id.is_(None), users.c.class_name.is_not(None))
+        .values(class_id=(
+            select(func.min(classes.c.id))
+            .where(classes.c.name == users.c.class_name)
+            .scalar_subquery()
+        ))
+    )
+    create_indexes("ix_users_class_id_role")(connection)
+
+    # Rosters no longer filter on class_name, drop the index migration 0003 built for them
+    _drop_index(connection, "users", "ix_users_class_name_role")
+
+
+def _drop_index(connection: Connection, table_name: str, name: str):
+    if name in {index["name"] for index in inspect(connection).get_indexes(table_name)}:
+        on_table = f" ON {connection.dialect.identifier_preparer.quote(table_name)}" if connection.dialect.name in ("mysql", "mariadb") else ""
+        connection.execute(text(f"DROP INDEX {name}{on_table}"))
+
+
+def _typed_session_times(connection: Connection):
+    add_columns("session", "start_minute", "end_minute")(connection)
+    existing = {column["name"] for column in inspect(connection).get_columns("session")}
+
+    if "start_time" in existing:
+        # The string columns are no longer on the model, read them through a bare table
+        legacy = table("session", column("session_id", Integer), column("start_time", String),
+                       column("end_time", String), column("day", String))
+        converted = []
+        unreadable = []
+        for session_id, start_time, end_time, day in connection.execute(
+            select(legacy.c.session_id, legacy.c.start_time, legacy.c.end_time, legacy.c.day)
+        ):
+            try:
+                converted.append({
+                    "b_session_id": session_id,
+                    "start_minute": parse_minutes(start_time),
+                    "end_minute": parse_minutes(end_time),
+                    "day": Weekday.parse(day).value
+                })
+            except ValueError:
+                unreadable.append(session_id)
+
+        if unreadable:
+            raise RuntimeError(f"Sessions {unreadable} have a time or day that cannot be converted, fix them and restart")
+
+        sessions = Base.metadata.tables["session"]
+        if converted:
+            connection.execute(
+                update(sessions)
+                .where(sessions.c.session_id == bindparam("b_session_id"))
+                .values(start_minute=bindparam("start_minute"), end_minute=bindparam("end_minute"), day=bindparam("day")),
+                converted
+            )
+
+        preparer = connection.dialect.identifier_preparer
+        for name in ("start_time", "end_time"):
+            connection.execute(text(f"ALTER TABLE {preparer.format_table(sessions)} DROP COLUMN {preparer.quote(name)}"))
+
+    _drop_index(connection, "session", "ix_session_day_room")
+    create_indexes(
+        "ix_session_day_room_start",
+        "ix_session_day_professor_start",
+        "ix_session_day_class_start",
+    )(connection)
+
+
+MIGRATIONS = [
+    ("0001_keyset_pagination_indexes", create_indexes(
+        "ix_users_role_user_id",
+        "ix_messages_sender_id_id",
+        "ix_messages_receiver_id_id",
+    )),
+    ("0002_message_conversations", _add_message_conversations),
+    ("0003_foreign_key_filter_indexes", create_indexes(
+        "ix_absence_session_class_user",
+        "ix_absence_session_date",
+        "ix_absence_user_session",
+        "ix_session_class_professor",
+        "ix_session_professor",
+        "ix_session_day_room",
+        "ix_ratrapage_room_date",
+        "ix_ratrapage_user_date",
+        "ix_ratrapage_class_date",
+        "ix_users_class_name_role",
+        "ix_subjects_department_id",
+        "ix_subjects_professor_id",
+        "ix_rooms_department_id",
+        "ix_classes_department_id",
+        "ix_classes_name",
+        "ix_demande_absence_id",
+        "ix_assoc_event_event_id",
+    )),
+    ("0004_users_class_id", _add_users_class_id),
+    ("0005_typed_session_times", _typed_session_times),
+    ("0006_email_outbox_sensitive", add_columns("email_outbox", "sensitive")),
+]
+
+
+def run_migrations(engine: Engine):
+    """
+    Apply the migrations not yet recorded in schema_migrations, each in its own transaction
+    """
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+    for version, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(insert(schema_migrations).values(
+                version=version,
+                applied_at=datetime.now(timezone.utc)
+            ))
@@ -0,0 +1,60 @@
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from Database.connection import env_flag
+
+# Count and time the queries of every request and report them in response headers
+DB_QUERY_STATS = env_flag("DB_QUERY_STATS")
+
+_request_stats: ContextVar[dict | None] = ContextVar("request_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info["query_started_at"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["count"] += 1
+        stats["seconds"] += time.perf_counter() - started_at
+
+
+def install_query_stats(engine: Engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Adds X-DB-Query-Count and X-DB-Query-Time-Ms to every HTTP response.
+
+    The stats dict is bound to the request's context, which the sync routes
+    running in the thread pool inherit, so their queries are counted too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = {"count": 0, "seconds": 0.0}
+        token = _request_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats["count"]).encode()))
+                headers.append((b"x-db-query-time-ms", f"{stats['seconds'] * 1000:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _request_stats.reset(token)
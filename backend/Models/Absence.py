@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, Date, ForeignKey, func
+from sqlalchemy import Boolean, Column, Integer, Date, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -15,4 +15,13 @@ class Absence(Base):
     user = relationship("Users", back_populates="absences")
     class_ = relationship("Classes", back_populates="absences")
     session = relationship("Session", back_populates="absences")
-    demandes = relationship("Demande", back_populates="absence")
\ No newline at end of file
+    demandes = relationship("Demande", back_populates="absence")
+
+    __table_args__ = (
+        # Class attendance sheets and per-student lookups within a session
+        Index("ix_absence_session_class_user", "session_id", "class_id", "user_id"),
+        # Already-recorded check of the bulk attendance path
+        Index("ix_absence_session_date", "session_id", "date"),
+        # A student's absence history
+        Index("ix_absence_user_session", "user_id", "session_id"),
+    )
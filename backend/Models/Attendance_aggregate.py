@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index, UniqueConstraint
+from Database.connection import Base
+
+class Attendance_aggregate(Base):
+    __tablename__ = "attendance_aggregate"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), nullable=False)
+    # Subject of the absence's session, 0 for absences recorded without a session
+    subject_id = Column(Integer, nullable=False, default=0)
+    # Monday of the week the absences were recorded in
+    week_start = Column(Date, nullable=False)
+
+    absent_count = Column(Integer, nullable=False, default=0)
+    present_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "class_id", "subject_id", "week_start", name="uq_attendance_aggregate_key"),
+        Index("ix_attendance_aggregate_class_user", "class_id", "user_id"),
+    )
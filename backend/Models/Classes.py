@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, Column, Text, ForeignKey
+from sqlalchemy import String, Integer, Column, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -18,3 +18,8 @@ class Classes(Base):
     sessions = relationship("Session", back_populates="class_")
     absences = relationship("Absence", back_populates="class_")
     ratrapages = relationship("Ratrapage", back_populates="class_")
+
+    __table_args__ = (
+        Index("ix_classes_department_id", "department_id"),
+        Index("ix_classes_name", "name"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column, Integer, ForeignKey,Time,Boolean
+from sqlalchemy import String, Column, Integer, ForeignKey,Time,Boolean,Index
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -13,4 +13,8 @@ class Demande(Base):
     
     
     absence = relationship("Absence", back_populates="demandes")
+
+    __table_args__ = (
+        Index("ix_demande_absence_id", "absence_id"),
+    )
     
\ No newline at end of file
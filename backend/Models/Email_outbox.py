@@ -0,0 +1,27 @@
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, Index, false, func
+from Database.connection import Base
+
+class Email_outbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    # Bodies carrying credentials are redacted once the email is sent or given up on
+    sensitive = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    # pending -> sending -> sent, or back to pending with a later next_attempt_at, or failed
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column, Integer, Date, Text, func, ForeignKey
+from sqlalchemy import String, Column, Integer, Date, Text, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -12,4 +12,9 @@ class Event_association(Base):
 
     # Relationships to make it easier to access data
     user = relationship("Users", back_populates="user_events")
-    event = relationship("Events", back_populates="event_attendees")
\ No newline at end of file
+    event = relationship("Events", back_populates="event_attendees")
+
+    __table_args__ = (
+        # The primary key leads with user_id, attendee lists filter on event_id
+        Index("ix_assoc_event_event_id", "event_id"),
+    )
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import relationship
+from Database.connection import Base
+
+class Import_job(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String(32), primary_key=True, index=True)
+
+    admin_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    filename = Column(String(255), nullable=True)
+    # Spooled upload, removed once the job is finished
+    file_path = Column(String(500), nullable=False)
+
+    # queued -> running -> completed or failed
+    status = Column(String(20), nullable=False, default="queued")
+    total_rows = Column(Integer, nullable=True)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    inserted_rows = Column(Integer, nullable=False, default=0)
+    duplicate_rows = Column(Integer, nullable=False, default=0)
+    unknown_class_rows = Column(Integer, nullable=False, default=0)
+    invalid_rows = Column(Integer, nullable=False, default=0)
+    emails_queued = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # Refreshed after every chunk, a running job that stops beating is picked up again
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    rows = relationship("Import_job_row", back_populates="job", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_import_jobs_status_created", "status", "created_at"),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from Database.connection import Base
+
+class Import_job_row(Base):
+    __tablename__ = "import_job_rows"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    job_id = Column(String(32), ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False)
+    # 1-based position of the row in the uploaded file, header excluded
+    row_number = Column(Integer, nullable=False)
+    email = Column(String(255), nullable=True)
+    # inserted, duplicate_email, unknown_class or invalid_row
+    outcome = Column(String(20), nullable=False)
+    detail = Column(String(255), nullable=True)
+
+    job = relationship("Import_job", back_populates="rows")
+
+    __table_args__ = (
+        Index("ix_import_job_rows_job_outcome_row", "job_id", "outcome", "row_number"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, Boolean, Index, false
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -10,11 +10,28 @@ class Message(Base):
     sender_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
 
+    # Conversation key: the two participants' ids, lowest first, whoever sent the message
+    user_low_id = Column(Integer, nullable=False)
+    user_high_id = Column(Integer, nullable=False)
      
     content = Column(Text, nullable=False)
 
     sent_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set once the receiver has opened the conversation
+    is_read = Column(Boolean, nullable=False, default=False, server_default=false())
 
     # Relationships
     sender = relationship("Users", foreign_keys=[sender_id], back_populates="sent_messages")
-    receiver = relationship("Users", foreign_keys=[receiver_id], back_populates="received_messages")
\ No newline at end of file
+    receiver = relationship("Users", foreign_keys=[receiver_id], back_populates="received_messages")
+
+    __table_args__ = (
+        # A user's inbox and outbox paged in id order
+        Index("ix_messages_sender_id_id", "sender_id", "id"),
+        Index("ix_messages_receiver_id_id", "receiver_id", "id"),
+        # One conversation paged in id order
+        Index("ix_messages_conversation_id", "user_low_id", "user_high_id", "id"),
+    )
+
+
+def conversation_pair(user_id: int, peer_id: int) -> tuple[int, int]:
+    return (user_id, peer_id) if user_id <= peer_id else (peer_id, user_id)
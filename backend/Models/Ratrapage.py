@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -26,3 +26,11 @@ class Ratrapage(Base):
     room = relationship("Room", back_populates="ratrapages")
     department = relationship("Department", back_populates="ratrapages")
     subject = relationship("Subjects", back_populates="ratrapages")
+
+    __table_args__ = (
+        # Room bookings of a day, and a professor's make-up sessions
+        Index("ix_ratrapage_room_date", "room_id", "date"),
+        Index("ix_ratrapage_user_date", "user_id", "date"),
+        Index("ix_ratrapage_class_date", "class_id", "date"),
+    )
+
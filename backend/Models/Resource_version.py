@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from Database.connection import Base
+
+class Resource_version(Base):
+    __tablename__ = "resource_versions"
+
+    # Name of a cacheable listing, see Utils/etag.py
+    resource = Column(String(64), primary_key=True)
+    # Bumped in the same transaction as every write to the listing's tables
+    version = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column, Integer, ForeignKey
+from sqlalchemy import String, Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -15,3 +15,8 @@ class Room(Base):
     department = relationship("Department", back_populates="rooms")
     sessions = relationship("Session", back_populates="room")
     ratrapages = relationship("Ratrapage", back_populates="room")
+
+    __table_args__ = (
+        Index("ix_rooms_department_id", "department_id"),
+    )
+
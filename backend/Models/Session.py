@@ -1,7 +1,50 @@
-from sqlalchemy import String, Column, Integer, ForeignKey,Time
+import enum
+from sqlalchemy import String, Column, Integer, ForeignKey,Time,Index,Enum
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
+
+class Weekday(str, enum.Enum):
+    MONDAY = "Monday"
+    TUESDAY = "Tuesday"
+    WEDNESDAY = "Wednesday"
+    THURSDAY = "Thursday"
+    FRIDAY = "Friday"
+    SATURDAY = "Saturday"
+    SUNDAY = "Sunday"
+
+    @classmethod
+    def parse(cls, value: str) -> "Weekday":
+        """
+        Weekday from its English name, abbreviation or French name, in any case
+        """
+        day = WEEKDAY_ALIASES.get(str(value).strip().lower())
+        if day is None:
+            raise ValueError(f"Unknown day '{value}'")
+        return day
+
+
+WEEKDAY_ALIASES = {
+    alias: day
+    for day, french in zip(Weekday, ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"])
+    for alias in (day.value.lower(), day.value[:3].lower(), french)
+}
+
+
+def parse_minutes(value: str) -> int:
+    """
+    "HH:MM" (or "HH:MM:SS") -> minutes since midnight
+    """
+    hours, minutes = (int(part) for part in str(value).split(":")[:2])
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time '{value}'")
+    return hours * 60 + minutes
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
 class Session(Base):
     __tablename__="session"
     session_id=Column(Integer,primary_key=True,index=True)
@@ -9,14 +52,40 @@ class Session(Base):
     room_id=Column(Integer,ForeignKey("rooms.room_id"),nullable=False)
     professor_id=Column(Integer,ForeignKey("users.user_id"),nullable=False)
     subject_id=Column(Integer,ForeignKey("subjects.subject_id"),nullable=False)
-    start_time = Column(String, nullable=False)
-    end_time = Column(String, nullable=False)
-    day=Column(String,nullable=False)
-    
-    
+    # Minutes since midnight, the API still reads and writes "HH:MM" through start_time/end_time
+    start_minute = Column(Integer, nullable=False)
+    end_minute = Column(Integer, nullable=False)
+    day=Column(Enum(Weekday, native_enum=False, length=9, values_callable=lambda days: [day.value for day in days]),nullable=False)
+
+
     class_ = relationship("Classes", back_populates="sessions")
     room = relationship("Room", back_populates="sessions")
     professor = relationship("Users", back_populates="sessions")
     subject = relationship("Subjects", back_populates="sessions")
     absences = relationship("Absence", back_populates="session")
-    
\ No newline at end of file
+
+    @property
+    def start_time(self) -> str | None:
+        return format_minutes(self.start_minute) if self.start_minute is not None else None
+
+    @start_time.setter
+    def start_time(self, value: str):
+        self.start_minute = parse_minutes(value)
+
+    @property
+    def end_time(self) -> str | None:
+        return format_minutes(self.end_minute) if self.end_minute is not None else None
+
+    @end_time.setter
+    def end_time(self, value: str):
+        self.end_minute = parse_minutes(value)
+
+    __table_args__ = (
+        # Class timetables, optionally narrowed to one professor
+        Index("ix_session_class_professor", "class_id", "professor_id"),
+        Index("ix_session_professor", "professor_id"),
+        # Overlap checks: one day of a room, professor or class, as a range on start_minute
+        Index("ix_session_day_room_start", "day", "room_id", "start_minute"),
+        Index("ix_session_day_professor_start", "day", "professor_id", "start_minute"),
+        Index("ix_session_day_class_start", "day", "class_id", "start_minute"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column, Integer, ForeignKey
+from sqlalchemy import String, Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -17,4 +17,9 @@ class Subjects(Base):
     department = relationship("Department", back_populates="subjects")
     # Back-populate sessions linked to this subject
     sessions = relationship("Session", back_populates="subject")
-    ratrapages = relationship("Ratrapage", back_populates="subject")
\ No newline at end of file
+    ratrapages = relationship("Ratrapage", back_populates="subject")
+
+    __table_args__ = (
+        Index("ix_subjects_department_id", "department_id"),
+        Index("ix_subjects_professor_id", "professor_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column, Integer, Date, Text, func, ForeignKey
+from sqlalchemy import String, Column, Integer, Date, Text, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from Database.connection import Base
 
@@ -22,6 +22,8 @@ class Users(Base):
     speciality = Column(String, nullable=True)
     department = Column(String(200), nullable=True)
     class_name = Column(String(200), nullable=True)
+    # Enrollment, class_name is kept as the display name the import was given
+    class_id = Column(Integer, ForeignKey("classes.id", name="fk_users_class_id", ondelete="SET NULL", use_alter=True), nullable=True)
 
     # Relationships
     directed_department = relationship("Department", back_populates="director", uselist=False)
@@ -31,4 +33,11 @@ class Users(Base):
     sent_messages = relationship("Message", foreign_keys="[Message.sender_id]", back_populates="sender")
     received_messages = relationship("Message", foreign_keys="[Message.receiver_id]", back_populates="receiver")
     user_events = relationship("Event_association", back_populates="user")
-    ratrapages = relationship("Ratrapage", back_populates="user")
\ No newline at end of file
+    ratrapages = relationship("Ratrapage", back_populates="user")
+
+    __table_args__ = (
+        # Role-filtered listings paged in user_id order
+        Index("ix_users_role_user_id", "role", "user_id"),
+        # Class rosters, filtered on class and role
+        Index("ix_users_class_id_role", "class_id", "role"),
+    )
\ No newline at end of file
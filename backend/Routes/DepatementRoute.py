@@ -1,6 +1,6 @@
 from requests import Session
 from Controllers.DepartmentController import add_departement, add_professor_subject_to_class,fetch_department, fetch_professors,fetch_single_department,add_director_to_department, fetch_subjects_per_department,fetch_department_director,fetch_students_professors,fetch_students_professors,fetch_students_for_director,fetch_students_for_admin,delete_department,fetch_subjects_for_director_and_admin,fetch_department_director_info,delete_director
-from fastapi import APIRouter, Body, Depends, File, Form, Header, Query, UploadFile
+from fastapi import APIRouter, Body, Depends, File, Form, Header, Query, Response, UploadFile
 from Database.connection import connect_databse
 from Schemas.director import directorcredentials
 from Schemas.subjectshcma import subjectschema
@@ -58,16 +58,16 @@ def fetch_director_department(authorization: str | None = Header(None), db: Sess
     return fetch_department_director(authorization,db)
 
 @router.get("/fetch_students_for_professor")
-def fetch_students_for_professor(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    return fetch_students_professors(authorization, db)
+def fetch_students_for_professor(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+    return fetch_students_professors(response, cursor, page_size, authorization, db)
 
 @router.get("/fetch_student_for_director")
-def fetch_student_for_director(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    return fetch_students_for_director(authorization,db)
+def fetch_student_for_director(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+    return fetch_students_for_director(response, cursor, page_size, authorization, db)
 
 @router.get("/fetch_student_for_admin")
-def fetch_student_for_admin(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-   return fetch_students_for_admin(authorization ,db)
+def fetch_student_for_admin(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+   return fetch_students_for_admin(response, cursor, page_size, authorization, db)
 
 @router.delete("/delete_department/{department_id}")
 def delete_department_as_admin(department_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Header ,Depends
+from datetime import date as Date
+from fastapi import APIRouter, Header ,Depends, Query
 from sqlalchemy.orm import Session
-from Controllers.Roomcontroller import add_rooms_to_department,fetch_rooms_of_department
+from Controllers.Roomcontroller import add_rooms_to_department,fetch_rooms_of_department,fetch_available_rooms
 from Database.connection import connect_databse
+from Utils.auth import CurrentUser, current_user
 from Schemas.roomscrd import roomscrd
 router=APIRouter()
 
@@ -20,4 +22,19 @@ def add_room_as_admin(
 def fetch_rooms_in_dept_as_admin(id:int,authorization: str | None = Header(None),
     db: Session = Depends(connect_databse)):
     
-    return fetch_rooms_of_department(id,authorization,db)
\ No newline at end of file
+    return fetch_rooms_of_department(id,authorization,db)
+
+
+@router.get("/rooms/available")
+def fetch_available_rooms_route(
+    start_time: str,
+    end_time: str,
+    day: str | None = None,
+    date: Date | None = None,
+    department_id: int | None = None,
+    room_type: str | None = Query(None, alias="type"),
+    user: CurrentUser = Depends(current_user(roles=["administrative", "director"])),
+    db: Session = Depends(connect_databse)
+):
+    return fetch_available_rooms(start_time, end_time, day, date, department_id, room_type, user, db)
+
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Header ,Depends
 from sqlalchemy.orm import Session
 from Controllers.Sessioncontroller import add_session, fetch_professors,fetch_rooms_of_department, fetch_single_session_for_student,fetch_subjects,fetch_sessions,fetch_session_for_students,fetch_professor_sessions,fetch_sessions_for_class,fetch_sessions_for_class_for_director,fetch_single_session,fetch_single_session_for_admin,fetch_single_session_for_director
-from Database.connection import connect_databse
+from Database.connection import connect_databse, connect_async_databse
+from sqlalchemy.ext.asyncio import AsyncSession
+from Utils.auth import CurrentUser, current_user_async
 from Schemas.roomscrd import roomscrd
 from Schemas.sessionschema import sessionschema
 
@@ -37,12 +39,12 @@ def fetch_sessions_in_class(id:int,authorization: str | None = Header(None),db:
 
 
 @router.get("/fetch_session_for_students")
-def fetch_session_for_student(authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return fetch_session_for_students(authorization,db)
+async def fetch_session_for_student(student: CurrentUser = Depends(current_user_async(roles=["student"])),db: AsyncSession = Depends(connect_async_databse)):
+    return await fetch_session_for_students(student,db)
 
 @router.get("/fetch_session_for_professor")
-def fetch_professor_sessionss(authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return fetch_professor_sessions(authorization,db)
+async def fetch_professor_sessionss(professor: CurrentUser = Depends(current_user_async(roles=["professor"])),db: AsyncSession = Depends(connect_async_databse)):
+    return await fetch_professor_sessions(professor,db)
 
 
 @router.get("/fetch_class_session/{id}")
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, Form, Header, UploadFile
+from fastapi import APIRouter, Depends, Form, Header, Response, UploadFile
 from Database.connection import connect_databse
 from sqlalchemy.orm import Session
-from Controllers.UserController import add_users, edit_profile,fetch_users,user_profile
+from Controllers.UserController import add_users, edit_profile,fetch_import_job,fetch_users,user_profile
 from Controllers.DepartmentController import fetch_professors_students
 
 
@@ -9,12 +9,16 @@ from Controllers.DepartmentController import fetch_professors_students
 router=APIRouter()
 
 @router.post("/add_users")
-async def add_users_as_admin(file: UploadFile = Form(...), db: Session = Depends(connect_databse),authorization: str | None = Header(None)):
-    return await add_users(file,db,authorization)
+def add_users_as_admin(file: UploadFile = Form(...), db: Session = Depends(connect_databse),authorization: str | None = Header(None)):
+    return add_users(file,db,authorization)
+
+@router.get("/import_jobs/{job_id}")
+def fetch_import_job_as_admin(job_id: str, error_limit: int = 100, authorization: str | None = Header(None),db:Session=Depends(connect_databse)):
+    return fetch_import_job(job_id,error_limit,authorization,db)
 
 @router.get("/fetch_all_users")
-def fetch_users_as_admin(authorization: str | None = Header(None),db:Session=Depends(connect_databse)):
-    return fetch_users(authorization,db)
+def fetch_users_as_admin(response: Response, cursor: str | None = None, page_size: int | None = None, authorization: str | None = Header(None),db:Session=Depends(connect_databse)):
+    return fetch_users(response,cursor,page_size,authorization,db)
 
 @router.get("/user_profile")
 def view_profile_as_a_user(authorization: str | None = Header(None),db:Session=Depends(connect_databse)):
@@ -1,16 +1,22 @@
 from fastapi import APIRouter, Depends, Form, Header, UploadFile
-from Schemas.absenceshcema import absenceschema
+from Schemas.absenceshcema import absenceschema, bulkabsenceschema
 from sqlalchemy.orm import Session
-from Database.connection import connect_databse
-from Controllers.absence_controller import assign_absence, fetch_absence_per_class_session, fetch_absence_per_class_session_admin, fetch_absence_per_class_session_director,fetch_absence_in_session,demand_absence,fetch_requests,accept_demand,reject_demand,fetch_student_own_absences_in_session,fetch_all_student_absences_by_subject,fetch_professor_subject_absences,fetch_all_absences_by_subject_admin,fetch_all_absences_by_subject_director
+from sqlalchemy.ext.asyncio import AsyncSession
+from Database.connection import connect_databse, connect_async_databse
+from Utils.auth import CurrentUser, current_user_async
+from Controllers.absence_controller import assign_absence, assign_absences_bulk, fetch_absence_per_class_session, fetch_absence_per_class_session_admin, fetch_absence_per_class_session_director,fetch_absence_in_session,demand_absence,fetch_requests,accept_demand,reject_demand,fetch_student_own_absences_in_session,fetch_all_student_absences_by_subject,fetch_professor_subject_absences,fetch_all_absences_by_subject_admin,fetch_all_absences_by_subject_director
 
 
 router=APIRouter()
 
 
 @router.post("/assign_absence")
-async def assign_absence_professor(data:absenceschema,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return await assign_absence(data,authorization,db)
+def assign_absence_professor(data:absenceschema,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
+    return assign_absence(data,authorization,db)
+
+@router.post("/assign_absences/bulk")
+def assign_absences_bulk_professor(data:bulkabsenceschema,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
+    return assign_absences_bulk(data,authorization,db)
 
 @router.get("/absences/class/{class_id}/session/{session_id}")
 def get_absences_for_session(
@@ -67,20 +73,20 @@ def fetch_requests_for_director(authorization: str | None = Header(None),db: Ses
     return fetch_requests(authorization,db)
 
 @router.post("/accept_absence/{demande_id}")
-async def accept_student_absence(demande_id: int,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return await accept_demand(demande_id,authorization,db)
+def accept_student_absence(demande_id: int,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
+    return accept_demand(demande_id,authorization,db)
 
 @router.post("/reject_absence/{demande_id}")
-async def reject_student_absence(demande_id: int,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return await reject_demand(demande_id,authorization,db)
+def reject_student_absence(demande_id: int,authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
+    return reject_demand(demande_id,authorization,db)
 
 @router.get("/student_absence_history/{session_id}")
-def get_student_absence_history(session_id: int, authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return fetch_student_own_absences_in_session(session_id, authorization,db)
+async def get_student_absence_history(session_id: int, student: CurrentUser = Depends(current_user_async(roles=["student"])),db: AsyncSession = Depends(connect_async_databse)):
+    return await fetch_student_own_absences_in_session(session_id, student,db)
 
 @router.get("/student_all_absences")
-def get_student_all_absences(authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return fetch_all_student_absences_by_subject(authorization,db)
+async def get_student_all_absences(student: CurrentUser = Depends(current_user_async(roles=["student"])),db: AsyncSession = Depends(connect_async_databse)):
+    return await fetch_all_student_absences_by_subject(student,db)
 
 @router.get("/professor_subject_absences")
 def get_professor_subject_absences(authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
@@ -37,9 +37,9 @@ def unregister_user_from_event(event_id: int, authorization: str | None = Header
     return remove_event_for_user(event_id, authorization, db)
 
 @router.get("/my_events")
-def get_user_registered_events(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    return fetch_user_events(authorization, db)
+def get_user_registered_events(page: int | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+    return fetch_user_events(page, page_size, authorization, db)
 
 @router.get("/event_attendees/{event_id}")
-def get_event_attendees(event_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    return fetch_event_attendees(event_id, authorization, db)
\ No newline at end of file
+def get_event_attendees(event_id: int, page: int | None = None, page_size: int | None = None, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
+    return fetch_event_attendees(event_id, page, page_size, authorization, db)
\ No newline at end of file
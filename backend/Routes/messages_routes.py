@@ -1,13 +1,16 @@
 from Schemas.messageschema import messages
-from fastapi import Depends, HTTPException, Header,APIRouter
+from fastapi import Depends, HTTPException, Header,APIRouter, WebSocket
 from Schemas.messageschema import messages
-from Database.connection import connect_databse
+from Database.connection import connect_databse, connect_async_databse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from Utils.jwt_handler import verify_token
+from Utils.auth import CurrentUser, current_user, current_user_async
 from Models.Users import Users
 from Models.Message import Message
-from Controllers.message_controller import send_message, fetch_messages, delete_message, edit_message
+from Controllers.message_controller import send_message, fetch_messages, delete_message, edit_message, fetch_conversations, fetch_conversation, mark_conversation_read, message_socket
 from pydantic import BaseModel
+from Utils.pagination import DEFAULT_PAGE_SIZE
 
 class EditMessageRequest(BaseModel):
     content: str
@@ -15,12 +18,12 @@ class EditMessageRequest(BaseModel):
 router=APIRouter()
 
 @router.post("/send_message_users")
-def send_message_users(data:messages, authorization: str | None = Header(None),db: Session = Depends(connect_databse)):
-    return send_message(data,authorization,db)
+def send_message_users(data:messages, sender: CurrentUser = Depends(current_user(roles=["student", "professor","director","administrative"])),db: Session = Depends(connect_databse)):
+    return send_message(data,sender,db)
 
 @router.get("/fetch_messages")
-def get_messages(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    return fetch_messages(authorization, db)
+async def get_messages(cursor: str | None = None, page_size: int | None = None, user: CurrentUser = Depends(current_user_async()), db: AsyncSession = Depends(connect_async_databse)):
+    return await fetch_messages(cursor, page_size, user, db)
 
 @router.delete("/delete_message/{message_id}")
 def delete_message_route(message_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
@@ -28,4 +31,20 @@ def delete_message_route(message_id: int, authorization: str | None = Header(Non
 
 @router.put("/edit_message/{message_id}")
 def edit_message_route(message_id: int, data: EditMessageRequest, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    return edit_message(message_id, data.content, authorization, db)
\ No newline at end of file
+    return edit_message(message_id, data.content, authorization, db)
+
+@router.get("/conversations")
+async def get_conversations(user: CurrentUser = Depends(current_user_async()), db: AsyncSession = Depends(connect_async_databse)):
+    return await fetch_conversations(user, db)
+
+@router.get("/conversations/{peer_id}")
+async def get_conversation(peer_id: int, cursor: str | None = None, page_size: int = DEFAULT_PAGE_SIZE, user: CurrentUser = Depends(current_user_async()), db: AsyncSession = Depends(connect_async_databse)):
+    return await fetch_conversation(peer_id, cursor, page_size, user, db)
+
+@router.post("/conversations/{peer_id}/read")
+def mark_conversation_as_read(peer_id: int, user: CurrentUser = Depends(current_user()), db: Session = Depends(connect_databse)):
+    return mark_conversation_read(peer_id, user, db)
+
+@router.websocket("/ws/messages")
+async def messages_websocket(websocket: WebSocket, token: str | None = None):
+    await message_socket(websocket, token)
@@ -1,8 +1,10 @@
-from Controllers.ratrapage_controller import add_ratrapage, fetch_ratrapages, update_ratrapage, delete_ratrapage, fetch_ratrapages_for_professor
+from datetime import date
+from Controllers.ratrapage_controller import add_ratrapage, fetch_ratrapages, update_ratrapage, delete_ratrapage, fetch_ratrapages_for_professor, suggest_ratrapage_slots
 from Schemas.ratrapage_schema import RatrapageSchema
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, Query
 from Database.connection import connect_databse
 from sqlalchemy.orm import Session
+from Utils.auth import CurrentUser, current_user
 
 router=APIRouter()
 
@@ -24,4 +26,21 @@ def update_ratrapage_route(ratrapage_id: int, data: RatrapageSchema, authorizati
 
 @router.delete("/delete_ratrapage/{ratrapage_id}")
 def delete_ratrapage_route(ratrapage_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-    return delete_ratrapage(ratrapage_id, authorization, db)
\ No newline at end of file
+    return delete_ratrapage(ratrapage_id, authorization, db)
+
+@router.get("/ratrapages/suggest")
+def suggest_ratrapage_slots_route(
+    class_id: int,
+    professor_id: int,
+    subject_id: int,
+    duration: int,
+    date_from: date,
+    date_to: date,
+    limit: int = 5,
+    day_start: str = "08:00",
+    day_end: str = "18:00",
+    room_type: str | None = Query(None, alias="type"),
+    user: CurrentUser = Depends(current_user(roles=["administrative"])),
+    db: Session = Depends(connect_databse)
+):
+    return suggest_ratrapage_slots(class_id, professor_id, subject_id, duration, date_from, date_to, limit, day_start, day_end, room_type, user, db)
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.orm import Session
-from Database.connection import connect_databse
+from Database.connection import connect_databse, connect_async_databse
+from sqlalchemy.ext.asyncio import AsyncSession
+from Utils.auth import CurrentUser, current_user, current_user_async
 from Controllers.stats_controller import (
     fetch_sessions_for_department, 
     delete_session,
     get_class_statistics,
     get_department_statistics,
-    get_all_departments_statistics
+    get_all_departments_statistics,
+    get_cache_statistics
 )
 
 router = APIRouter()
@@ -23,8 +26,8 @@ def delete_session_route(session_id: int, authorization: str | None = Header(Non
 
 
 @router.get("/class/{class_id}")
-def get_class_stats(class_id: int, authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
-   return get_class_statistics(class_id, authorization, db)
+async def get_class_stats(class_id: int, user: CurrentUser = Depends(current_user_async(roles=["administrative", "director"])), db: AsyncSession = Depends(connect_async_databse)):
+   return await get_class_statistics(class_id, user, db)
 
 
 @router.get("/department/{department_id}")
@@ -35,3 +38,8 @@ def get_department_stats(department_id: int, authorization: str | None = Header(
 @router.get("/departments/all")
 def get_all_departments_stats(authorization: str | None = Header(None), db: Session = Depends(connect_databse)):
    return get_all_departments_statistics(authorization, db)
+
+
+@router.get("/cache/stats")
+def get_cache_stats(user: CurrentUser = Depends(current_user(roles=["administrative"]))):
+   return get_cache_statistics(user)
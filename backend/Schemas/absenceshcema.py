@@ -4,4 +4,12 @@ class absenceschema(BaseModel):
     user_id:int
     class_id:int
     session_id:int
-    is_absent:bool
\ No newline at end of file
+    is_absent:bool
+
+class absenceentry(BaseModel):
+    user_id:int
+    is_absent:bool
+
+class bulkabsenceschema(BaseModel):
+    session_id:int
+    absences:list[absenceentry]
@@ -0,0 +1,151 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+from Models.Absence import Absence
+from Models.Session import Session as SessionModel
+from Models.Attendance_aggregate import Attendance_aggregate
+
+KEY_COLUMNS = ["user_id", "class_id", "subject_id", "week_start"]
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def attendance_change(user_id: int, class_id: int, subject_id: int | None, day: date, absent: int = 0, present: int = 0) -> dict:
+    """
+    One change to apply to the aggregates, absent/present are signed deltas
+    """
+    return {
+        "user_id": user_id,
+        "class_id": class_id,
+        "subject_id": subject_id or 0,
+        "week_start": week_start(day),
+        "absent_count": absent,
+        "present_count": present
+    }
+
+
+def _fold(changes: list[dict]) -> list[dict]:
+    folded = {}
+    for change in changes:
+        key = tuple(change[column] for column in KEY_COLUMNS)
+        if key in folded:
+            folded[key]["absent_count"] += change["absent_count"]
+            folded[key]["present_count"] += change["present_count"]
+        else:
+            folded[key] = dict(change)
+    return list(folded.values())
+
+
+def apply_attendance_changes(db: Session, changes: list[dict]):
+    """
+    Add the deltas to their aggregate rows in the caller's transaction with a
+    single upsert, creating the rows that do not exist yet
+    """
+    rows = _fold(changes)
+    if not rows:
+        return
+
+    table = Attendance_aggregate.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=KEY_COLUMNS,
+            set_={
+                "absent_count": table.c.absent_count + statement.excluded.absent_count,
+                "present_count": table.c.present_count + statement.excluded.present_count
+            }
+        )
+        db.execute(statement)
+        return
+
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        statement = dialect_insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(
+            absent_count=table.c.absent_count + statement.inserted.absent_count,
+            present_count=table.c.present_count + statement.inserted.present_count
+        )
+        db.execute(statement)
+        return
+
+    # Other databases: update the existing rows one by one and insert the rest
+    for row in rows:
+        updated = db.query(Attendance_aggregate).filter(
+            *(getattr(Attendance_aggregate, column) == row[column] for column in KEY_COLUMNS)
+        ).update({
+            Attendance_aggregate.absent_count: Attendance_aggregate.absent_count + row["absent_count"],
+            Attendance_aggregate.present_count: Attendance_aggregate.present_count + row["present_count"]
+        }, synchronize_session=False)
+        if not updated:
+            db.execute(insert(Attendance_aggregate), [row])
+
+
+def rebuild_attendance_aggregates(db: Session) -> int:
+    """
+    Recompute the whole table from the absence rows, for backfills or after
+    absences were changed outside the API. Returns the number of rows written.
+    """
+    daily_counts = db.query(
+        Absence.user_id,
+        Absence.class_id,
+        SessionModel.subject_id,
+        Absence.date,
+        Absence.is_absent,
+        func.count(Absence.id)
+    ).outerjoin(
+        SessionModel, SessionModel.session_id == Absence.session_id
+    ).filter(
+        Absence.date.isnot(None)
+    ).group_by(
+        Absence.user_id,
+        Absence.class_id,
+        SessionModel.subject_id,
+        Absence.date,
+        Absence.is_absent
+    ).all()
+
+    changes = [
+        attendance_change(
+            user_id, class_id, subject_id, day,
+            absent=count if is_absent else 0,
+            present=0 if is_absent else count
+        )
+        for user_id, class_id, subject_id, day, is_absent, count in daily_counts
+    ]
+    rows = _fold(changes)
+
+    db.execute(delete(Attendance_aggregate))
+    if rows:
+        db.execute(insert(Attendance_aggregate), rows)
+    db.commit()
+    return len(rows)
+
+
+def ensure_attendance_aggregates(db: Session):
+    """
+    Backfill the table on the first start after it was introduced
+    """
+    has_aggregates = db.query(Attendance_aggregate.id).first() is not None
+    has_absences = db.query(Absence.id).first() is not None
+    if has_absences and not has_aggregates:
+        rebuild_attendance_aggregates(db)
+
+
+if __name__ == "__main__":
+    from Database.connection import SessionLocal
+    import main  # noqa: F401  registers every model
+
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild_attendance_aggregates(db)} attendance aggregate rows")
+    finally:
+        db.close()
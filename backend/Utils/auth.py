@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from dotenv import load_dotenv
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from Database.connection import connect_databse, connect_async_databse
+from Models.Users import Users
+from Utils.jwt_handler import verify_token
+
+load_dotenv()
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+
+
+class CurrentUser(NamedTuple):
+    user_id: int
+    role: str | None
+    isverified: str | None
+    first_name: str | None
+    last_name: str | None
+    class_name: str | None
+    class_id: int | None
+
+
+class UserCache:
+    """
+    LRU cache of user id -> CurrentUser whose entries expire after ttl seconds.
+
+    It is local to the process: invalidate() covers changes made here, the TTL
+    bounds how long another worker can keep serving a stale entry.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL_SECONDS, max_size: int = AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> CurrentUser | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: CurrentUser):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user.user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def invalidate_user(user_id: int):
+    """
+    Call after committing a change to a user's role, verification or profile
+    """
+    user_cache.invalidate(user_id)
+
+
+def _user_query(user_id: int):
+    return select(
+        Users.user_id,
+        Users.role,
+        Users.isverified,
+        Users.first_name,
+        Users.last_name,
+        Users.class_name,
+        Users.class_id
+    ).where(Users.user_id == user_id)
+
+
+def load_user(db: Session, user_id: int) -> CurrentUser | None:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    row = db.execute(_user_query(user_id)).first()
+    if not row:
+        return None
+
+    user = CurrentUser(*row)
+    user_cache.put(user)
+    return user
+
+
+async def load_user_async(db: AsyncSession, user_id: int) -> CurrentUser | None:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    row = (await db.execute(_user_query(user_id))).first()
+    if not row:
+        return None
+
+    user = CurrentUser(*row)
+    user_cache.put(user)
+    return user
+
+
+def _token_user_id(authorization: str | None, roles: list[str] | None) -> int:
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+
+    token = authorization.split(" ")[1]
+    payload = verify_token(token)
+
+    if not payload or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    if roles is not None and payload.get("role") not in roles:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+    try:
+        return int(payload["sub"])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+
+def _authorized(user: CurrentUser | None, roles: list[str] | None, verified: bool) -> CurrentUser:
+    if not user:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+    if roles is not None and user.role not in roles:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+    if verified and user.isverified != "true":
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+    return user
+
+
+def current_user(roles: list[str] | None = None, verified: bool = False):
+    """
+    Dependency returning the authenticated CurrentUser.
+
+    The token is decoded once and its role claim rejects other roles before
+    any lookup; the user itself comes from the cache, so a hot endpoint only
+    queries the users table on a cache miss. The role in the database stays
+    the authority, a token issued before a role change is refused.
+    """
+
+    def dependency(authorization: str | None = Header(None), db: Session = Depends(connect_databse)) -> CurrentUser:
+        user_id = _token_user_id(authorization, roles)
+        return _authorized(load_user(db, user_id), roles, verified)
+
+    return dependency
+
+
+def current_user_async(roles: list[str] | None = None, verified: bool = False):
+    """
+    current_user() for async def endpoints: a cache miss is looked up through
+    the AsyncSession, so the request never takes a sync pool connection on
+    the thread pool. FastAPI shares the AsyncSession with the endpoint when
+    it also depends on connect_async_databse.
+    """
+
+    async def dependency(authorization: str | None = Header(None), db: AsyncSession = Depends(connect_async_databse)) -> CurrentUser:
+        user_id = _token_user_id(authorization, roles)
+        return _authorized(await load_user_async(db, user_id), roles, verified)
+
+    return dependency
@@ -0,0 +1,259 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+# "memory" keeps every cache in the process, "redis" shares them through CACHE_REDIS_URL
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", 300))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 120))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 5000))
+
+
+class CacheBackend:
+    """
+    Key -> value cache whose entries expire after ttl seconds.
+
+    Entries can carry tags naming the rows they were built from, so a write
+    drops exactly the entries that depend on it with invalidate_tags(). Hits
+    and misses are counted per namespace, the part of the key before the
+    first ":".
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._metrics = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._metrics_lock = threading.Lock()
+
+    def get(self, key: str):
+        value = self._get(key)
+        with self._metrics_lock:
+            self._metrics[key.split(":", 1)[0]]["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value, tags: list[str] | tuple = ()):
+        if self.ttl <= 0:
+            return
+        self._set(key, value, tags)
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            return {
+                namespace: {
+                    **counts,
+                    "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4)
+                }
+                for namespace, counts in self._metrics.items()
+            }
+
+    def _get(self, key: str):
+        raise NotImplementedError
+
+    def _set(self, key: str, value, tags):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def invalidate_tags(self, *tags: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    Thread-safe in-process backend, evicting the least recently used entry
+    once it holds max_size of them
+    """
+
+    def __init__(self, ttl: float, max_size: int | None = None):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._tagged_keys = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, tags = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, tags):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, tuple(tags))
+            for tag in tags:
+                self._tagged_keys[tag].add(key)
+            while self.max_size is not None and len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tagged_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged_keys[tag]
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tags(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tagged_keys.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tagged_keys.clear()
+
+
+class RedisCache(CacheBackend):
+    """
+    Backend shared by every worker through Redis. Values are stored as JSON
+    under prefix, and each tag is a Redis set of the keys carrying it.
+    """
+
+    def __init__(self, ttl: float, prefix: str, url: str = CACHE_REDIS_URL):
+        super().__init__(ttl)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package (pip install redis)")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _get(self, key):
+        raw = self._client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def _set(self, key, value, tags):
+        ttl = max(int(self.ttl), 1)
+        pipe = self._client.pipeline()
+        pipe.set(self._key(key), json.dumps(value, default=str), ex=ttl)
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), self._key(key))
+            pipe.expire(self._tag_key(tag), ttl)
+        pipe.execute()
+
+    def delete(self, key):
+        self._client.delete(self._key(key))
+
+    def invalidate_tags(self, *tags):
+        for tag in tags:
+            keys = self._client.smembers(self._tag_key(tag))
+            self._client.delete(self._tag_key(tag), *keys)
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=f"{self.prefix}:*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def create_cache(name: str, ttl: float, max_size: int | None = None) -> CacheBackend:
+    """
+    Build a cache on the backend selected by CACHE_BACKEND
+    """
+    if CACHE_BACKEND == "redis":
+        return RedisCache(ttl=ttl, prefix=f"scholaria:{name}")
+    return LRUCache(ttl=ttl, max_size=max_size)
+
+
+# Callbacks run after a commit that wrote to one of their tables
+_table_listeners = []
+
+
+def on_tables_changed(tables: set[str], callback):
+    """
+    Run callback() after any committed transaction that inserted, updated or
+    deleted rows of one of the given tables, through the unit of work or an
+    ORM bulk statement.
+    """
+    _table_listeners.append((frozenset(tables), callback))
+
+
+def changed_tables(session: Session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    changed = changed_tables(session)
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(instance, "__table__", None)
+        if table is not None:
+            changed.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_table_listeners(session):
+    changed = session.info.pop("changed_tables", None)
+    if not changed:
+        return
+    for tables, callback in _table_listeners:
+        if tables & changed:
+            callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_tables(session):
+    session.info.pop("changed_tables", None)
+
+
+# Department overview statistics, dropped whenever the rows they count change
+stats_cache = create_cache("stats", ttl=STATS_CACHE_TTL_SECONDS)
+on_tables_changed({"department", "classes", "users", "subjects", "session", "absence", "attendance_aggregate"}, stats_cache.clear)
+
+# Timetables and room/class listings, keyed by entity and role and dropped by
+# tag from the endpoints that write sessions, rooms and classes
+response_cache = create_cache("responses", ttl=RESPONSE_CACHE_TTL_SECONDS, max_size=RESPONSE_CACHE_SIZE)
+
+
+def invalidate_timetables(class_id: int, professor_id: int):
+    """
+    Call after committing a session change for this class and professor
+    """
+    response_cache.invalidate_tags(f"class:{class_id}", f"professor:{professor_id}")
+
+
+def invalidate_department_listings(department_id: int):
+    """
+    Call after committing a room or class change in this department
+    """
+    response_cache.invalidate_tags(f"department:{department_id}", "department:all")
@@ -1 +1,29 @@
+import csv
 import pandas as pd
+from fastapi import HTTPException
+
+
+def count_csv_rows(path: str) -> int:
+    """
+    Number of data rows in a CSV file (quoted newlines are handled by the csv module)
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def read_csv_chunks(path: str, required_cols: list[str], chunk_size: int = 500):
+    """
+    Stream a CSV file as lists of row dicts of at most chunk_size rows.
+    Every value is read as a string and empty cells become None.
+    """
+    reader = pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    for chunk_index, chunk in enumerate(reader):
+        if chunk_index == 0:
+            for col in required_cols:
+                if col not in chunk.columns:
+                    raise HTTPException(status_code=400, detail=f"Missing column: {col}")
+
+        yield [
+            {col: (value.strip() or None) for col, value in row.items()}
+            for row in chunk.to_dict(orient="records")
+        ]
@@ -0,0 +1,291 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formataddr
+import aiosmtplib
+from dotenv import load_dotenv
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session
+from Database.connection import SessionLocal
+from Models.Email_outbox import Email_outbox
+from Utils.email_sender import conf
+
+load_dotenv()
+
+EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", 2))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+EMAIL_POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", 2))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+# A row left in "sending" for longer than this belongs to a worker that died mid-batch
+EMAIL_CLAIM_TIMEOUT_SECONDS = float(os.getenv("EMAIL_CLAIM_TIMEOUT_SECONDS", 300))
+
+REDACTED_BODY = "[redacted after delivery]"
+
+
+def enqueue_email(db: Session, recipient: str, subject: str, body: str, sensitive: bool = False) -> Email_outbox:
+    """
+    Add an email to the outbox as part of the caller's transaction.
+    The background workers deliver it once the transaction is committed.
+    A sensitive body (e.g. initial credentials) is only kept until then.
+    """
+    outbox_email = Email_outbox(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        sensitive=sensitive,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc)
+    )
+    db.add(outbox_email)
+    db.info["email_outbox_pending"] = True
+    # One listener per session however many emails it queues, a rollback clears the flag
+    if not event.contains(db, "after_commit", _wake_after_commit):
+        event.listen(db, "after_commit", _wake_after_commit)
+        event.listen(db, "after_rollback", _forget_pending)
+    return outbox_email
+
+
+def _wake_after_commit(session: Session):
+    if session.info.pop("email_outbox_pending", False):
+        email_outbox.wake()
+
+
+def _forget_pending(session: Session):
+    session.info.pop("email_outbox_pending", None)
+
+
+def _claim_batch(limit: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    stale_claim = now - timedelta(seconds=EMAIL_CLAIM_TIMEOUT_SECONDS)
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Email_outbox)
+            .filter(or_(
+                (Email_outbox.status == "pending") & (Email_outbox.next_attempt_at <= now),
+                (Email_outbox.status == "sending") & (Email_outbox.claimed_at < stale_claim)
+            ))
+            .order_by(Email_outbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        claimed = []
+        for row in rows:
+            if row.status == "sending":
+                # The worker that claimed it died or stalled, maybe after sending: count it as an attempt
+                row.attempts += 1
+                row.last_error = "Claim timed out before delivery was recorded"
+                if row.attempts >= EMAIL_MAX_ATTEMPTS:
+                    row.status = "failed"
+                    row.claimed_at = None
+                    if row.sensitive:
+                        row.body = REDACTED_BODY
+                    continue
+            row.status = "sending"
+            row.claimed_at = now
+            claimed.append({
+                "id": row.id,
+                "recipient": row.recipient,
+                "subject": row.subject,
+                "body": row.body,
+                "attempts": row.attempts
+            })
+
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def _record_results(sent_ids: list[int], failures: list[tuple[dict, str]]):
+    now = datetime.now(timezone.utc)
+
+    db = SessionLocal()
+    try:
+        if sent_ids:
+            db.query(Email_outbox).filter(Email_outbox.id.in_(sent_ids)).update(
+                {Email_outbox.status: "sent", Email_outbox.sent_at: now, Email_outbox.claimed_at: None},
+                synchronize_session=False
+            )
+
+        given_up_ids = [email["id"] for email, _ in failures if email["attempts"] + 1 >= EMAIL_MAX_ATTEMPTS]
+        if sent_ids or given_up_ids:
+            db.query(Email_outbox).filter(
+                Email_outbox.id.in_(sent_ids + given_up_ids),
+                Email_outbox.sensitive.is_(True)
+            ).update({Email_outbox.body: REDACTED_BODY}, synchronize_session=False)
+
+        for email, error in failures:
+            attempts = email["attempts"] + 1
+            values = {
+                Email_outbox.attempts: attempts,
+                Email_outbox.last_error: error,
+                Email_outbox.claimed_at: None
+            }
+            if attempts >= EMAIL_MAX_ATTEMPTS:
+                values[Email_outbox.status] = "failed"
+            else:
+                # Exponential backoff: base, 2*base, 4*base, ...
+                values[Email_outbox.status] = "pending"
+                values[Email_outbox.next_attempt_at] = now + timedelta(seconds=EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            db.query(Email_outbox).filter(Email_outbox.id == email["id"]).update(values, synchronize_session=False)
+
+        db.commit()
+    finally:
+        db.close()
+
+
+def _build_message(email: dict) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((conf.MAIL_FROM_NAME or "", conf.MAIL_FROM))
+    message["To"] = email["recipient"]
+    message["Subject"] = email["subject"]
+    message.set_content(email["body"], subtype="html")
+    return message
+
+
+class SMTPConnection:
+    """
+    One SMTP connection kept open across messages and reconnected when the server drops it
+    """
+
+    def __init__(self):
+        self._client = None
+
+    async def _connect(self):
+        self._client = aiosmtplib.SMTP(
+            hostname=conf.MAIL_SERVER,
+            port=conf.MAIL_PORT,
+            username=conf.MAIL_USERNAME if conf.USE_CREDENTIALS else None,
+            password=conf.MAIL_PASSWORD.get_secret_value() if conf.USE_CREDENTIALS else None,
+            use_tls=conf.MAIL_SSL_TLS,
+            start_tls=conf.MAIL_STARTTLS,
+            validate_certs=conf.VALIDATE_CERTS,
+            timeout=conf.TIMEOUT
+        )
+        await self._client.connect()
+
+    async def send(self, message: EmailMessage):
+        if self._client is None or not self._client.is_connected:
+            await self._connect()
+        try:
+            await self._client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            await self._connect()
+            await self._client.send_message(message)
+
+    async def close(self):
+        if self._client is not None and self._client.is_connected:
+            try:
+                await self._client.quit()
+            except aiosmtplib.SMTPException:
+                self._client.close()
+        self._client = None
+
+
+class EmailOutboxWorker:
+    """
+    Delivers the email_outbox table in the background.
+
+    A dispatcher claims due rows in batches, only as many as there are idle
+    workers, and hands them to a pool of delivery workers, each owning one
+    reused SMTP connection. Failed emails go back to pending with exponential
+    backoff until EMAIL_MAX_ATTEMPTS, a timed-out claim counts as an attempt.
+    """
+
+    def __init__(self, workers: int = EMAIL_WORKERS, batch_size: int = EMAIL_BATCH_SIZE, poll_interval: float = EMAIL_POLL_INTERVAL):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._loop = None
+        self._wakeup = None
+        self._batches = None
+        self._idle_workers = None
+        self._tasks = []
+
+    async def start(self):
+        if self.workers <= 0 or self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._batches = asyncio.Queue()
+        self._idle_workers = asyncio.Semaphore(self.workers)
+        self._tasks = [asyncio.create_task(self._dispatch())]
+        self._tasks += [asyncio.create_task(self._deliver()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def wake(self):
+        """
+        Ask the dispatcher to poll now instead of waiting for the next interval.
+        Safe to call from the request thread pool.
+        """
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _dispatch(self):
+        while True:
+            # Only claim what idle workers take right away, a claimed row must not
+            # wait in the queue long enough to be reclaimed by another process
+            await self._idle_workers.acquire()
+            idle = 1
+            while not self._idle_workers.locked():
+                await self._idle_workers.acquire()
+                idle += 1
+
+            try:
+                claimed = await asyncio.to_thread(_claim_batch, self.batch_size * idle)
+            except Exception as e:
+                print(f"Email outbox poll failed: {str(e)}")
+                claimed = []
+
+            batches = [claimed[start:start + self.batch_size] for start in range(0, len(claimed), self.batch_size)]
+            for batch in batches:
+                self._batches.put_nowait(batch)
+            for _ in range(idle - len(batches)):
+                self._idle_workers.release()
+
+            if len(claimed) < self.batch_size * idle:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def _deliver(self):
+        connection = SMTPConnection()
+        try:
+            while True:
+                batch = await self._batches.get()
+                sent_ids = []
+                failures = []
+                for email in batch:
+                    try:
+                        await connection.send(_build_message(email))
+                        sent_ids.append(email["id"])
+                    except Exception as e:
+                        print(f"Failed to send email to {email['recipient']}: {str(e)}")
+                        failures.append((email, str(e)))
+                        await connection.close()
+                try:
+                    await asyncio.to_thread(_record_results, sent_ids, failures)
+                except Exception as e:
+                    print(f"Failed to record email outbox results: {str(e)}")
+                finally:
+                    self._idle_workers.release()
+        finally:
+            await connection.close()
+
+
+email_outbox = EmailOutboxWorker()
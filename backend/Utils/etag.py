@@ -0,0 +1,133 @@
+import hashlib
+import re
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from Database.connection import AsyncSessionLocal
+from Models.Resource_version import Resource_version
+from Utils.cache import changed_tables
+from Utils.jwt_handler import verify_token
+
+# Resource -> tables whose writes change its listings
+ETAG_RESOURCES = {
+    "users": {"users"},
+    "events": {"events"},
+    "departments": {"department"},
+    "timetable": {"session", "classes", "rooms", "subjects", "users"},
+    # Not served as an ETag, tells the in-memory conflict indexes to rebuild
+    "sessions": {"session"},
+}
+
+# GET routes answered with an ETag -> resources their response is built from
+ETAG_ROUTES = {
+    "/fetch_all_users": ("users",),
+    "/fetch_events": ("events",),
+    "/fetch_all_departments": ("departments",),
+    "/fetch_sessions/{id}": ("timetable",),
+    "/fetch_class_session/{id}": ("timetable",),
+    "/fetch_class_session_for_director/{id}": ("timetable",),
+    "/fetch_session_for_students": ("timetable",),
+    "/fetch_session_for_professor": ("timetable",),
+}
+
+_route_patterns = [
+    (re.compile("^" + re.sub(r"\\{\w+\\}", r"[^/]+", re.escape(path)) + "$"), resources)
+    for path, resources in ETAG_ROUTES.items()
+]
+
+
+def ensure_resource_versions(db: Session):
+    """
+    Create the missing counter rows, so writes only ever update them
+    """
+    existing = {resource for (resource,) in db.query(Resource_version.resource).all()}
+    missing = [resource for resource in ETAG_RESOURCES if resource not in existing]
+    if missing:
+        db.add_all([Resource_version(resource=resource, version=0) for resource in missing])
+        db.commit()
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_resource_versions(session):
+    session.flush()
+    changed = changed_tables(session)
+    resources = [resource for resource, tables in ETAG_RESOURCES.items() if tables & changed]
+    if resources:
+        session.execute(
+            update(Resource_version)
+            .where(Resource_version.resource.in_(resources))
+            .values(version=Resource_version.version + 1)
+        )
+
+
+async def _resource_versions(resources: tuple) -> dict:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(Resource_version.resource, Resource_version.version)
+            .where(Resource_version.resource.in_(resources))
+        )).all()
+    return dict(rows)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return etag in [candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates]
+
+
+class ETagMiddleware:
+    """
+    Conditional GET for the listings in ETAG_ROUTES.
+
+    The ETag is derived from the versions of the resources a route reads,
+    the URL and the caller's id and role, so it changes whenever one of the
+    underlying tables is written or another user asks. A request whose
+    If-None-Match still matches gets 304 Not Modified before the listing is
+    queried or serialized. Requests without a valid token go through to the
+    route, which rejects them as before.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        resources = next((resources for pattern, resources in _route_patterns if pattern.match(scope["path"])), None)
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        authorization = headers.get("authorization", "")
+        payload = verify_token(authorization.split(" ")[1]) if resources and authorization.startswith("Bearer ") else None
+
+        if not payload or "sub" not in payload:
+            await self.app(scope, receive, send)
+            return
+
+        versions = await _resource_versions(resources)
+        fingerprint = "|".join([
+            ",".join(f"{resource}={versions.get(resource, 0)}" for resource in resources),
+            scope["path"],
+            scope.get("query_string", b"").decode("latin-1"),
+            str(payload["sub"]),
+            str(payload.get("role"))
+        ])
+        etag = '"' + hashlib.sha256(fingerprint.encode()).hexdigest()[:32] + '"'
+        etag_headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", b"private, no-cache"),
+            (b"vary", b"Authorization"),
+        ]
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            await send({"type": "http.response.start", "status": 304, "headers": etag_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message = {**message, "headers": list(message.get("headers", [])) + etag_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -1,7 +1,33 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import bcrypt
 
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hash a batch of passwords, fanned out over a process pool for large batches
+    """
+    global _hash_pool
+    if HASH_WORKERS <= 1 or len(passwords) < 2 * HASH_WORKERS:
+        return [hash_password(password) for password in passwords]
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return list(_hash_pool.map(hash_password, passwords, chunksize=max(len(passwords) // (4 * HASH_WORKERS), 1)))
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
\ No newline at end of file
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "memory" delivers within this process, "redis" fans out to every worker through MESSAGE_HUB_REDIS_URL
+MESSAGE_HUB_BACKEND = os.getenv("MESSAGE_HUB_BACKEND", "memory").lower()
+MESSAGE_HUB_REDIS_URL = os.getenv("MESSAGE_HUB_REDIS_URL", os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+MESSAGE_HUB_CHANNEL = os.getenv("MESSAGE_HUB_CHANNEL", "scholaria:messages")
+# Events buffered per socket before a slow client is disconnected
+MESSAGE_HUB_QUEUE_SIZE = int(os.getenv("MESSAGE_HUB_QUEUE_SIZE", 100))
+
+
+class HubConnection:
+    """
+    One open socket of a user. Events are queued on the socket's event loop
+    and the socket is closed once its client falls queue_size events behind.
+    """
+
+    def __init__(self, user_id: int, queue_size: int = MESSAGE_HUB_QUEUE_SIZE):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def push(self, event: dict):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The socket's loop is already closed
+            pass
+
+    def _put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class LocalBroker:
+    """
+    Delivers straight to the sockets of this process
+    """
+
+    def publish(self, payload: dict, deliver):
+        deliver(payload)
+
+    async def start(self, deliver):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class RedisBroker:
+    """
+    Publishes on a Redis channel every worker listens to, each worker then
+    delivers to its own sockets
+    """
+
+    def __init__(self, url: str = MESSAGE_HUB_REDIS_URL, channel: str = MESSAGE_HUB_CHANNEL):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("MESSAGE_HUB_BACKEND=redis requires the redis package (pip install redis)")
+        self.url = url
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._task = None
+
+    def publish(self, payload: dict, deliver):
+        self._client.publish(self.channel, json.dumps(payload, default=str))
+
+    async def start(self, deliver):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(deliver))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen(self, deliver):
+        import redis.asyncio as aioredis
+
+        while True:
+            try:
+                client = aioredis.Redis.from_url(self.url)
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.channel)
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            deliver(json.loads(message["data"]))
+                finally:
+                    await pubsub.aclose()
+                    await client.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Message hub listener failed: {str(e)}")
+                await asyncio.sleep(1)
+
+
+class MessageHub:
+    """
+    Fan-out of message events to the open sockets, keyed by user id.
+
+    publish() is safe to call from the request thread pool; call it after the
+    change is committed so clients never see an event for a rolled back write.
+    """
+
+    def __init__(self, broker=None):
+        self.broker = broker or (RedisBroker() if MESSAGE_HUB_BACKEND == "redis" else LocalBroker())
+        self._connections = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> HubConnection:
+        connection = HubConnection(user_id)
+        with self._lock:
+            self._connections[user_id].add(connection)
+        return connection
+
+    def unsubscribe(self, connection: HubConnection):
+        with self._lock:
+            connections = self._connections.get(connection.user_id)
+            if connections is not None:
+                connections.discard(connection)
+                if not connections:
+                    del self._connections[connection.user_id]
+
+    def publish(self, user_ids, event: dict):
+        self.broker.publish({"user_ids": sorted(set(user_ids)), "event": event}, self._deliver)
+
+    def _deliver(self, payload: dict):
+        with self._lock:
+            targets = [
+                connection
+                for user_id in payload["user_ids"]
+                for connection in self._connections.get(user_id, ())
+            ]
+        for connection in targets:
+            connection.push(payload["event"])
+
+    async def start(self):
+        await self.broker.start(self._deliver)
+
+    async def stop(self):
+        await self.broker.stop()
+
+
+message_hub = MessageHub()
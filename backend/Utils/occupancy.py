@@ -0,0 +1,219 @@
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from Models.Ratrapage import Ratrapage
+from Models.Rooms import Room
+from Models.Session import Weekday
+from Utils.timetable_conflicts import SLOT_MINUTES, slot_mask, timetable_conflicts
+
+MINUTES_PER_DAY = 24 * 60
+SLOTS_PER_DAY = MINUTES_PER_DAY // SLOT_MINUTES
+
+
+class Occupancy(NamedTuple):
+    kind: str      # "room", "professor" or "class"
+    source: str    # "session" (weekly) or "ratrapage" (dated)
+    id: int
+
+
+def weekday_of(day: date) -> Weekday:
+    return list(Weekday)[day.weekday()]
+
+
+def slot_minutes(start_time: datetime, end_time: datetime) -> tuple[int, int]:
+    """
+    Minutes since midnight of a dated slot, a slot ending on a later day runs to midnight
+    """
+    start_minute = start_time.hour * 60 + start_time.minute
+    end_minute = MINUTES_PER_DAY if end_time.date() > start_time.date() else end_time.hour * 60 + end_time.minute
+    return start_minute, end_minute
+
+
+def find_occupancy(db: Session, day: date, start_time: datetime, end_time: datetime,
+                   room_id: int, professor_id: int, class_id: int,
+                   exclude_ratrapage_id: int | None = None) -> Occupancy | None:
+    """
+    What already occupies the room, the professor or the class during a
+    dated slot, or None if all three are free.
+
+    Weekly sessions are projected onto the date: the ones held on its
+    weekday come from the in-memory interval indexes. Ratrapages are
+    dated, they are matched in SQL through the (room|user|class, date)
+    indexes.
+    """
+    start_minute, end_minute = slot_minutes(start_time, end_time)
+    conflict = timetable_conflicts.find_conflict(
+        db, weekday_of(day), start_minute, end_minute,
+        room_id=room_id, professor_id=professor_id, class_id=class_id
+    )
+    if conflict:
+        kind, session_id = conflict
+        return Occupancy(kind, "session", session_id)
+
+    query = db.query(Ratrapage.id, Ratrapage.room_id, Ratrapage.user_id, Ratrapage.class_id).filter(
+        Ratrapage.date == day,
+        or_(Ratrapage.room_id == room_id, Ratrapage.user_id == professor_id, Ratrapage.class_id == class_id),
+        Ratrapage.start_time < end_time,
+        Ratrapage.end_time > start_time
+    )
+    if exclude_ratrapage_id is not None:
+        query = query.filter(Ratrapage.id != exclude_ratrapage_id)
+
+    row = query.first()
+    if row is None:
+        return None
+    kind = "room" if row.room_id == room_id else "professor" if row.user_id == professor_id else "class"
+    return Occupancy(kind, "ratrapage", row.id)
+
+
+def available_rooms(db: Session, day: Weekday, start_minute: int, end_minute: int,
+                    on_date: date | None = None, department_id: int | None = None,
+                    room_type: str | None = None) -> list:
+    """
+    Rooms free during [start_minute, end_minute) on a weekday, or on a date
+    when on_date is given (its ratrapages are then taken into account).
+
+    Each room's weekly occupancy is a bitmap of 15-minute slots kept by the
+    conflict indexes, so a room is checked with a single AND. Slots are
+    rounded outwards: a room busy until 10:10 is not offered from 10:10.
+    """
+    rooms_query = db.query(Room.room_id, Room.room_name, Room.type, Room.department_id)
+    if department_id is not None:
+        rooms_query = rooms_query.filter(Room.department_id == department_id)
+    if room_type is not None:
+        rooms_query = rooms_query.filter(Room.type == room_type)
+    rooms = rooms_query.order_by(Room.room_id).all()
+    if not rooms:
+        return []
+
+    room_ids = [room.room_id for room in rooms]
+    occupied = timetable_conflicts.room_slots(db, day, room_ids)
+
+    if on_date is not None:
+        booked = db.query(Ratrapage.room_id, Ratrapage.start_time, Ratrapage.end_time).filter(
+            Ratrapage.date == on_date,
+            Ratrapage.room_id.in_(room_ids)
+        )
+        for room_id, start_time, end_time in booked:
+            occupied[room_id] |= slot_mask(*slot_minutes(start_time, end_time))
+
+    wanted = slot_mask(start_minute, end_minute)
+    return [room for room in rooms if not occupied[room.room_id] & wanted]
+
+
+def _slot_grid(masks: list[int]) -> np.ndarray:
+    """
+    len(masks) x SLOTS_PER_DAY boolean grid of slot bitmaps, bit i -> column i
+    """
+    packed = np.frombuffer(b"".join(mask.to_bytes(SLOTS_PER_DAY // 8, "little") for mask in masks), dtype=np.uint8)
+    return np.unpackbits(packed, bitorder="little").reshape(len(masks), SLOTS_PER_DAY).view(bool)
+
+
+def _mark_slots(grid: np.ndarray, rows: np.ndarray, start_minutes: np.ndarray, end_minutes: np.ndarray):
+    """
+    Set the slots each [start, end) touches on its row of grid
+    """
+    starts = start_minutes // SLOT_MINUTES
+    lengths = np.maximum(np.minimum(-(-end_minutes // SLOT_MINUTES), SLOTS_PER_DAY) - starts, 0)
+    # One (row, slot) pair per slot covered: each interval repeated over its length
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    grid[np.repeat(rows, lengths), np.repeat(starts, lengths) + offsets] = True
+
+
+def _free_windows(busy: np.ndarray, length: int) -> np.ndarray:
+    """
+    True at slot s when the length slots starting there are all free
+    """
+    starts = busy.shape[-1] - length + 1
+    taken = busy[..., :starts].copy()
+    for shift in range(1, length):
+        taken |= busy[..., shift:shift + starts]
+    return ~taken
+
+
+def suggest_slots(db: Session, class_id: int, professor_id: int, department_id: int,
+                  duration_minutes: int, date_from: date, date_to: date,
+                  day_start_minute: int, day_end_minute: int, limit: int,
+                  room_type: str | None = None) -> list[dict]:
+    """
+    The earliest slots of the date window, within the daily hours, where
+    the professor, the class and one of the department's rooms are all free
+    for duration_minutes.
+
+    The weekly bitmaps of the conflict indexes are spread over the window's
+    dates and the window's ratrapages marked on top, giving boolean grids of
+    15-minute slots: one row per date for the professor and the class, one
+    per room and date for the rooms. Free windows are then found for every
+    start at once. Starts are aligned on 15 minutes, partly used slots count
+    as busy.
+    """
+    rooms_query = db.query(Room.room_id, Room.room_name).filter(Room.department_id == department_id)
+    if room_type is not None:
+        rooms_query = rooms_query.filter(Room.type == room_type)
+    rooms = rooms_query.order_by(Room.room_id).all()
+    if not rooms:
+        return []
+
+    room_ids = [room.room_id for room in rooms]
+    room_index = {room_id: index for index, room_id in enumerate(room_ids)}
+    day_count = (date_to - date_from).days + 1
+    day_weekdays = (date_from.weekday() + np.arange(day_count)) % 7
+
+    professor_weekly = timetable_conflicts.weekly_slots(db, "professor", [professor_id])[professor_id]
+    class_weekly = timetable_conflicts.weekly_slots(db, "class", [class_id])[class_id]
+    rooms_weekly = timetable_conflicts.weekly_slots(db, "room", room_ids)
+
+    people_busy = _slot_grid([a | b for a, b in zip(professor_weekly, class_weekly)])[day_weekdays]
+    # One row per room and date, room after room: row r * day_count + d. The ratrapages are
+    # marked on this array itself, a reshape of a gathered array can be a copy
+    room_days_busy = _slot_grid([mask for room_id in room_ids for mask in rooms_weekly[room_id]])[
+        (np.arange(len(room_ids))[:, None] * 7 + day_weekdays).ravel()
+    ]
+
+    ratrapages = db.query(
+        Ratrapage.room_id, Ratrapage.user_id, Ratrapage.class_id,
+        Ratrapage.date, Ratrapage.start_time, Ratrapage.end_time
+    ).filter(
+        Ratrapage.date >= date_from,
+        Ratrapage.date <= date_to,
+        or_(
+            Ratrapage.room_id.in_(room_ids),
+            Ratrapage.user_id == professor_id,
+            Ratrapage.class_id == class_id
+        )
+    ).all()
+    if ratrapages:
+        booked_rooms, booked_users, booked_classes, booked_days, booked_starts, booked_ends = (np.array(column) for column in zip(*(
+            (room_index.get(room_id, -1), user_id, booked_class_id, (day - date_from).days, *slot_minutes(start_time, end_time))
+            for room_id, user_id, booked_class_id, day, start_time, end_time in ratrapages
+        )))
+        people = (booked_users == professor_id) | (booked_classes == class_id)
+        _mark_slots(people_busy, booked_days[people], booked_starts[people], booked_ends[people])
+        in_rooms = booked_rooms >= 0
+        _mark_slots(room_days_busy, booked_rooms[in_rooms] * day_count + booked_days[in_rooms],
+                    booked_starts[in_rooms], booked_ends[in_rooms])
+    rooms_busy = room_days_busy.reshape(len(room_ids), day_count, SLOTS_PER_DAY)
+
+    length = -(-duration_minutes // SLOT_MINUTES)
+    starts = np.arange(SLOTS_PER_DAY - length + 1) * SLOT_MINUTES
+    within_hours = (starts >= day_start_minute) & (starts + duration_minutes <= day_end_minute)
+    rooms_free = _free_windows(rooms_busy, length)
+    candidates = _free_windows(people_busy, length) & rooms_free.any(axis=0) & within_hours
+
+    # np.nonzero walks the grid row by row: earliest date first, then earliest start
+    days, slots = np.nonzero(candidates)
+    days, slots = days[:limit], slots[:limit]
+    first_free_room = rooms_free[:, days, slots].argmax(axis=0)
+
+    return [
+        {
+            "date": date_from + timedelta(days=int(day)),
+            "start_minute": int(slot) * SLOT_MINUTES,
+            "end_minute": int(slot) * SLOT_MINUTES + duration_minutes,
+            "room_id": rooms[room].room_id,
+            "room_name": rooms[room].room_name
+        }
+        for day, slot, room in zip(days, slots, first_free_room)
+    ]
@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+import os
+from dotenv import load_dotenv
+from fastapi import HTTPException, Response
+from sqlalchemy.orm import Query
+
+load_dotenv()
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 500))
+
+
+def clamp_page_size(page_size: int) -> int:
+    return min(max(page_size, 1), MAX_PAGE_SIZE)
+
+
+def page_window(page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> tuple[int, int, int]:
+    """
+    Clamp the requested page and page size, returns (page, page_size, offset)
+    """
+    page = max(page, 1)
+    page_size = clamp_page_size(page_size)
+    return page, page_size, (page - 1) * page_size
+
+
+def total_pages(total: int, page_size: int) -> int:
+    return (total + page_size - 1) // page_size
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    """
+    Id of the last row of the previous page, None for the first page
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(values["after"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(rows: list, page_size: int, key) -> tuple[list, str | None]:
+    """
+    Split the page_size + 1 rows fetched after the cursor into the page and the
+    cursor of the next one, None on the last page
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def paginate_by_id(query: Query, id_column, cursor: str | None, page_size: int | None, response: Response) -> list:
+    """
+    The rows of query in id_column order: all of them when neither cursor nor
+    page_size is given, otherwise the keyset page after cursor, with the
+    cursor of the next page in the X-Next-Cursor header
+    """
+    query = query.order_by(id_column)
+    if cursor is None and page_size is None:
+        return query.all()
+
+    page_size = clamp_page_size(page_size or DEFAULT_PAGE_SIZE)
+    after_id = decode_cursor(cursor)
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    rows, next_cursor = keyset_page(
+        query.limit(page_size + 1).all(),
+        page_size,
+        key=lambda row: getattr(row, id_column.key)
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
@@ -0,0 +1,264 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from fastapi import HTTPException
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from Models.Session import Session as SessionModel, Weekday, parse_minutes
+from Models.Resource_version import Resource_version
+
+# Resource version bumped by every commit that writes the session table
+SESSIONS_RESOURCE = "sessions"
+
+# Room availability is answered on 15-minute slots, bit i of a day's bitmap
+# covers minutes [15 * i, 15 * (i + 1))
+SLOT_MINUTES = 15
+
+CONFLICT_KINDS = ("room", "professor", "class")
+CONFLICT_COLUMNS = {
+    "room": SessionModel.room_id,
+    "professor": SessionModel.professor_id,
+    "class": SessionModel.class_id,
+}
+
+
+def time_to_minutes(value: str) -> int:
+    try:
+        return parse_minutes(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid time '{value}', expected HH:MM")
+
+
+def to_weekday(value: str) -> Weekday:
+    try:
+        return Weekday.parse(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid day '{value}', expected a weekday such as Monday")
+
+
+def slot_mask(start_minute: int, end_minute: int) -> int:
+    """
+    Bitmap of the slots [start_minute, end_minute) touches, a partly used slot counts as used
+    """
+    first = start_minute // SLOT_MINUTES
+    last = -(-end_minute // SLOT_MINUTES)
+    return ((1 << (last - first)) - 1) << first if last > first else 0
+
+
+def session_overlaps(day: Weekday, start_minute: int, end_minute: int):
+    """
+    SQL predicate: the session runs on day and overlaps [start_minute, end_minute).
+    Combined with a room, professor or class filter it is a range scan of the
+    ix_session_day_*_start indexes.
+    """
+    return and_(
+        SessionModel.day == day,
+        SessionModel.start_minute < end_minute,
+        SessionModel.end_minute > start_minute
+    )
+
+
+class IntervalIndex:
+    """
+    The [start, end) intervals of one room, professor or class on one day,
+    sorted by start.
+
+    An interval overlapping [start, end) starts before end and no earlier
+    than start - the longest interval, so a lookup bisects to that window
+    and only walks the intervals inside it.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._intervals = []
+        self._max_length = 0
+        self._slots = None
+
+    def add(self, start: int, end: int, session_id: int):
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._intervals.insert(position, (start, end, session_id))
+        self._max_length = max(self._max_length, end - start)
+        self._slots = None
+
+    def remove(self, session_id: int):
+        for position, interval in enumerate(self._intervals):
+            if interval[2] == session_id:
+                del self._starts[position]
+                del self._intervals[position]
+                self._slots = None
+                return
+
+    def overlapping(self, start: int, end: int, exclude_session_id: int | None = None) -> int | None:
+        position = bisect_left(self._starts, end) - 1
+        while position >= 0 and self._starts[position] > start - self._max_length:
+            _, interval_end, session_id = self._intervals[position]
+            if interval_end > start and session_id != exclude_session_id:
+                return session_id
+            position -= 1
+        return None
+
+    def occupied_slots(self) -> int:
+        """
+        slot_mask() of every interval, computed once per change
+        """
+        if self._slots is None:
+            slots = 0
+            for start, end, _ in self._intervals:
+                slots |= slot_mask(start, end)
+            self._slots = slots
+        return self._slots
+
+    def __len__(self):
+        return len(self._intervals)
+
+
+class TimetableConflicts:
+    """
+    In-memory room, professor and class interval indexes over the weekly
+    sessions, answering overlap checks without loading the day's sessions.
+
+    The indexes are tagged with the "sessions" resource version they were
+    built from, None while they need a rebuild. A check first reads that version, so a session written by
+    another worker triggers a rebuild; the writes of this process are
+    applied in place with added() and removed() after their commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = defaultdict(IntervalIndex)
+        self._session_keys = {}
+        self._version = None
+
+    @staticmethod
+    def _current_version(db: Session) -> int | None:
+        return db.query(Resource_version.version).filter(Resource_version.resource == SESSIONS_RESOURCE).scalar()
+
+    def _add(self, session_id, room_id, professor_id, class_id, day, start_minute, end_minute):
+        keys = [(kind, resource_id, day) for kind, resource_id in zip(CONFLICT_KINDS, (room_id, professor_id, class_id))]
+        for key in keys:
+            self._indexes[key].add(start_minute, end_minute, session_id)
+        self._session_keys[session_id] = keys
+
+    def _remove(self, session_id: int):
+        for key in self._session_keys.pop(session_id, ()):
+            self._indexes[key].remove(session_id)
+
+    def load(self, db: Session):
+        """
+        Rebuild the indexes from the session table
+        """
+        version = self._current_version(db)
+        rows = db.query(
+            SessionModel.session_id,
+            SessionModel.room_id,
+            SessionModel.professor_id,
+            SessionModel.class_id,
+            SessionModel.day,
+            SessionModel.start_minute,
+            SessionModel.end_minute
+        ).all()
+        with self._lock:
+            self._indexes = defaultdict(IntervalIndex)
+            self._session_keys = {}
+            for row in rows:
+                self._add(*row)
+            self._version = version
+
+    def _refresh(self, db: Session):
+        if self._version is None or self._current_version(db) != self._version:
+            self.load(db)
+
+    def room_slots(self, db: Session, day: Weekday, room_ids: list[int]) -> dict[int, int]:
+        """
+        room id -> bitmap of the slots its weekly sessions occupy on day
+        """
+        self._refresh(db)
+        with self._lock:
+            slots = {}
+            for room_id in room_ids:
+                index = self._indexes.get(("room", room_id, day))
+                slots[room_id] = index.occupied_slots() if index else 0
+            return slots
+
+    def weekly_slots(self, db: Session, kind: str, resource_ids: list[int]) -> dict[int, list[int]]:
+        """
+        resource id -> the slot bitmaps of its weekly sessions, one per weekday from Monday
+        """
+        self._refresh(db)
+        with self._lock:
+            slots = {}
+            for resource_id in resource_ids:
+                indexes = (self._indexes.get((kind, resource_id, day)) for day in Weekday)
+                slots[resource_id] = [index.occupied_slots() if index else 0 for index in indexes]
+            return slots
+
+    def find_conflict(self, db: Session, day: Weekday, start_minute: int, end_minute: int,
+                      room_id: int, professor_id: int, class_id: int,
+                      exclude_session_id: int | None = None) -> tuple[str, int] | None:
+        """
+        (kind, session_id) of a session overlapping the slot in the same room,
+        with the same professor or for the same class, or None if it is free
+        """
+        for attempt in range(2):
+            if attempt:
+                self.load(db)
+            else:
+                self._refresh(db)
+
+            with self._lock:
+                conflict = None
+                for kind, resource_id in zip(CONFLICT_KINDS, (room_id, professor_id, class_id)):
+                    index = self._indexes.get((kind, resource_id, day))
+                    session_id = index.overlapping(start_minute, end_minute, exclude_session_id) if index else None
+                    if session_id is not None:
+                        conflict = (kind, session_id)
+                        break
+
+            if conflict is None:
+                return None
+
+            # The database stays the authority: confirm with the indexed range query, so a
+            # session removed without a version bump (e.g. a database-level cascade) cannot
+            # block the slot for good
+            kind, _ = conflict
+            resource_id = {"room": room_id, "professor": professor_id, "class": class_id}[kind]
+            query = db.query(SessionModel.session_id).filter(
+                CONFLICT_COLUMNS[kind] == resource_id,
+                session_overlaps(day, start_minute, end_minute)
+            )
+            if exclude_session_id is not None:
+                query = query.filter(SessionModel.session_id != exclude_session_id)
+            session_id = query.limit(1).scalar()
+            if session_id is not None:
+                return kind, session_id
+        return None
+
+    def added(self, db: Session, session: SessionModel):
+        """
+        Call after committing a new session
+        """
+        self._apply(db, lambda: self._add(
+            session.session_id, session.room_id, session.professor_id, session.class_id,
+            session.day, session.start_minute, session.end_minute
+        ))
+
+    def removed(self, db: Session, session_id: int):
+        """
+        Call after committing the deletion of a session
+        """
+        self._apply(db, lambda: self._remove(session_id))
+
+    def _apply(self, db: Session, change):
+        version = self._current_version(db)
+        with self._lock:
+            # Exactly one commit since the build: it is ours, apply it in place.
+            # Otherwise another worker wrote sessions too, the next check rebuilds.
+            if self._version is not None and version == self._version + 1:
+                change()
+                self._version = version
+            else:
+                self._version = None
+
+
+timetable_conflicts = TimetableConflicts()
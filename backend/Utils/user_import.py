@@ -0,0 +1,302 @@
+import asyncio
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import event, insert, or_
+from sqlalchemy.orm import Session
+from Database.connection import SessionLocal
+from Models.Users import Users
+from Models.Classes import Classes
+from Models.Import_job import Import_job
+from Models.Import_job_row import Import_job_row
+from Utils.csv_reader import count_csv_rows, read_csv_chunks
+from Utils.hasher import hash_passwords
+from Utils.email_sender import credentials_email
+from Utils.email_queue import enqueue_email
+
+load_dotenv()
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+IMPORT_UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR", os.path.join("uploads", "imports"))
+IMPORT_POLL_INTERVAL = float(os.getenv("IMPORT_POLL_INTERVAL", 5))
+# A running job whose heartbeat is older than this belongs to a process that died mid-import
+IMPORT_STALE_SECONDS = float(os.getenv("IMPORT_STALE_SECONDS", 600))
+
+REQUIRED_COLUMNS = ["first_name", "last_name", "department", "email",
+                    "password_hashed", "role", "class_name"]
+
+
+def create_import_job(db: Session, admin_id: int, file: UploadFile) -> Import_job:
+    """
+    Spool the upload to IMPORT_UPLOAD_DIR and queue an import job for it as part
+    of the caller's transaction. The worker picks it up once it is committed.
+    """
+    job_id = uuid.uuid4().hex
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.abspath(os.path.join(IMPORT_UPLOAD_DIR, f"{job_id}.csv"))
+    with open(file_path, "wb") as spooled:
+        shutil.copyfileobj(file.file, spooled)
+
+    job = Import_job(
+        id=job_id,
+        admin_id=admin_id,
+        filename=file.filename,
+        file_path=file_path,
+        status="queued"
+    )
+    db.add(job)
+    event.listen(db, "after_commit", lambda session: import_worker.wake(), once=True)
+    return job
+
+
+def _claim_job() -> str | None:
+    now = datetime.now(timezone.utc)
+    stale_heartbeat = now - timedelta(seconds=IMPORT_STALE_SECONDS)
+
+    db = SessionLocal()
+    try:
+        job = (
+            db.query(Import_job)
+            .filter(or_(
+                Import_job.status == "queued",
+                (Import_job.status == "running") & (Import_job.heartbeat_at < stale_heartbeat)
+            ))
+            .order_by(Import_job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if not job:
+            return None
+
+        job.status = "running"
+        job.heartbeat_at = now
+        if job.started_at is None:
+            job.started_at = now
+        job_id = job.id
+        db.commit()
+        return job_id
+    finally:
+        db.close()
+
+
+def _finish_job(db: Session, job: Import_job, status: str, error: str | None = None):
+    job.status = status
+    job.error = error
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+    if os.path.exists(job.file_path):
+        os.remove(job.file_path)
+
+
+def _fail_job(db: Session, job_id: str, error: str):
+    """
+    Mark a job failed after an error, unless its row is gone
+    """
+    job = db.get(Import_job, job_id)
+    if job is None:
+        print(f"User import {job_id} no longer exists, its failure was not recorded")
+        return
+    _finish_job(db, job, "failed", error)
+
+
+def run_user_import(job_id: str, stop_requested: threading.Event | None = None):
+    """
+    Import the users of a queued job chunk by chunk.
+
+    Each chunk is checked against the pre-loaded class-name -> id map and the
+    existing emails, hashed on the process pool and inserted with one
+    multi-row INSERT. Its per-row outcomes, credential emails and the job
+    counters are written in the same transaction, so a job interrupted by a
+    restart resumes after its last committed chunk.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(Import_job, job_id)
+        if job is None:
+            print(f"User import {job_id} skipped: no such job")
+            return
+
+        if not os.path.exists(job.file_path):
+            _finish_job(db, job, "failed", "Uploaded file is no longer available")
+            return
+
+        if job.total_rows is None:
+            job.total_rows = count_csv_rows(job.file_path)
+            db.commit()
+
+        # Class names are not unique: the lowest id wins, as in the class_id backfill of migration 0004
+        class_ids = {}
+        for class_id, name in db.query(Classes.id, Classes.name).order_by(Classes.id):
+            class_ids.setdefault(name, class_id)
+
+        row_number = 0
+        for chunk in read_csv_chunks(job.file_path, REQUIRED_COLUMNS, IMPORT_CHUNK_SIZE):
+            first_row_number = row_number + 1
+            row_number += len(chunk)
+            if row_number <= job.processed_rows:
+                continue
+
+            if stop_requested is not None and stop_requested.is_set():
+                # Hand the job back so the next start resumes it right away
+                job.status = "queued"
+                db.commit()
+                return
+
+            numbered_rows = [
+                (first_row_number + index, row)
+                for index, row in enumerate(chunk)
+                if first_row_number + index > job.processed_rows
+            ]
+
+            chunk_emails = [row["email"] for _, row in numbered_rows if row["email"]]
+            existing_emails = {
+                email for (email,) in db.query(Users.email).filter(Users.email.in_(chunk_emails)).all()
+            }
+
+            outcomes = []
+            accepted = []
+            for number, row in numbered_rows:
+                if not row["email"] or not row["password_hashed"]:
+                    outcome, detail = "invalid_row", "email and password_hashed are required"
+                elif row["email"] in existing_emails:
+                    outcome, detail = "duplicate_email", "A user with this email already exists"
+                elif row["class_name"] and row["class_name"] not in class_ids:
+                    outcome, detail = "unknown_class", f"Class {row['class_name']} not found"
+                else:
+                    outcome, detail = "inserted", None
+                    existing_emails.add(row["email"])
+                    accepted.append(row)
+
+                outcomes.append({
+                    "job_id": job_id,
+                    "row_number": number,
+                    "email": row["email"],
+                    "outcome": outcome,
+                    "detail": detail
+                })
+
+            plain_passwords = [row["password_hashed"] for row in accepted]
+            hashed_passwords = hash_passwords(plain_passwords)
+
+            if accepted:
+                db.execute(insert(Users), [
+                    {
+                        "first_name": row["first_name"],
+                        "last_name": row["last_name"],
+                        "email": row["email"],
+                        "password_hashed": hashed_password,
+                        "role": row["role"],
+                        "department": row["department"],
+                        "class_name": row["class_name"],
+                        "class_id": class_ids.get(row["class_name"])
+                    }
+                    for row, hashed_password in zip(accepted, hashed_passwords)
+                ])
+
+                for row, plain_password in zip(accepted, plain_passwords):
+                    enqueue_email(db, row["email"], *credentials_email(
+                        email=row["email"],
+                        first_name=row["first_name"],
+                        last_name=row["last_name"],
+                        password=plain_password
+                    ), sensitive=True)
+
+            db.execute(insert(Import_job_row), outcomes)
+
+            job.processed_rows = row_number
+            job.inserted_rows += len(accepted)
+            job.duplicate_rows += sum(1 for o in outcomes if o["outcome"] == "duplicate_email")
+            job.unknown_class_rows += sum(1 for o in outcomes if o["outcome"] == "unknown_class")
+            job.invalid_rows += sum(1 for o in outcomes if o["outcome"] == "invalid_row")
+            job.emails_queued += len(accepted)
+            job.heartbeat_at = datetime.now(timezone.utc)
+            db.commit()
+
+        _finish_job(db, job, "completed")
+
+    except HTTPException as e:
+        db.rollback()
+        print(f"User import {job_id} failed: {e.detail}")
+        _fail_job(db, job_id, e.detail)
+    except Exception as e:
+        db.rollback()
+        print(f"User import {job_id} failed: {str(e)}")
+        _fail_job(db, job_id, str(e))
+    finally:
+        db.close()
+
+
+class ImportJobWorker:
+    """
+    Runs queued import jobs one at a time in the background.
+
+    Jobs live in the import_jobs table, so the ones still queued or
+    interrupted when the process stops are picked up on the next start.
+    """
+
+    def __init__(self, poll_interval: float = IMPORT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._loop = None
+        self._wakeup = None
+        self._stop_requested = threading.Event()
+        self._task = None
+        self._running = None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stop_requested.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # Let the running chunk commit, then hand the job back to the queue
+        self._stop_requested.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        # Cancelling the task does not stop its thread: wait for the import to
+        # return, the hash pool it uses is shut down right after
+        if self._running is not None:
+            await asyncio.gather(self._running, return_exceptions=True)
+            self._running = None
+        self._task = None
+        self._loop = None
+
+    def wake(self):
+        """
+        Ask the worker to look for queued jobs now instead of waiting for the next poll.
+        Safe to call from the request thread pool.
+        """
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while True:
+            try:
+                job_id = await asyncio.to_thread(_claim_job)
+            except Exception as e:
+                print(f"Import job poll failed: {str(e)}")
+                job_id = None
+
+            if job_id:
+                self._running = asyncio.ensure_future(asyncio.to_thread(run_user_import, job_id, self._stop_requested))
+                await asyncio.shield(self._running)
+                self._running = None
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+import_worker = ImportJobWorker()
@@ -0,0 +1,399 @@
+"""
+The absence-by-subject reports on 50k absences, against the per-session
+loops they replaced, served from the same app. The loops are kept here
+verbatim from before the set-based rewrite.
+"""
+from datetime import date, timedelta
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session as DbSession
+from benchmarks.harness import count_statements, measure, print_table, running_app, session
+from Database.connection import connect_databse
+from Models.Absence import Absence
+from Models.Classes import Classes
+from Models.Session import Session
+from Models.Subjects import Subjects
+from Models.Users import Users
+from Utils.jwt_handler import verify_token
+from tests.factories import add_students, add_user, auth_header, seed_department
+import main as app_main
+
+CLASSES = 10
+STUDENTS_PER_CLASS = 50
+SESSIONS_PER_CLASS = 4
+WEEKS = 25
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def _seed():
+    """
+    10 classes of 50 students, 4 weekly sessions each across 8 subjects and
+    4 professors, and 25 weeks of roll calls: 50,000 absence records
+    """
+    with session() as db:
+        department = seed_department(db)
+        professors = [department.professor] + [add_user(db, "professor") for _ in range(3)]
+        subjects = [department.subject]
+        for index in range(7):
+            subjects.append(Subjects(subject_name=f"Subject {index}", multiplier=1, professor_id=professors[(index + 1) % 4].user_id, department_id=department.department.id))
+        db.add_all(subjects)
+        db.flush()
+
+        sessions = []
+        for class_index in range(CLASSES):
+            class_ = department.class_ if class_index == 0 else Classes(name=f"CS{class_index + 1}", capacity=60, department_id=department.department.id)
+            db.add(class_)
+            db.flush()
+            students = add_students(db, class_, STUDENTS_PER_CLASS)
+            for slot in range(SESSIONS_PER_CLASS):
+                subject = subjects[(class_index + slot) % len(subjects)]
+                sessions.append((Session(
+                    class_id=class_.id,
+                    room_id=department.room.room_id,
+                    professor_id=subject.professor_id,
+                    subject_id=subject.subject_id,
+                    start_time=f"{8 + 2 * slot:02d}:00",
+                    end_time=f"{10 + 2 * slot:02d}:00",
+                    day=DAYS[class_index % len(DAYS)]
+                ), students))
+        db.add_all([weekly for weekly, _ in sessions])
+        db.flush()
+
+        db.execute(insert(Absence), [
+            {
+                "user_id": student.user_id,
+                "class_id": weekly.class_id,
+                "session_id": weekly.session_id,
+                "date": date(2026, 1, 5) + timedelta(weeks=week),
+                "is_absent": (student.user_id + week) % 7 == 0
+            }
+            for weekly, students in sessions
+            for student in students
+            for week in range(WEEKS)
+        ])
+        db.commit()
+        return department.admin.user_id, department.director.user_id, department.professor.user_id
+
+
+def _by_absence_id(report: dict) -> dict:
+    """
+    The per-session loops listed a session's students in whatever order its
+    unordered query returned them, the set-based report in absence id order
+    """
+    for subject in report["subjects"]:
+        for listed_session in subject["sessions"]:
+            listed_session["students"].sort(key=lambda student: student["absence_id"])
+    return report
+
+
+def main():
+    app_main.app.add_api_route("/benchmark/per_session/admin_all_absences_by_subject", per_session_admin_report)
+    app_main.app.add_api_route("/benchmark/per_session/professor_subject_absences", per_session_professor_report)
+
+    rows = []
+    with running_app() as client:
+        admin_id, director_id, professor_id = _seed()
+        admin = auth_header(admin_id, "administrative")
+        director = auth_header(director_id, "director")
+        professor = auth_header(professor_id, "professor")
+        calls = [
+            ("admin", "per-session (before)", "/benchmark/per_session/admin_all_absences_by_subject", admin),
+            ("admin", "set-based", "/admin_all_absences_by_subject", admin),
+            ("director", "set-based", "/director_all_absences_by_subject", director),
+            ("professor", "per-session (before)", "/benchmark/per_session/professor_subject_absences", professor),
+            ("professor", "set-based", "/professor_subject_absences", professor),
+        ]
+        responses = {}
+        for report, variant, path, headers in calls:
+            def call():
+                response = client.get(path, headers=headers)
+                assert response.status_code == 200, f"{path}: {response.text}"
+                responses[report, variant] = response.json()
+
+            elapsed = measure(call, repeat=3)
+            rows.append([report, variant, count_statements(call), elapsed])
+
+        # Same report, only faster
+        assert _by_absence_id(responses["admin", "per-session (before)"]) == _by_absence_id(responses["admin", "set-based"])
+        assert _by_absence_id(responses["professor", "per-session (before)"]) == _by_absence_id(responses["professor", "set-based"])
+        records = sum(subject["total_records"] for subject in responses["admin", "set-based"]["subjects"])
+
+    print_table(f"Absence-by-subject reports over {records} records, median of 3 (ms)", ["report", "variant", "statements", "ms"], rows)
+
+
+def per_session_professor_report(
+    authorization: str | None = Header(None),
+    db: Session = Depends(connect_databse)
+):
+    """
+    Fetch all student absences for subjects that the professor teaches
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+
+    token = authorization.split(" ")[1]
+    payload = verify_token(token)
+
+    if not payload or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    professor_id = payload["sub"]
+
+    found_professor = db.query(Users).filter(
+        Users.user_id == professor_id,
+        Users.role == "professor"
+    ).first()
+
+    if not found_professor:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Get all sessions taught by this professor
+    professor_sessions = db.query(Session).filter(
+        Session.professor_id == professor_id
+    ).all()
+    
+    if not professor_sessions:
+        return {
+            "professor_id": professor_id,
+            "professor_name": f"{found_professor.first_name} {found_professor.last_name}",
+            "total_subjects": 0,
+            "total_students": 0,
+            "total_absences": 0,
+            "subjects": []
+        }
+    
+    # Get unique subject IDs
+    subject_ids = list(set([s.subject_id for s in professor_sessions if s.subject_id]))
+    
+    # Group data by subject
+    subjects_dict = {}
+    
+    for session in professor_sessions:
+        if not session.subject:
+            continue
+            
+        subject_id = session.subject_id
+        subject_name = session.subject.subject_name
+        
+        if subject_id not in subjects_dict:
+            subjects_dict[subject_id] = {
+                "subject_id": subject_id,
+                "subject_name": subject_name,
+                "sessions": {},
+                "total_students": set(),
+                "total_absences": 0,
+                "total_present": 0
+            }
+        
+        # Get all absences for this session
+        session_absences = db.query(Absence).filter(
+            Absence.session_id == session.session_id
+        ).all()
+        
+        if session.session_id not in subjects_dict[subject_id]["sessions"]:
+            subjects_dict[subject_id]["sessions"][session.session_id] = {
+                "session_id": session.session_id,
+                "class_id": session.class_id,
+                "class_name": session.class_.name if session.class_ else "Unknown",
+                "room": session.room.room_name if session.room else "Unknown",
+                "day": session.day,
+                "start_time": session.start_time,
+                "end_time": session.end_time,
+                "students": []
+            }
+        
+        # Add student absences
+        for absence in session_absences:
+            student = absence.user
+            if student:
+                subjects_dict[subject_id]["total_students"].add(student.user_id)
+                
+                student_data = {
+                    "user_id": student.user_id,
+                    "first_name": student.first_name,
+                    "last_name": student.last_name,
+                    "email": student.email,
+                    "absence_id": absence.id,
+                    "is_absent": absence.is_absent,
+                    "date": absence.date.isoformat() if absence.date else None,
+                    "recorded_at": absence.date.strftime("%B %d, %Y") if absence.date else "Unknown"
+                }
+                
+                subjects_dict[subject_id]["sessions"][session.session_id]["students"].append(student_data)
+                
+                if absence.is_absent:
+                    subjects_dict[subject_id]["total_absences"] += 1
+                else:
+                    subjects_dict[subject_id]["total_present"] += 1
+    
+    # Convert to list format
+    subjects_list = []
+    total_all_students = set()
+    total_all_absences = 0
+    
+    for subject_data in subjects_dict.values():
+        sessions_list = list(subject_data["sessions"].values())
+        total_students_in_subject = len(subject_data["total_students"])
+        total_all_students.update(subject_data["total_students"])
+        total_all_absences += subject_data["total_absences"]
+        
+        subjects_list.append({
+            "subject_id": subject_data["subject_id"],
+            "subject_name": subject_data["subject_name"],
+            "total_students": total_students_in_subject,
+            "total_absences": subject_data["total_absences"],
+            "total_present": subject_data["total_present"],
+            "total_records": subject_data["total_absences"] + subject_data["total_present"],
+            "sessions": sessions_list
+        })
+    
+    # Sort by subject name
+    subjects_list.sort(key=lambda x: x["subject_name"])
+    
+    return {
+        "professor_id": professor_id,
+        "professor_name": f"{found_professor.first_name} {found_professor.last_name}",
+        "total_subjects": len(subjects_list),
+        "total_students": len(total_all_students),
+        "total_absences": total_all_absences,
+        "subjects": subjects_list
+    }
+
+
+def per_session_admin_report(
+    authorization: str | None = Header(None),
+    db: Session = Depends(connect_databse)
+):
+    """
+    Fetch all student absences grouped by subject for admin
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+
+    token = authorization.split(" ")[1]
+    payload = verify_token(token)
+
+    if not payload or "sub" not in payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    admin_id = payload["sub"]
+
+    found_admin = db.query(Users).filter(
+        Users.user_id == admin_id,
+        Users.role == "administrative"
+    ).first()
+
+    if not found_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Get all sessions
+    all_sessions = db.query(Session).all()
+    
+    if not all_sessions:
+        return {
+            "admin_id": admin_id,
+            "admin_name": f"{found_admin.first_name} {found_admin.last_name}",
+            "total_subjects": 0,
+            "total_students": 0,
+            "total_absences": 0,
+            "subjects": []
+        }
+    
+    # Group data by subject
+    subjects_dict = {}
+    
+    for session in all_sessions:
+        if not session.subject:
+            continue
+            
+        subject_id = session.subject_id
+        subject_name = session.subject.subject_name
+        
+        if subject_id not in subjects_dict:
+            subjects_dict[subject_id] = {
+                "subject_id": subject_id,
+                "subject_name": subject_name,
+                "sessions": {},
+                "total_students": set(),
+                "total_absences": 0,
+                "total_present": 0
+            }
+        
+        # Get all absences for this session
+        session_absences = db.query(Absence).filter(
+            Absence.session_id == session.session_id
+        ).all()
+        
+        if session.session_id not in subjects_dict[subject_id]["sessions"]:
+            subjects_dict[subject_id]["sessions"][session.session_id] = {
+                "session_id": session.session_id,
+                "class_id": session.class_id,
+                "class_name": session.class_.name if session.class_ else "Unknown",
+                "room": session.room.room_name if session.room else "Unknown",
+                "day": session.day,
+                "start_time": session.start_time,
+                "end_time": session.end_time,
+                "professor": f"{session.professor.first_name} {session.professor.last_name}" if session.professor else "Unknown",
+                "students": []
+            }
+        
+        # Add student absences
+        for absence in session_absences:
+            student = absence.user
+            if student:
+                subjects_dict[subject_id]["total_students"].add(student.user_id)
+                
+                student_data = {
+                    "user_id": student.user_id,
+                    "first_name": student.first_name,
+                    "last_name": student.last_name,
+                    "email": student.email,
+                    "absence_id": absence.id,
+                    "is_absent": absence.is_absent,
+                    "date": absence.date.isoformat() if absence.date else None,
+                    "recorded_at": absence.date.strftime("%B %d, %Y") if absence.date else "Unknown"
+                }
+                
+                subjects_dict[subject_id]["sessions"][session.session_id]["students"].append(student_data)
+                
+                if absence.is_absent:
+                    subjects_dict[subject_id]["total_absences"] += 1
+                else:
+                    subjects_dict[subject_id]["total_present"] += 1
+    
+    # Convert to list format
+    subjects_list = []
+    total_all_students = set()
+    total_all_absences = 0
+    
+    for subject_data in subjects_dict.values():
+        sessions_list = list(subject_data["sessions"].values())
+        total_students_in_subject = len(subject_data["total_students"])
+        total_all_students.update(subject_data["total_students"])
+        total_all_absences += subject_data["total_absences"]
+        
+        subjects_list.append({
+            "subject_id": subject_data["subject_id"],
+            "subject_name": subject_data["subject_name"],
+            "total_students": total_students_in_subject,
+            "total_absences": subject_data["total_absences"],
+            "total_present": subject_data["total_present"],
+            "total_records": subject_data["total_absences"] + subject_data["total_present"],
+            "sessions": sessions_list
+        })
+    
+    # Sort by subject name
+    subjects_list.sort(key=lambda x: x["subject_name"])
+    
+    return {
+        "admin_id": admin_id,
+        "admin_name": f"{found_admin.first_name} {found_admin.last_name}",
+        "total_subjects": len(subjects_list),
+        "total_students": len(total_all_students),
+        "total_absences": total_all_absences,
+        "subjects": subjects_list
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+The statistics queries that joined users to classes on the class name,
+against their class_id versions, and the statistics endpoints built on them.
+"""
+from datetime import date, timedelta
+from sqlalchemy import distinct, func, insert, select, text
+from benchmarks.harness import measure, print_table, running_app, session
+from Models.Attendance_aggregate import Attendance_aggregate
+from Models.Classes import Classes
+from Models.Department import Department
+from Models.Session import Session
+from Models.Users import Users
+from Utils.cache import stats_cache
+from tests.factories import auth_header, seed_department
+
+DEPARTMENTS = 10
+CLASSES_PER_DEPARTMENT = 10
+STUDENTS_PER_CLASS = 100
+WEEKS = 4
+
+
+def _seed() -> tuple[int, int, int]:
+    """
+    10 departments of 10 classes of 100 students, 10,000 students in all,
+    with 4 weeks of attendance totals each
+    """
+    with session() as db:
+        department = seed_department(db)
+        department_ids = [department.department.id] + db.execute(
+            insert(Department).returning(Department.id),
+            [{"dept_name": f"Department {index}", "description": "Synthetic"} for index in range(1, DEPARTMENTS)]
+        ).scalars().all()
+        classes = db.execute(
+            insert(Classes).returning(Classes.id, Classes.name),
+            [
+                {"name": f"D{department_index}-C{index}", "capacity": STUDENTS_PER_CLASS, "department_id": department_id}
+                for department_index, department_id in enumerate(department_ids)
+                for index in range(CLASSES_PER_DEPARTMENT)
+            ]
+        ).all()
+        students = db.execute(
+            insert(Users).returning(Users.user_id, Users.class_id),
+            [
+                {
+                    "first_name": f"Student{index}",
+                    "last_name": class_.name,
+                    "email": f"student{index}.{class_.id}@scholaria.example.com",
+                    "role": "student",
+                    "class_name": class_.name,
+                    "class_id": class_.id
+                }
+                for class_ in classes
+                for index in range(STUDENTS_PER_CLASS)
+            ]
+        ).all()
+        db.execute(insert(Session), [
+            {
+                "class_id": class_.id,
+                "room_id": department.room.room_id,
+                "professor_id": department.professor.user_id,
+                "subject_id": department.subject.subject_id,
+                "start_minute": 480,
+                "end_minute": 600,
+                "day": "Monday"
+            }
+            for class_ in classes
+        ])
+        db.execute(insert(Attendance_aggregate), [
+            {
+                "user_id": student.user_id,
+                "class_id": student.class_id,
+                "subject_id": department.subject.subject_id,
+                "week_start": date(2026, 1, 5) + timedelta(weeks=week),
+                "absent_count": (student.user_id + week) % 3,
+                "present_count": 1
+            }
+            for student in students
+            for week in range(WEEKS)
+        ])
+        db.commit()
+        middle_class = classes[len(classes) // 2]
+        return department.admin.user_id, middle_class.id, department_ids[len(department_ids) // 2]
+
+
+def _enrolled(by_name: bool):
+    """
+    Join condition from students to their class, by name as before or by class_id
+    """
+    return Users.class_name == Classes.name if by_name else Users.class_id == Classes.id
+
+
+def _queries(class_id: int, department_id: int, by_name: bool) -> dict:
+    enrolled = _enrolled(by_name)
+    return {
+        "class roster count": select(func.count(Users.user_id)).join(Classes, enrolled).filter(
+            Classes.id == class_id, Users.role == "student"
+        ),
+        "class absences per student": select(
+            Users.user_id, func.sum(Attendance_aggregate.absent_count)
+        ).join(
+            Attendance_aggregate, Users.user_id == Attendance_aggregate.user_id
+        ).join(Classes, enrolled).filter(
+            Classes.id == class_id, Users.role == "student"
+        ).group_by(Users.user_id).having(func.sum(Attendance_aggregate.absent_count) > 0).order_by(Users.user_id),
+        "department student count": select(func.count(Users.user_id)).join(Classes, enrolled).filter(
+            Classes.department_id == department_id, Users.role == "student"
+        ) if by_name else select(func.count(Users.user_id)).filter(
+            Users.class_id.in_(select(Classes.id).filter(Classes.department_id == department_id)),
+            Users.role == "student"
+        ),
+        "department class breakdown": select(
+            Classes.id, func.count(distinct(Users.user_id)), func.count(distinct(Session.session_id))
+        ).outerjoin(Users, enrolled).outerjoin(Session, Classes.id == Session.class_id).filter(
+            Classes.department_id == department_id
+        ).group_by(Classes.id).order_by(Classes.id),
+        "all departments student counts": select(
+            Classes.department_id, func.count(Users.user_id)
+        ).join(Classes, enrolled).filter(
+            Users.role == "student"
+        ).group_by(Classes.department_id).order_by(Classes.department_id),
+    }
+
+
+def main():
+    rows = []
+    with running_app() as client:
+        admin_id, class_id, department_id = _seed()
+
+        with session() as db:
+            # The class-name roster index of migration 0003, which 0004 dropped with the name join
+            db.execute(text("CREATE INDEX ix_users_class_name_role ON users (class_name, role)"))
+            by_name = _queries(class_id, department_id, by_name=True)
+            by_class_id = _queries(class_id, department_id, by_name=False)
+            for name in by_name:
+                assert db.execute(by_name[name]).all() == db.execute(by_class_id[name]).all(), name
+                before = measure(lambda: db.execute(by_name[name]).all(), repeat=9)
+                after = measure(lambda: db.execute(by_class_id[name]).all(), repeat=9)
+                rows.append([name, before, after, f"{before / after:.1f}x"])
+            db.execute(text("DROP INDEX ix_users_class_name_role"))
+            db.commit()
+
+        print_table("Statistics queries, median of 9 (ms)", ["query", "class name join", "class_id", "speedup"], rows)
+
+        headers = auth_header(admin_id, "administrative")
+        endpoint_rows = []
+        for path in (f"/class/{class_id}", f"/department/{department_id}", "/departments/all"):
+            def call():
+                response = client.get(path, headers=headers)
+                assert response.status_code == 200, f"{path}: {response.text}"
+
+            endpoint_rows.append([path, measure(call, repeat=9, setup=stats_cache.clear)])
+
+    print_table("Statistics endpoints on class_id, uncached, median of 9 (ms)", ["endpoint", "ms"], endpoint_rows)
+
+
+if __name__ == "__main__":
+    main()
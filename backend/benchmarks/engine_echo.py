@@ -0,0 +1,76 @@
+"""
+Throughput of the busiest read endpoints with statement logging on, as the
+engine used to be created, and off, the default now.
+"""
+import logging
+import os
+from contextlib import contextmanager, redirect_stdout
+from datetime import date, timedelta
+from benchmarks.harness import WORK_DIR, measure, print_table, running_app, session
+from Database.connection import async_engine, engine
+from tests.factories import add_absences, add_messages, add_ratrapages, add_students, auth_header, seed_department
+
+REQUESTS = 100
+
+
+@contextmanager
+def statement_logging(enabled: bool, sink):
+    """
+    Turn echo on for both engines. SQLAlchemy binds its log handler to
+    sys.stdout the first time echo is set, so the statements go to sink
+    instead of the terminal, as they would to a container's captured stdout.
+    """
+    if not enabled:
+        yield
+        return
+    logging.disable(logging.NOTSET)
+    with redirect_stdout(sink):
+        engine.echo = async_engine.sync_engine.echo = True
+    try:
+        yield
+    finally:
+        engine.echo = async_engine.sync_engine.echo = False
+        logging.disable(logging.INFO)
+
+
+def main():
+    with running_app() as client, open(os.path.join(WORK_DIR, "echo.log"), "w") as sink:
+        with session() as db:
+            department = seed_department(db)
+            students = add_students(db, department.class_, 300)
+            add_ratrapages(db, department, 30)
+            add_messages(db, department.professor, students[0], 100)
+            add_absences(db, department.session, students, [date(2026, 1, 5) + timedelta(weeks=week) for week in range(12)])
+            endpoints = [
+                ("/fetch_all_users", auth_header(department.admin.user_id, "administrative")),
+                ("/fetch_students_for_professor", auth_header(department.professor.user_id, "professor")),
+                (f"/fetch_ratrapages/{department.class_.id}", auth_header(department.admin.user_id, "administrative")),
+                ("/fetch_messages", auth_header(students[0].user_id, "student")),
+                ("/student_all_absences", auth_header(students[0].user_id, "student")),
+            ]
+
+        rows = []
+        for path, headers in endpoints:
+            def burst():
+                for _ in range(REQUESTS):
+                    response = client.get(path, headers=headers)
+                    assert response.status_code == 200, response.text
+
+            throughput = {}
+            logged_from = sink.tell()
+            for echo in (True, False):
+                with statement_logging(echo, sink):
+                    throughput[echo] = REQUESTS / measure(burst) * 1000
+            # measure() ran the burst once to warm up and 5 timed times
+            logged_per_request = (sink.tell() - logged_from) / (6 * REQUESTS) / 1024
+            rows.append([path, throughput[True], throughput[False], f"{throughput[False] / throughput[True]:.2f}x", logged_per_request])
+
+    print_table(
+        f"Sequential throughput over {REQUESTS} requests (req/s)",
+        ["endpoint", "echo on", "echo off", "gain", "logged KB/request"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
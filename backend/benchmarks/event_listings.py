@@ -0,0 +1,105 @@
+"""
+/event_attendees and /my_events for 10, 1k and 10k registrations, against
+the per-registration lookups they replaced, served from the same app.
+"""
+from fastapi import Depends
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from benchmarks.harness import count_statements, measure, print_table, running_app, session
+from Database.connection import connect_databse
+from Models.Event_association import Event_association
+from Models.Events import Events
+from Models.Users import Users
+from tests.environment import reset_database
+from tests.factories import add_user, auth_header
+import main as app_main
+
+REGISTRATIONS = [10, 1_000, 10_000]
+
+
+def per_row_event_attendees(event_id: int, db: Session = Depends(connect_databse)):
+    event = db.query(Events).filter(Events.event_id == event_id).first()
+    attendees = []
+    for registration in db.query(Event_association).filter(Event_association.event_id == event_id).all():
+        user = db.query(Users).filter(Users.user_id == registration.user_id).first()
+        if user:
+            attendees.append({
+                "user_id": user.user_id,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "profile_picture": user.profile_picture,
+                "email": user.email,
+                "role": user.role
+            })
+    return {"event_id": event_id, "event_name": event.event_name, "total_attendees": len(attendees), "attendees": attendees}
+
+
+def per_row_user_events(user_id: int, db: Session = Depends(connect_databse)):
+    events = []
+    for registration in db.query(Event_association).filter(Event_association.user_id == user_id).all():
+        event = db.query(Events).filter(Events.event_id == registration.event_id).first()
+        if event:
+            events.append({
+                "event_id": event.event_id,
+                "event_name": event.event_name,
+                "posted_at": event.posted_at,
+                "ends_at": event.ends_at,
+                "details": event.details,
+                "event_type": event.event_type
+            })
+    return {"total_events": len(events), "events": events}
+
+
+def _seed(count: int) -> tuple[int, int, int]:
+    """
+    One event with count attendees, and one student registered to count events
+    """
+    with session() as db:
+        admin = add_user(db, "administrative")
+        student = add_user(db, "student")
+        db.commit()
+        user_ids = db.execute(
+            insert(Users).returning(Users.user_id),
+            [{"first_name": f"Guest{index}", "last_name": "Event", "email": f"guest{index}@scholaria.example.com", "role": "student"} for index in range(count)]
+        ).scalars().all()
+        event_ids = db.execute(
+            insert(Events).returning(Events.event_id),
+            [{"event_name": f"Event {index}", "details": "Seminar", "event_type": "public"} for index in range(count)]
+        ).scalars().all()
+        db.execute(insert(Event_association), [{"user_id": user_id, "event_id": event_ids[0]} for user_id in user_ids])
+        db.execute(insert(Event_association), [{"user_id": student.user_id, "event_id": event_id} for event_id in event_ids])
+        db.commit()
+        return admin.user_id, student.user_id, event_ids[0]
+
+
+def main():
+    app_main.app.add_api_route("/benchmark/per_row/event_attendees/{event_id}", per_row_event_attendees)
+    app_main.app.add_api_route("/benchmark/per_row/user_events/{user_id}", per_row_user_events)
+
+    rows = []
+    with running_app() as client:
+        for count in REGISTRATIONS:
+            reset_database()
+            admin_id, student_id, event_id = _seed(count)
+            admin = auth_header(admin_id, "administrative")
+            student = auth_header(student_id, "student")
+            calls = [
+                ("attendees", "per-row (before)", f"/benchmark/per_row/event_attendees/{event_id}", {}),
+                ("attendees", "joined, unpaged", f"/event_attendees/{event_id}", admin),
+                ("attendees", "joined, page of 100", f"/event_attendees/{event_id}?page=2&page_size=100", admin),
+                ("my events", "per-row (before)", f"/benchmark/per_row/user_events/{student_id}", {}),
+                ("my events", "joined, unpaged", "/my_events", student),
+                ("my events", "joined, page of 100", "/my_events?page=2&page_size=100", student),
+            ]
+            for listing, variant, path, headers in calls:
+                def call():
+                    response = client.get(path, headers=headers)
+                    assert response.status_code == 200, f"{path}: {response.text}"
+
+                rows.append([count, listing, variant, count_statements(call), measure(call, repeat=3)])
+
+    print_table("Event listings, median of 3 (ms)", ["registrations", "listing", "variant", "statements", "ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Shared setup of the benchmarks: the app on a throwaway SQLite database and
+timing helpers. Run a benchmark from backend/ with python -m benchmarks.<name>.
+"""
+import logging
+import statistics
+import time
+from contextlib import contextmanager
+from tests.environment import reset_database, use_throwaway_database
+
+# The import worker's poll would land in the statement counts of long requests
+WORK_DIR = use_throwaway_database(IMPORT_POLL_INTERVAL="3600")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from Database.connection import SessionLocal, async_engine, engine
+import main
+
+# Keep the request logs out of the result tables
+logging.disable(logging.INFO)
+
+
+@contextmanager
+def running_app():
+    """
+    A test client with the app's lifespan running, on an empty database
+    """
+    with TestClient(main.app) as client:
+        reset_database()
+        yield client
+
+
+@contextmanager
+def session():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def measure(run, repeat: int = 5, setup=None) -> float:
+    """
+    Median wall time of run() in milliseconds, after one warm-up call.
+    setup() runs untimed before every call.
+    """
+    timings = []
+    for attempt in range(repeat + 1):
+        if setup is not None:
+            setup()
+        started_at = time.perf_counter()
+        run()
+        if attempt:
+            timings.append((time.perf_counter() - started_at) * 1000)
+    return statistics.median(timings)
+
+
+def count_statements(run) -> int:
+    """
+    Statements both engines execute during run()
+    """
+    count = 0
+
+    def counted(*args):
+        nonlocal count
+        count += 1
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", counted)
+    try:
+        run()
+    finally:
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", counted)
+    return count
+
+
+def print_table(title: str, headers: list[str], rows: list[list]):
+    cells = [headers] + [[f"{value:.2f}" if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(row[column]) for row in cells) for column in range(len(headers))]
+    print(f"\n{title}")
+    for index, row in enumerate(cells):
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
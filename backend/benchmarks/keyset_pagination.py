@@ -0,0 +1,121 @@
+"""
+First and deep keyset pages of /fetch_all_users and /conversations/{peer_id}
+as the users and messages tables grow, against an OFFSET page at the same
+depth. Keyset pages should stay flat, OFFSET walks every row it skips.
+"""
+from sqlalchemy import func, insert, select
+from benchmarks.harness import measure, print_table, running_app, session
+from Models.Message import Message
+from Models.Users import Users
+from Utils.pagination import encode_cursor
+from tests.factories import auth_header, seed_department
+
+TABLE_SIZES = [1_000, 10_000, 100_000]
+PAGE_SIZE = 100
+# The deep page starts this far into the table
+DEPTH = 0.9
+
+
+def _grow_users(db, size: int):
+    existing = db.scalar(select(func.count(Users.user_id)))
+    db.execute(insert(Users), [
+        {
+            "first_name": f"Student{index}",
+            "last_name": "Paged",
+            "email": f"student{index}.paged@scholaria.example.com",
+            "role": "student",
+            "isverified": "true"
+        }
+        for index in range(existing, size)
+    ])
+
+
+def _grow_messages(db, sender_id: int, receiver_id: int, size: int):
+    existing = db.scalar(select(func.count(Message.id)))
+    low_id, high_id = sorted((sender_id, receiver_id))
+    db.execute(insert(Message), [
+        {
+            "sender_id": sender_id,
+            "receiver_id": receiver_id,
+            "user_low_id": low_id,
+            "user_high_id": high_id,
+            "content": f"Message {index}"
+        }
+        for index in range(existing, size)
+    ])
+
+
+def _get(client, path: str, headers: dict, **params):
+    def call():
+        response = client.get(path, params={"page_size": PAGE_SIZE, **params}, headers=headers)
+        assert response.status_code == 200, response.text
+    return call
+
+
+def main():
+    user_rows, message_rows = [], []
+    with running_app() as client:
+        with session() as db:
+            department = seed_department(db)
+            admin_id, professor_id = department.admin.user_id, department.professor.user_id
+        headers = auth_header(admin_id, "administrative")
+
+        for size in TABLE_SIZES:
+            with session() as db:
+                _grow_users(db, size)
+                _grow_messages(db, professor_id, admin_id, size)
+                db.commit()
+
+                user_ids = db.scalars(select(Users.user_id).order_by(Users.user_id)).all()
+                message_ids = db.scalars(select(Message.id).order_by(Message.id.desc())).all()
+                deep_users, deep_messages = int(len(user_ids) * DEPTH), int(len(message_ids) * DEPTH)
+
+                def users_keyset_page():
+                    db.execute(select(Users).filter(Users.user_id > user_ids[deep_users - 1]).order_by(Users.user_id).limit(PAGE_SIZE)).all()
+
+                def users_offset_page():
+                    db.execute(select(Users).order_by(Users.user_id).offset(deep_users).limit(PAGE_SIZE)).all()
+
+                def messages_keyset_page():
+                    db.execute(select(Message).filter(
+                        Message.user_low_id == min(admin_id, professor_id),
+                        Message.user_high_id == max(admin_id, professor_id),
+                        Message.id < message_ids[deep_messages - 1]
+                    ).order_by(Message.id.desc()).limit(PAGE_SIZE)).all()
+
+                def messages_offset_page():
+                    db.execute(select(Message).filter(
+                        Message.user_low_id == min(admin_id, professor_id),
+                        Message.user_high_id == max(admin_id, professor_id)
+                    ).order_by(Message.id.desc()).offset(deep_messages).limit(PAGE_SIZE)).all()
+
+                user_rows.append([
+                    len(user_ids),
+                    measure(_get(client, "/fetch_all_users", headers), repeat=9),
+                    measure(_get(client, "/fetch_all_users", headers, cursor=encode_cursor(user_ids[deep_users - 1])), repeat=9),
+                    measure(users_keyset_page, repeat=9, setup=db.expunge_all),
+                    measure(users_offset_page, repeat=9, setup=db.expunge_all),
+                ])
+                conversation = f"/conversations/{professor_id}"
+                message_rows.append([
+                    len(message_ids),
+                    measure(_get(client, conversation, headers), repeat=9),
+                    measure(_get(client, conversation, headers, cursor=encode_cursor(message_ids[deep_messages - 1])), repeat=9),
+                    measure(messages_keyset_page, repeat=9, setup=db.expunge_all),
+                    measure(messages_offset_page, repeat=9, setup=db.expunge_all),
+                ])
+
+    # The endpoint columns include auth and serialization, the query columns time
+    # the page query alone at the same depth
+    print_table(
+        f"/fetch_all_users, pages of {PAGE_SIZE}, median of 9 (ms)",
+        ["users", "first page", f"page at {DEPTH:.0%}", "keyset query", "OFFSET query"], user_rows
+    )
+    print_table(
+        f"/conversations/{{peer_id}}, pages of {PAGE_SIZE}, median of 9 (ms)",
+        ["messages", "first page", f"page at {DEPTH:.0%}", "keyset query", "OFFSET query"], message_rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+The app with a delay added to every statement, standing in for the round
+trip to a database server, which the local SQLite file does not have. The
+sync engine sleeps in the thread pool worker running the request, the
+AsyncSession awaits the delay, as each driver waits on its socket.
+Served by benchmarks.load_test, BENCHMARK_DB_LATENCY_MS sets the delay.
+"""
+import asyncio
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite.aiosqlite import AsyncAdapt_aiosqlite_cursor
+from Database.connection import engine
+from main import app  # noqa: F401
+
+DB_LATENCY_SECONDS = float(os.getenv("BENCHMARK_DB_LATENCY_MS", 0)) / 1000
+
+
+def _blocking_round_trip(conn, cursor, statement, parameters, context, executemany):
+    time.sleep(DB_LATENCY_SECONDS)
+
+
+_execute_async = AsyncAdapt_aiosqlite_cursor._execute_async
+
+
+async def _awaited_round_trip(self, operation, parameters):
+    await asyncio.sleep(DB_LATENCY_SECONDS)
+    return await _execute_async(self, operation, parameters)
+
+
+if DB_LATENCY_SECONDS > 0:
+    event.listen(engine, "before_cursor_execute", _blocking_round_trip)
+    AsyncAdapt_aiosqlite_cursor._execute_async = _awaited_round_trip
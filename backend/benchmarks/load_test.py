@@ -0,0 +1,114 @@
+"""
+Concurrent load on the endpoints served from the AsyncSession, next to sync
+endpoints running on the thread pool. The app runs under uvicorn in a
+separate process, the load comes from an httpx client in this one. Each
+endpoint is loaded without and with a simulated database round trip, see
+benchmarks.latency_app.
+"""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+import httpx
+from benchmarks.harness import print_table, running_app, session
+from tests.factories import add_absences, add_messages, add_students, auth_header, seed_department
+
+CONCURRENCY = [1, 10, 50, 100]
+REQUESTS_PER_LEVEL = 400
+DB_LATENCY_MS = [0, 10]
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _start_server(port: int, db_latency_ms: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.latency_app:app", "--port", str(port), "--log-level", "warning", "--timeout-keep-alive", "120"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "BENCHMARK_DB_LATENCY_MS": str(db_latency_ms)}
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def _load(base_url: str, path: str, headers: dict, concurrency: int) -> tuple[float, list[float]]:
+    """
+    concurrency clients sending REQUESTS_PER_LEVEL requests in all, returns
+    the throughput and every request's latency in milliseconds
+    """
+    latencies = []
+    remaining = REQUESTS_PER_LEVEL
+
+    async def client_loop(client):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started_at = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            assert response.status_code == 200, f"{path}: {response.text}"
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+    return REQUESTS_PER_LEVEL / elapsed, latencies
+
+
+def main():
+    with running_app():
+        with session() as db:
+            department = seed_department(db)
+            students = add_students(db, department.class_, 200)
+            add_messages(db, department.professor, students[0], 100)
+            add_absences(db, department.session, students, [date(2026, 1, 5) + timedelta(weeks=week) for week in range(12)])
+            student = auth_header(students[0].user_id, "student")
+            admin = auth_header(department.admin.user_id, "administrative")
+            professor = auth_header(department.professor.user_id, "professor")
+            endpoints = [
+                ("async", "/fetch_session_for_students", student),
+                ("async", "/fetch_messages", student),
+                ("async", "/student_all_absences", student),
+                ("async", f"/class/{department.class_.id}", admin),
+                ("sync", f"/fetch_class_session/{department.class_.id}", professor),
+                ("sync", "/fetch_students_for_professor", professor),
+            ]
+
+    rows = []
+    for db_latency_ms in DB_LATENCY_MS:
+        port = _free_port()
+        server = _start_server(port, db_latency_ms)
+        try:
+            for kind, path, headers in endpoints:
+                for concurrency in CONCURRENCY:
+                    throughput, latencies = asyncio.run(_load(f"http://127.0.0.1:{port}", path, headers, concurrency))
+                    quantiles = statistics.quantiles(latencies, n=20)
+                    rows.append([db_latency_ms, kind, path, concurrency, throughput, statistics.median(latencies), quantiles[18]])
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_table(
+        f"{REQUESTS_PER_LEVEL} requests per level against uvicorn",
+        ["db ms", "session", "endpoint", "clients", "req/s", "p50 ms", "p95 ms"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
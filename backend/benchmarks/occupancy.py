@@ -0,0 +1,122 @@
+"""
+find_occupancy() over a 120-day semester with 10,000 weekly sessions and
+3,000 ratrapages, against loading the day's sessions and ratrapages and
+comparing them one by one.
+"""
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import insert
+from benchmarks.harness import measure, print_table, running_app, session
+from benchmarks.session_conflicts import seed_timetable
+from Models.Ratrapage import Ratrapage
+from Models.Session import Session
+from Utils.occupancy import Occupancy, find_occupancy, slot_minutes, weekday_of
+from tests.factories import auth_header
+
+SEMESTER_START = date(2026, 2, 2)
+SEMESTER_DAYS = 120
+RATRAPAGES = 3_000
+
+
+def day_scan_occupancy(db, day: date, start_time: datetime, end_time: datetime,
+                       room_id: int, professor_id: int, class_id: int) -> Occupancy | None:
+    """
+    The same check without indexes: every session of the weekday and every ratrapage of the date
+    """
+    start_minute, end_minute = slot_minutes(start_time, end_time)
+    for s in db.query(Session).filter(Session.day == weekday_of(day)).all():
+        if s.start_minute < end_minute and s.end_minute > start_minute:
+            for kind, busy in (("room", s.room_id == room_id), ("professor", s.professor_id == professor_id), ("class", s.class_id == class_id)):
+                if busy:
+                    return Occupancy(kind, "session", s.session_id)
+    for r in db.query(Ratrapage).filter(Ratrapage.date == day).all():
+        if r.start_time < end_time and r.end_time > start_time:
+            for kind, busy in (("room", r.room_id == room_id), ("professor", r.user_id == professor_id), ("class", r.class_id == class_id)):
+                if busy:
+                    return Occupancy(kind, "ratrapage", r.id)
+    return None
+
+
+def _at(day: date, hours: int, minutes: int = 0) -> datetime:
+    return datetime.combine(day, time(hours, minutes))
+
+
+def add_semester_ratrapages(db, timetable) -> list[date]:
+    """
+    3,000 ratrapages over the semester of seed_timetable(): 25 evenings a day,
+    20:00-21:30, for its first 25 rooms, professors and classes. Returns the
+    semester's dates.
+    """
+    days = [SEMESTER_START + timedelta(days=offset) for offset in range(SEMESTER_DAYS)]
+    db.execute(insert(Ratrapage), [
+        {
+            "user_id": timetable.professors[index // SEMESTER_DAYS],
+            "class_id": timetable.classes[index // SEMESTER_DAYS],
+            "room_id": timetable.rooms[index // SEMESTER_DAYS],
+            "department_id": timetable.department.department.id,
+            "subject_id": timetable.department.subject.subject_id,
+            "date": days[index % SEMESTER_DAYS],
+            "start_time": _at(days[index % SEMESTER_DAYS], 20),
+            "end_time": _at(days[index % SEMESTER_DAYS], 21, 30)
+        }
+        for index in range(RATRAPAGES)
+    ])
+    db.commit()
+    return days
+
+
+def main():
+    with running_app() as client:
+        with session() as db:
+            timetable = seed_timetable(db)
+            department = timetable.department
+            admin_id = department.admin.user_id
+            department_id, subject_id = department.department.id, department.subject.subject_id
+            days = add_semester_ratrapages(db, timetable)
+
+            last = (timetable.rooms[-1], timetable.professors[-1], timetable.classes[-1])
+            first = (timetable.rooms[0], timetable.professors[0], timetable.classes[0])
+            weekdays = [day for day in days if day.weekday() < 5]
+            sweeps = [
+                # The last room, professor and class never have a ratrapage: nothing to find
+                ("free, every day", days, (21, 30), (23, 0), last, None),
+                ("weekly session, weekdays", weekdays, (11, 0), (12, 0), last, "session"),
+                ("ratrapage, every day", days, (20, 30), (21, 0), first, "ratrapage"),
+            ]
+
+            rows = []
+            for name, sweep_days, (start_hours, start_minutes), (end_hours, end_minutes), resources, expected in sweeps:
+                def check_all(check):
+                    for day in sweep_days:
+                        occupancy = check(db, day, _at(day, start_hours, start_minutes), _at(day, end_hours, end_minutes), *resources)
+                        assert (occupancy.source if occupancy else None) == expected, (name, day, occupancy)
+
+                before = measure(lambda: check_all(day_scan_occupancy), repeat=3, setup=db.expunge_all) / len(sweep_days)
+                after = measure(lambda: check_all(find_occupancy), repeat=3) / len(sweep_days)
+                rows.append([name, len(sweep_days), before, after, f"{before / after:.0f}x"])
+
+        print_table(
+            "Occupancy check per dated slot, 10,000 sessions and 3,000 ratrapages, median of 3 sweeps (ms)",
+            ["sweep", "checks", "day scan", "find_occupancy", "speedup"], rows
+        )
+
+        def add_clashing_ratrapage():
+            day = weekdays[len(weekdays) // 2]
+            response = client.post("/add_ratrappage", headers=auth_header(admin_id, "administrative"), json={
+                "user_id": timetable.professors[0],
+                "class_id": timetable.classes[0],
+                "room_id": timetable.rooms[0],
+                "department_id": department_id,
+                "subject_id": subject_id,
+                "date": day.isoformat(),
+                "start_time": _at(day, 20, 30).isoformat(),
+                "end_time": _at(day, 21).isoformat()
+            })
+            assert response.status_code == 400, response.text
+
+        print_table("Through the API, median of 9 (ms)", ["request", "ms"], [
+            ["POST /add_ratrappage, rejected as a clash", measure(add_clashing_ratrapage, repeat=9)],
+        ])
+
+
+if __name__ == "__main__":
+    main()
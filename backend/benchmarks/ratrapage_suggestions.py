@@ -0,0 +1,65 @@
+"""
+suggest_slots() and GET /ratrapages/suggest over windows of up to 200 days,
+with 10,000 weekly sessions, 3,000 ratrapages and 251 rooms in the department.
+"""
+from datetime import timedelta
+from benchmarks.harness import measure, print_table, running_app, session
+from benchmarks.occupancy import SEMESTER_START, add_semester_ratrapages
+from benchmarks.session_conflicts import seed_timetable
+from Utils.occupancy import suggest_slots
+from tests.factories import auth_header
+
+WINDOWS = [30, 120, 200]
+LIMITS = [5, 50]
+
+
+def main():
+    rows = []
+    with running_app() as client:
+        with session() as db:
+            timetable = seed_timetable(db)
+            add_semester_ratrapages(db, timetable)
+            department = timetable.department
+            admin_id = department.admin.user_id
+            department_id, subject_id = department.department.id, department.subject.subject_id
+            searches = [
+                # Teaches in every weekday slot: the first free slots are on the Saturday
+                ("busy class and professor", timetable.classes[0], timetable.professors[0]),
+                # Only Monday 08:00-10:00, and only A101 is free on weekdays
+                ("mostly free class and professor", department.class_.id, department.professor.user_id),
+            ]
+
+            for name, class_id, professor_id in searches:
+                for days in WINDOWS:
+                    for limit in LIMITS:
+                        date_to = SEMESTER_START + timedelta(days=days - 1)
+
+                        def search():
+                            suggestions = suggest_slots(
+                                db, class_id, professor_id, department_id, 60, SEMESTER_START, date_to,
+                                8 * 60, 18 * 60, limit
+                            )
+                            assert len(suggestions) == limit
+
+                        rows.append([name, days, limit, measure(search, repeat=9)])
+
+        def suggest_over_semester():
+            response = client.get("/ratrapages/suggest", params={
+                "class_id": timetable.classes[0],
+                "professor_id": timetable.professors[0],
+                "subject_id": subject_id,
+                "duration": 60,
+                "date_from": SEMESTER_START.isoformat(),
+                "date_to": (SEMESTER_START + timedelta(days=119)).isoformat()
+            }, headers=auth_header(admin_id, "administrative"))
+            assert response.status_code == 200, response.text
+            assert response.json()["count"] == 5
+
+    print_table("suggest_slots, 60-minute slots, median of 9 (ms)", ["search", "days", "limit", "ms"], rows)
+    print_table("Through the API, median of 9 (ms)", ["request", "ms"], [
+        ["GET /ratrapages/suggest, 120 days, busy class", measure(suggest_over_semester, repeat=9)],
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Latency of recording a whole roll call: one POST /assign_absence per student
+against a single POST /assign_absences/bulk.
+"""
+from sqlalchemy import delete
+from benchmarks.harness import measure, print_table, running_app, session
+from Models.Absence import Absence
+from Models.Attendance_aggregate import Attendance_aggregate
+from Models.Email_outbox import Email_outbox
+from tests.factories import add_students, auth_header, seed_department
+
+CLASS_SIZES = [30, 100, 500]
+
+
+def _clear_roll_calls():
+    with session() as db:
+        for model in (Absence, Attendance_aggregate, Email_outbox):
+            db.execute(delete(model))
+        db.commit()
+
+
+def main():
+    rows = []
+    with running_app() as client:
+        for size in CLASS_SIZES:
+            with session() as db:
+                department = seed_department(db)
+                students = add_students(db, department.class_, size)
+                class_id = department.class_.id
+                session_id = department.session.session_id
+                headers = auth_header(department.professor.user_id, "professor")
+                # Every third student absent, each one queues a notification email
+                entries = [{"user_id": student.user_id, "is_absent": index % 3 == 0} for index, student in enumerate(students)]
+
+            def one_call_per_student():
+                for entry in entries:
+                    response = client.post("/assign_absence", headers=headers, json={**entry, "class_id": class_id, "session_id": session_id})
+                    assert response.status_code == 200, response.text
+
+            def bulk():
+                response = client.post("/assign_absences/bulk", headers=headers, json={"session_id": session_id, "absences": entries})
+                assert response.status_code == 200, response.text
+
+            per_student = measure(one_call_per_student, repeat=3, setup=_clear_roll_calls)
+            bulk_call = measure(bulk, repeat=3, setup=_clear_roll_calls)
+            rows.append([size, per_student, bulk_call, f"{per_student / bulk_call:.1f}x"])
+
+    print_table("Roll call latency (ms)", ["students", "per-student calls", "bulk", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+The add_session conflict check on 10,000 weekly sessions: the interval
+indexes of Utils/timetable_conflicts.py against the scan of the whole day
+they replaced.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import insert
+from benchmarks.harness import measure, print_table, running_app, session
+from Models.Classes import Classes
+from Models.Rooms import Room
+from Models.Session import Session, Weekday
+from Models.Users import Users
+from Utils.timetable_conflicts import time_to_minutes, timetable_conflicts
+from tests.factories import auth_header, seed_department
+
+DAYS = [Weekday.MONDAY, Weekday.TUESDAY, Weekday.WEDNESDAY, Weekday.THURSDAY, Weekday.FRIDAY]
+# Eight 90-minute sessions a day from 08:00, every room, professor and class busy in each
+SLOT_STARTS = [480 + 90 * index for index in range(8)]
+PARALLEL = 250
+
+
+def per_day_scan_conflict(db, day: Weekday, start_time: str, end_time: str, room_id: int, professor_id: int) -> str | None:
+    """
+    The check add_session made before the interval indexes
+    """
+    def parse_time(time_str):
+        return datetime.strptime(time_str, "%H:%M")
+
+    def time_overlap(start1, end1, start2, end2):
+        s1 = parse_time(start1)
+        e1 = parse_time(end1)
+        s2 = parse_time(start2)
+        e2 = parse_time(end2)
+        return s1 < e2 and e1 > s2
+
+    existing_sessions = db.query(Session).filter(Session.day == day).all()
+
+    for s in existing_sessions:
+        if time_overlap(start_time, end_time, s.start_time, s.end_time):
+            if s.room_id == room_id:
+                return "room"
+            if s.professor_id == professor_id:
+                return "professor"
+    return None
+
+
+def seed_timetable(db) -> SimpleNamespace:
+    """
+    seed_department() plus 250 rooms, professors and classes, each with a
+    session in all 8 slots of the 5 weekdays: 10,000 sessions, 2,000 a day
+    """
+    department = seed_department(db)
+    department_id = department.department.id
+    rooms = db.execute(insert(Room).returning(Room.room_id), [
+        {"room_name": f"R{index}", "department_id": department_id, "type": "classroom"} for index in range(PARALLEL)
+    ]).scalars().all()
+    professors = db.execute(insert(Users).returning(Users.user_id), [
+        {
+            "first_name": f"Professor{index}",
+            "last_name": "Timetable",
+            "email": f"professor{index}.timetable@scholaria.example.com",
+            "role": "professor"
+        }
+        for index in range(PARALLEL)
+    ]).scalars().all()
+    classes = db.execute(insert(Classes).returning(Classes.id), [
+        {"name": f"T{index}", "capacity": 30, "department_id": department_id} for index in range(PARALLEL)
+    ]).scalars().all()
+    db.execute(insert(Session), [
+        {
+            "class_id": classes[index],
+            "room_id": rooms[index],
+            # Rotate the professors so a room does not keep the same one all day
+            "professor_id": professors[(index + slot) % PARALLEL],
+            "subject_id": department.subject.subject_id,
+            "start_minute": start,
+            "end_minute": start + 90,
+            "day": day
+        }
+        for day in DAYS
+        for slot, start in enumerate(SLOT_STARTS)
+        for index in range(PARALLEL)
+    ])
+    db.commit()
+    # The bulk insert bypassed the sessions version bump, build the indexes from the table
+    timetable_conflicts.load(db)
+    return SimpleNamespace(department=department, rooms=rooms, professors=professors, classes=classes)
+
+
+def _seed() -> tuple:
+    with session() as db:
+        timetable = seed_timetable(db)
+        # The last room's Wednesday 11:00 session, checked against itself
+        taken = db.query(Session).filter(
+            Session.room_id == timetable.rooms[-1], Session.day == Weekday.WEDNESDAY, Session.start_minute == 660
+        ).one()
+        department = timetable.department
+        return department.admin.user_id, department.subject.subject_id, taken.room_id, taken.professor_id, taken.class_id
+
+
+def main():
+    with running_app() as client:
+        admin_id, subject_id, room_id, professor_id, class_id = _seed()
+        checks = [
+            # Past the last slot, nothing to find: the old scan reads the whole day
+            ("free slot", "20:00", "21:30", None),
+            # The last room in its 11:00 session
+            ("room taken", "11:00", "12:00", "room"),
+        ]
+
+        rows = []
+        with session() as db:
+            for name, start_time, end_time, expected in checks:
+                def scan():
+                    assert per_day_scan_conflict(db, Weekday.WEDNESDAY, start_time, end_time, room_id, professor_id) == expected
+
+                def indexed():
+                    conflict = timetable_conflicts.find_conflict(
+                        db, Weekday.WEDNESDAY, time_to_minutes(start_time), time_to_minutes(end_time),
+                        room_id=room_id, professor_id=professor_id, class_id=class_id
+                    )
+                    assert (conflict[0] if conflict else None) == expected
+
+                before = measure(scan, repeat=9, setup=db.expunge_all)
+                after = measure(indexed, repeat=9)
+                rows.append([name, before, after, f"{before / after:.0f}x"])
+
+            rebuild = measure(lambda: timetable_conflicts.load(db), repeat=5)
+
+        print_table("Conflict check on 10,000 sessions, median of 9 (ms)", ["check", "day scan", "interval index", "speedup"], rows)
+
+        def add_conflicting_session():
+            response = client.post("/add_session", headers=auth_header(admin_id, "administrative"), json={
+                "class_id": class_id,
+                "room_id": room_id,
+                "professor_id": professor_id,
+                "subject_id": subject_id,
+                "start_time": "11:00",
+                "end_time": "12:00",
+                "day": "Wednesday"
+            })
+            assert response.status_code == 409, response.text
+
+        print_table("Around the check, median (ms)", ["operation", "ms"], [
+            ["POST /add_session, rejected as a conflict", measure(add_conflicting_session, repeat=9)],
+            ["index rebuild after another worker writes", rebuild],
+        ])
+
+
+if __name__ == "__main__":
+    main()
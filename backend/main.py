@@ -10,6 +10,11 @@ from Models import Message
 from Models import Events
 from Models import Event_association
 from Models import Ratrapage
+from Models import Email_outbox
+from Models import Import_job
+from Models import Import_job_row
+from Models import Attendance_aggregate
+from Models import Resource_version
 
 from Routes import UserRoutes
 from Routes import absence_routes
@@ -23,12 +28,51 @@ from Routes import Roomsroute
 from Routes import Sessionroute
 from Routes import stats_route
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
-from Database.connection import engine, Base
-
-app = FastAPI(title="Uni Manager Scholaria - Unified API")
-
+from Database.connection import engine, async_engine, Base, SessionLocal
+from Database.migrations import run_migrations
+from Database.query_stats import DB_QUERY_STATS, QueryStatsMiddleware, install_query_stats
+from Utils.email_queue import email_outbox
+from Utils.hasher import shutdown_hash_pool
+from Utils.user_import import import_worker
+from Utils.message_hub import message_hub
+from Utils.attendance_aggregates import ensure_attendance_aggregates
+from Utils.etag import ETagMiddleware, ensure_resource_versions
+from Utils.timetable_conflicts import timetable_conflicts
+
+
+def _prepare_database():
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        ensure_resource_versions(db)
+        ensure_attendance_aggregates(db)
+        timetable_conflicts.load(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(_prepare_database)
+    await email_outbox.start()
+    await import_worker.start()
+    await message_hub.start()
+    yield
+    await message_hub.stop()
+    await import_worker.stop()
+    await email_outbox.stop()
+    shutdown_hash_pool()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Uni Manager Scholaria - Unified API", lifespan=lifespan)
+
+# Added before CORS so its 304 responses still get the CORS headers
+app.add_middleware(ETagMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,8 +80,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+if DB_QUERY_STATS:
+    install_query_stats(engine)
+    install_query_stats(async_engine.sync_engine)
+    app.add_middleware(QueryStatsMiddleware)
+
 
 app.include_router(UserRoutes.router)
 
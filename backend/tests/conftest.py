@@ -0,0 +1,38 @@
+from tests.environment import reset_database, use_throwaway_database
+
+use_throwaway_database(DB_QUERY_STATS="true")
+
+import pytest
+from fastapi.testclient import TestClient
+from Database.connection import SessionLocal
+import main
+from tests.factories import seed_department
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clean_database(client):
+    """
+    Every test starts from empty tables and cold caches
+    """
+    reset_database()
+    yield
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def department(db):
+    return seed_department(db)
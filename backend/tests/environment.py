@@ -0,0 +1,66 @@
+import os
+import tempfile
+from sqlalchemy import Date, event, text
+
+
+def _sqlite_date_defaults(metadata, connection, **kw):
+    """
+    func.now() renders as CURRENT_TIMESTAMP on SQLite, which a Date column
+    cannot read back, default those columns to CURRENT_DATE instead
+    """
+    for table in metadata.tables.values():
+        for column in table.columns:
+            if isinstance(column.type, Date) and column.server_default is not None:
+                column.server_default.arg = text("CURRENT_DATE")
+
+
+def use_throwaway_database(**settings: str) -> str:
+    """
+    Point the backend at a new SQLite database in a temporary directory, with
+    email delivery off. The backend reads its configuration at import time,
+    so call this before importing main. settings override the defaults.
+    Returns the temporary directory.
+    """
+    directory = tempfile.mkdtemp(prefix="scholaria-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'scholaria.db')}",
+        "ASYNC_DATABASE_URL": "",
+        "SECRET_KEY": "test-secret-key",
+        "MAIL_USERNAME": "scholaria",
+        "MAIL_PASSWORD": "scholaria",
+        "MAIL_FROM": "noreply@scholaria.example.com",
+        "MAIL_FROM_NAME": "Scholaria",
+        "MAIL_SERVER": "127.0.0.1",
+        "MAIL_PORT": "2525",
+        "MAIL_STARTTLS": "false",
+        "MAIL_USE_CREDENTIALS": "false",
+        "EMAIL_WORKERS": "0",
+        "IMPORT_UPLOAD_DIR": os.path.join(directory, "imports"),
+        "CACHE_BACKEND": "memory",
+        "MESSAGE_HUB_BACKEND": "memory",
+        "DB_ECHO": "false",
+        **settings,
+    })
+
+    from Database.connection import Base
+    event.listen(Base.metadata, "before_create", _sqlite_date_defaults)
+    return directory
+
+
+def reset_database():
+    """
+    Empty every table and the in-process caches, then redo the startup preparation
+    """
+    import main
+    from Database.connection import Base, engine
+    from Utils.auth import user_cache
+    from Utils.cache import response_cache, stats_cache
+
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != "schema_migrations":
+                connection.execute(table.delete())
+    user_cache.clear()
+    response_cache.clear()
+    stats_cache.clear()
+    main._prepare_database()
@@ -0,0 +1,167 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy.orm import Session as DbSession
+from Models.Absence import Absence
+from Models.Classes import Classes
+from Models.Department import Department
+from Models.Message import Message
+from Models.Ratrapage import Ratrapage
+from Models.Rooms import Room
+from Models.Session import Session
+from Models.Subjects import Subjects
+from Models.Users import Users
+from Utils.jwt_handler import create_token
+
+
+def auth_header(user_id: int, role: str) -> dict:
+    token = create_token({"sub": str(user_id), "role": role, "verification": "true"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def query_count(response) -> int:
+    return int(response.headers["x-db-query-count"])
+
+
+def add_user(db: DbSession, role: str, **fields) -> Users:
+    user = Users(role=role, isverified="true", **fields)
+    db.add(user)
+    db.flush()
+    user.first_name = user.first_name or role.title()
+    user.last_name = user.last_name or str(user.user_id)
+    user.email = user.email or f"{role}{user.user_id}@scholaria.test"
+    return user
+
+
+def add_students(db: DbSession, class_: Classes, count: int) -> list[Users]:
+    students = [
+        Users(
+            first_name=f"Student{index}",
+            last_name=class_.name,
+            email=f"student{index}.{class_.id}@scholaria.test",
+            role="student",
+            isverified="true",
+            class_name=class_.name,
+            class_id=class_.id
+        )
+        for index in range(count)
+    ]
+    db.add_all(students)
+    db.commit()
+    return students
+
+
+def seed_department(db: DbSession) -> SimpleNamespace:
+    """
+    A department with its director, an administrator, one class, one professor
+    teaching one subject, one room and a Monday 08:00-10:00 session
+    """
+    admin = add_user(db, "administrative")
+    director = add_user(db, "director")
+    professor = add_user(db, "professor")
+    department = Department(dept_name="Computer Science", description="CS", director_id=director.user_id)
+    db.add(department)
+    db.flush()
+    class_ = Classes(name="CS1", capacity=500, department_id=department.id)
+    subject = Subjects(subject_name="Algorithms", multiplier=2, professor_id=professor.user_id, department_id=department.id)
+    room = Room(room_name="A101", department_id=department.id, type="lab")
+    db.add_all([class_, subject, room])
+    db.flush()
+    session = Session(
+        class_id=class_.id,
+        room_id=room.room_id,
+        professor_id=professor.user_id,
+        subject_id=subject.subject_id,
+        start_time="08:00",
+        end_time="10:00",
+        day="Monday"
+    )
+    db.add(session)
+    db.commit()
+    return SimpleNamespace(
+        admin=admin,
+        director=director,
+        professor=professor,
+        department=department,
+        class_=class_,
+        subject=subject,
+        room=room,
+        session=session
+    )
+
+
+def add_ratrapages(db: DbSession, department: SimpleNamespace, count: int, first_day: date = date(2026, 1, 5)) -> list[Ratrapage]:
+    """
+    count make-up sessions of the department's class, one per day from first_day
+    """
+    ratrapages = []
+    for offset in range(count):
+        day = first_day + timedelta(days=offset)
+        ratrapages.append(Ratrapage(
+            user_id=department.professor.user_id,
+            class_id=department.class_.id,
+            room_id=department.room.room_id,
+            department_id=department.department.id,
+            subject_id=department.subject.subject_id,
+            date=day,
+            start_time=datetime.combine(day, datetime.min.time()).replace(hour=14),
+            end_time=datetime.combine(day, datetime.min.time()).replace(hour=16),
+            description="Make-up session"
+        ))
+    db.add_all(ratrapages)
+    db.commit()
+    return ratrapages
+
+
+def add_subjects(db: DbSession, department: SimpleNamespace, count: int) -> list[Subjects]:
+    """
+    count more subjects in the department, each taught by its own professor
+    """
+    subjects = []
+    for index in range(count):
+        professor = add_user(db, "professor")
+        subjects.append(Subjects(
+            subject_name=f"Subject {index}",
+            multiplier=1 + index % 3,
+            professor_id=professor.user_id,
+            department_id=department.department.id
+        ))
+    db.add_all(subjects)
+    db.commit()
+    return subjects
+
+
+def add_absences(db: DbSession, session: Session, students: list[Users], days: list[date], absent_every: int = 4) -> list[Absence]:
+    """
+    A roll call of session for every day in days, marking every absent_every-th record absent
+    """
+    absences = [
+        Absence(
+            user_id=student.user_id,
+            class_id=session.class_id,
+            session_id=session.session_id,
+            date=day,
+            is_absent=index % absent_every == 0
+        )
+        for day in days
+        for index, student in enumerate(students)
+    ]
+    db.add_all(absences)
+    db.commit()
+    return absences
+
+
+def add_messages(db: DbSession, sender: Users, receiver: Users, count: int) -> list[Message]:
+    low_id, high_id = sorted((sender.user_id, receiver.user_id))
+    messages = [
+        Message(
+            sender_id=sender.user_id,
+            receiver_id=receiver.user_id,
+            user_low_id=low_id,
+            user_high_id=high_id,
+            content=f"Message {index}"
+        )
+        for index in range(count)
+    ]
+    db.add_all(messages)
+    db.commit()
+    return messages
@@ -0,0 +1,91 @@
+from datetime import date
+import pytest
+from Models.Department import Department
+from Models.Rooms import Room
+from Models.Session import Session
+from tests.factories import add_ratrapages, auth_header
+
+
+@pytest.fixture
+def rooms(db, department):
+    """
+    A101 (lab, Monday 08:00-10:00) from the department fixture, a classroom
+    B202 busy on Wednesday until 10:10, and a classroom C303 in another department
+    """
+    other = Department(dept_name="Mathematics", description="Maths")
+    db.add(other)
+    db.flush()
+    classroom = Room(room_name="B202", department_id=department.department.id, type="classroom")
+    elsewhere = Room(room_name="C303", department_id=other.id, type="classroom")
+    db.add_all([classroom, elsewhere])
+    db.flush()
+    db.add(Session(
+        class_id=department.class_.id,
+        room_id=classroom.room_id,
+        professor_id=department.professor.user_id,
+        subject_id=department.subject.subject_id,
+        start_time="08:00",
+        end_time="10:10",
+        day="Wednesday"
+    ))
+    db.commit()
+    return other.id
+
+
+def available(client, department, **params) -> list[str]:
+    response = client.get("/rooms/available", params=params, headers=auth_header(department.admin.user_id, "administrative"))
+    assert response.status_code == 200, response.text
+    return [room["room_name"] for room in response.json()["rooms"]]
+
+
+def test_weekly_session_makes_the_room_unavailable(client, department, rooms):
+    assert available(client, department, day="Monday", start_time="09:00", end_time="09:30") == ["B202", "C303"]
+    # Projected onto a Monday date too
+    assert available(client, department, date="2026-01-05", start_time="07:00", end_time="08:15") == ["B202", "C303"]
+    assert available(client, department, day="Tuesday", start_time="09:00", end_time="09:30") == ["A101", "B202", "C303"]
+
+
+def test_ratrapage_makes_the_room_unavailable_on_its_date(client, db, department, rooms):
+    add_ratrapages(db, department, 1, first_day=date(2026, 1, 6))
+
+    assert available(client, department, date="2026-01-06", start_time="15:00", end_time="17:00") == ["B202", "C303"]
+    # Only on its date: not on the weekday in general, nor a week later
+    assert available(client, department, day="Tuesday", start_time="15:00", end_time="17:00") == ["A101", "B202", "C303"]
+    assert available(client, department, date="2026-01-13", start_time="15:00", end_time="17:00") == ["A101", "B202", "C303"]
+
+
+@pytest.mark.parametrize("start_time, end_time, b202_free", [
+    # B202 is busy until 10:10, so the whole 10:00-10:15 slot counts as used
+    ("10:10", "10:30", False),
+    ("10:05", "10:15", False),
+    ("10:15", "10:30", True),
+    # Ending exactly when the session starts leaves the room free
+    ("06:00", "08:00", True),
+])
+def test_partly_used_slot_counts_as_busy(client, department, rooms, start_time, end_time, b202_free):
+    rooms_free = available(client, department, day="Wednesday", start_time=start_time, end_time=end_time)
+
+    assert ("B202" in rooms_free) == b202_free
+
+
+def test_type_and_department_filters(client, department, rooms):
+    assert available(client, department, day="Friday", start_time="09:00", end_time="10:00", type="lab") == ["A101"]
+    assert available(client, department, day="Friday", start_time="09:00", end_time="10:00", type="classroom") == ["B202", "C303"]
+    assert available(client, department, day="Friday", start_time="09:00", end_time="10:00", department_id=rooms) == ["C303"]
+    assert available(
+        client, department, day="Friday", start_time="09:00", end_time="10:00",
+        department_id=department.department.id, type="classroom"
+    ) == ["B202"]
+
+
+@pytest.mark.parametrize("params", [
+    {"day": "Funday", "start_time": "09:00", "end_time": "10:00"},
+    {"day": "Monday", "start_time": "25:00", "end_time": "26:00"},
+    {"day": "Monday", "start_time": "9h", "end_time": "10:00"},
+    {"day": "Monday", "start_time": "10:00", "end_time": "09:00"},
+    {"start_time": "09:00", "end_time": "10:00"},
+])
+def test_invalid_day_or_time(client, department, params):
+    response = client.get("/rooms/available", params=params, headers=auth_header(department.admin.user_id, "administrative"))
+
+    assert response.status_code == 400
@@ -0,0 +1,121 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+from email import message_from_bytes
+import pytest
+from aiosmtpd.controller import Controller
+from Models.Email_outbox import Email_outbox
+from Utils.email_queue import REDACTED_BODY, EmailOutboxWorker, enqueue_email
+from Utils.email_sender import conf
+from tests.factories import add_students, auth_header
+
+
+class RecordingHandler:
+    """
+    aiosmtpd handler keeping every message it accepts, and refusing the given recipients
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.refused = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(message_from_bytes(envelope.content))
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(conf, "MAIL_PORT", port)
+    try:
+        yield handler
+    finally:
+        controller.stop()
+
+
+def deliver_outbox(db, timeout: float = 10):
+    """
+    Run a two-worker outbox until no row is waiting for its first attempt or in flight
+    """
+    async def run():
+        worker = EmailOutboxWorker(workers=2, batch_size=2, poll_interval=0.05)
+        await worker.start()
+        try:
+            deadline = asyncio.get_running_loop().time() + timeout
+            while asyncio.get_running_loop().time() < deadline:
+                db.expire_all()
+                waiting = db.query(Email_outbox).filter(
+                    (Email_outbox.status == "sending") | ((Email_outbox.status == "pending") & (Email_outbox.attempts == 0))
+                ).count()
+                if not waiting:
+                    return
+                await asyncio.sleep(0.05)
+            raise AssertionError("The outbox was not delivered in time")
+        finally:
+            await worker.stop()
+
+    asyncio.run(run())
+    db.expire_all()
+
+
+def test_roll_call_notifications_are_delivered_once(client, db, department, smtp_server):
+    students = add_students(db, department.class_, 6)
+    absent = [student.email for student in students[::2]]
+
+    response = client.post(
+        "/assign_absences/bulk",
+        headers=auth_header(department.professor.user_id, "professor"),
+        json={
+            "session_id": department.session.session_id,
+            "absences": [{"user_id": student.user_id, "is_absent": student.email in absent} for student in students]
+        }
+    )
+    assert response.status_code == 200
+    deliver_outbox(db)
+
+    assert sorted(message["To"] for message in smtp_server.messages) == sorted(absent)
+    assert all("Algorithms" in message.get_payload() for message in smtp_server.messages)
+    assert [(email.status, email.attempts) for email in db.query(Email_outbox)] == [("sent", 0)] * len(absent)
+
+
+def test_sensitive_body_is_redacted_after_delivery(db, smtp_server):
+    enqueue_email(db, "new.student@scholaria.example.com", "Your account", "<p>Password: s3cret</p>", sensitive=True)
+    enqueue_email(db, "other@scholaria.example.com", "Absence", "<p>You were absent</p>")
+    db.commit()
+    deliver_outbox(db)
+
+    delivered = {message["To"]: message.get_payload() for message in smtp_server.messages}
+    assert "s3cret" in delivered["new.student@scholaria.example.com"]
+    bodies = {email.recipient: email.body for email in db.query(Email_outbox)}
+    assert bodies == {
+        "new.student@scholaria.example.com": REDACTED_BODY,
+        "other@scholaria.example.com": "<p>You were absent</p>"
+    }
+
+
+def test_refused_email_is_retried_with_backoff(db, smtp_server):
+    smtp_server.refused.add("gone@scholaria.example.com")
+    enqueue_email(db, "gone@scholaria.example.com", "Absence", "<p>You were absent</p>")
+    enqueue_email(db, "here@scholaria.example.com", "Absence", "<p>You were absent</p>")
+    db.commit()
+    deliver_outbox(db)
+
+    assert [message["To"] for message in smtp_server.messages] == ["here@scholaria.example.com"]
+    refused = db.query(Email_outbox).filter(Email_outbox.recipient == "gone@scholaria.example.com").one()
+    assert (refused.status, refused.attempts) == ("pending", 1)
+    assert "550" in refused.last_error
+    next_attempt_at = refused.next_attempt_at.replace(tzinfo=refused.next_attempt_at.tzinfo or timezone.utc)
+    assert next_attempt_at > datetime.now(timezone.utc) + timedelta(seconds=20)
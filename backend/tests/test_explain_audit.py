@@ -0,0 +1,104 @@
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from Database.connection import engine
+from Database.explain_audit import audit, hot_queries
+from Models.Absence import Absence
+from Models.Demande import Demande
+from Models.Event_association import Event_association
+from Models.Events import Events
+from Models.Message import Message
+from Models.Subjects import Subjects
+from Utils.attendance_aggregates import rebuild_attendance_aggregates
+from tests.factories import add_ratrapages, add_students, add_user
+
+# Hot query -> index its plan must use
+EXPECTED_INDEXES = {
+    "class roster": "ix_users_class_id_role",
+    "role listing page": "ix_users_role_user_id",
+    "class attendance sheet": "ix_absence_session_class_user",
+    "bulk attendance check": "ix_absence_session_date",
+    "student absence history": "ix_absence_user_session",
+    "class timetable": "ix_session_class_professor",
+    "professor timetable": "ix_session_professor",
+    "room session conflicts": "ix_session_day_room_start",
+    "professor session conflicts": "ix_session_day_professor_start",
+    "class session conflicts": "ix_session_day_class_start",
+    "room make-up bookings": "ix_ratrapage_room_date",
+    "professor make-up sessions": "ix_ratrapage_user_date",
+    "department subjects": "ix_subjects_department_id",
+    "department rooms": "ix_rooms_department_id",
+    "department classes": "ix_classes_department_id",
+    "absence demands": "ix_demande_absence_id",
+    "event attendees": "ix_assoc_event_event_id",
+    "conversation page": "ix_messages_conversation_id",
+    "class attendance totals": "ix_attendance_aggregate_class_user",
+}
+
+
+@pytest.fixture
+def populated(db, department):
+    """
+    A row behind every value the hot queries sample
+    """
+    students = add_students(db, department.class_, 3)
+    absence = Absence(user_id=students[0].user_id, class_id=department.class_.id, session_id=department.session.session_id, date=date(2026, 1, 5))
+    event = Events(event_name="Open day", details="Campus tour", event_type="public")
+    db.add_all([absence, event])
+    db.flush()
+    peer = add_user(db, "student")
+    low_id, high_id = sorted((department.professor.user_id, peer.user_id))
+    db.add_all([
+        Demande(reason="Sick", document="note.pdf", absence_id=absence.id),
+        Event_association(user_id=students[0].user_id, event_id=event.event_id),
+        Message(sender_id=department.professor.user_id, receiver_id=peer.user_id, user_low_id=low_id, user_high_id=high_id, content="Hello"),
+    ])
+    db.commit()
+    add_ratrapages(db, department, 2)
+    rebuild_attendance_aggregates(db)
+    return department
+
+
+def _query_plan(connection, statement) -> str:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    return "\n".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def test_every_hot_query_has_an_expected_index():
+    with engine.connect() as connection:
+        assert set(hot_queries(connection)) - {"login by email"} == set(EXPECTED_INDEXES)
+
+
+def test_hot_queries_plan_no_full_scans(populated):
+    with engine.connect() as connection:
+        results = audit(connection, max_scan_rows=0)
+
+    assert [result for result in results if result["scans"]] == []
+
+
+@pytest.mark.parametrize("query, index", EXPECTED_INDEXES.items())
+def test_hot_query_uses_its_index(populated, query, index):
+    with engine.connect() as connection:
+        plan = _query_plan(connection, hot_queries(connection)[query])
+
+    assert index in plan
+
+
+def test_audit_fails_a_scan_once_the_index_is_gone(populated):
+    [index] = [index for index in Subjects.__table__.indexes if index.name == "ix_subjects_department_id"]
+    # A pooled connection would replay the EXPLAIN statements it prepared before the drop
+    fresh_engine = create_engine(engine.url, poolclass=NullPool)
+    with fresh_engine.connect() as connection:
+        index.drop(connection)
+        try:
+            results = {result["query"]: result for result in audit(connection, max_scan_rows=0)}
+        finally:
+            index.create(connection)
+            connection.commit()
+
+    assert results["department subjects"]["scans"] == [{"table": "subjects", "rows": 1}]
+    assert results["department subjects"]["failed"]
+    assert not results["department rooms"]["failed"]
+
+
@@ -0,0 +1,91 @@
+import pytest
+from tests.factories import add_messages, add_students, auth_header
+
+
+def fetch_user_pages(client, headers, page_size: int) -> list[list[int]]:
+    """
+    The user ids of every /fetch_all_users page, following X-Next-Cursor
+    """
+    pages, params = [], {"page_size": page_size}
+    while True:
+        response = client.get("/fetch_all_users", params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([user["user_id"] for user in response.json()])
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            return pages
+        params = {"page_size": page_size, "cursor": next_cursor}
+
+
+@pytest.mark.parametrize("students, page_size, page_lengths", [
+    # The department's admin, director and professor come first
+    (7, 4, [4, 4, 2]),
+    # A last page that is exactly full has no next cursor either
+    (5, 4, [4, 4]),
+    (0, 10, [3]),
+])
+def test_user_pages(client, db, department, students, page_size, page_lengths):
+    add_students(db, department.class_, students)
+
+    pages = fetch_user_pages(client, auth_header(department.admin.user_id, "administrative"), page_size)
+
+    assert [len(page) for page in pages] == page_lengths
+    ids = [user_id for page in pages for user_id in page]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids) == 3 + students
+
+
+def test_unpaged_users_keep_the_list_shape(client, db, department):
+    add_students(db, department.class_, 7)
+
+    response = client.get("/fetch_all_users", headers=auth_header(department.admin.user_id, "administrative"))
+
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    users = response.json()
+    assert [user["user_id"] for user in users] == sorted(user["user_id"] for user in users)
+    assert len(users) == 10
+    assert {"user_id", "email", "role", "verifed"} <= users[0].keys()
+
+
+@pytest.mark.parametrize("path", ["/fetch_all_users", "/fetch_messages", "/conversations/1"])
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJiZWZvcmUiOiAxfQ"])
+def test_invalid_cursor(client, department, path, cursor):
+    response = client.get(path, params={"cursor": cursor}, headers=auth_header(department.admin.user_id, "administrative"))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_message_pages_go_back_from_the_newest(client, db, department):
+    sent = [message.id for message in add_messages(db, department.professor, department.admin, 5)]
+    headers = auth_header(department.admin.user_id, "administrative")
+
+    first = client.get("/fetch_messages", params={"page_size": 3}, headers=headers).json()
+    last = client.get("/fetch_messages", params={"page_size": 3, "cursor": first["next_cursor"]}, headers=headers).json()
+
+    assert [message["id"] for message in first["messages"]] == sent[:1:-1]
+    assert [message["id"] for message in last["messages"]] == sent[1::-1]
+    assert last["next_cursor"] is None
+
+
+def test_unpaged_messages_keep_the_send_order(client, db, department):
+    sent = [message.id for message in add_messages(db, department.professor, department.admin, 5)]
+
+    response = client.get("/fetch_messages", headers=auth_header(department.admin.user_id, "administrative"))
+
+    body = response.json()
+    assert body.keys() == {"messages", "count", "next_cursor"}
+    assert body["count"] == 5 and body["next_cursor"] is None
+    assert [message["id"] for message in body["messages"]] == sent
+
+
+def test_conversation_last_page_has_no_cursor(client, db, department):
+    sent = [message.id for message in add_messages(db, department.professor, department.admin, 4)]
+    headers = auth_header(department.admin.user_id, "administrative")
+    path = f"/conversations/{department.professor.user_id}"
+
+    first = client.get(path, params={"page_size": 2}, headers=headers).json()
+    last = client.get(path, params={"page_size": 2, "cursor": first["next_cursor"]}, headers=headers).json()
+
+    assert [message["id"] for message in first["messages"] + last["messages"]] == sent[::-1]
+    assert last["next_cursor"] is None
@@ -0,0 +1,35 @@
+import pytest
+from tests.factories import add_ratrapages, auth_header, query_count
+
+
+@pytest.mark.parametrize("count", [1, 25])
+def test_class_ratrapages_query_count(client, db, department, count):
+    add_ratrapages(db, department, count)
+
+    response = client.get(
+        f"/fetch_ratrapages/{department.class_.id}",
+        headers=auth_header(department.admin.user_id, "administrative")
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) == count
+    # User, class, then the ratrapages joined to professor, room and subject
+    assert query_count(response) == 3
+
+
+@pytest.mark.parametrize("count", [1, 25])
+def test_professor_ratrapages_query_count(client, db, department, count):
+    add_ratrapages(db, department, count)
+
+    response = client.get(
+        "/fetch_ratrapages_for_professor",
+        headers=auth_header(department.professor.user_id, "professor")
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == count
+    assert body[0]["class_name"] == "CS1"
+    assert body[0]["department_name"] == "Computer Science"
+    # Professor, then the ratrapages joined to class, room, subject and department
+    assert query_count(response) == 2
@@ -0,0 +1,77 @@
+from datetime import date, datetime
+import pytest
+from Models.Classes import Classes
+from Models.Ratrapage import Ratrapage
+from Models.Rooms import Room
+from tests.factories import add_user, auth_header
+
+
+@pytest.fixture
+def second_room(db, department):
+    room = Room(room_name="A102", department_id=department.department.id, type="lab")
+    db.add(room)
+    db.commit()
+    return room
+
+
+def book_all_day(db, department, room: Room, day: date):
+    """
+    room taken 08:00-18:00 on day by another class and professor
+    """
+    professor = add_user(db, "professor")
+    other_class = Classes(name="CS2", capacity=30, department_id=department.department.id)
+    db.add(other_class)
+    db.flush()
+    db.add(Ratrapage(
+        user_id=professor.user_id,
+        class_id=other_class.id,
+        room_id=room.room_id,
+        department_id=department.department.id,
+        subject_id=department.subject.subject_id,
+        date=day,
+        start_time=datetime.combine(day, datetime.min.time()).replace(hour=8),
+        end_time=datetime.combine(day, datetime.min.time()).replace(hour=18)
+    ))
+    db.commit()
+
+
+def suggest(client, department, date_from: str, date_to: str, limit: int = 5) -> list[dict]:
+    response = client.get("/ratrapages/suggest", params={
+        "class_id": department.class_.id,
+        "professor_id": department.professor.user_id,
+        "subject_id": department.subject.subject_id,
+        "duration": 60,
+        "date_from": date_from,
+        "date_to": date_to,
+        "limit": limit
+    }, headers=auth_header(department.admin.user_id, "administrative"))
+    assert response.status_code == 200, response.text
+    return response.json()["suggestions"]
+
+
+def test_rooms_booked_by_ratrapages_are_not_suggested(client, db, department, second_room):
+    # 2026-01-06 is a Tuesday, free of the department's weekly session
+    for room in (department.room, second_room):
+        book_all_day(db, department, room, date(2026, 1, 6))
+
+    assert suggest(client, department, "2026-01-06", "2026-01-06") == []
+    assert {suggestion["date"] for suggestion in suggest(client, department, "2026-01-06", "2026-01-07")} == {"2026-01-07"}
+
+
+def test_the_free_room_is_suggested_and_accepted(client, db, department, second_room):
+    book_all_day(db, department, department.room, date(2026, 1, 6))
+
+    suggestions = suggest(client, department, "2026-01-06", "2026-01-06", limit=3)
+
+    assert [(suggestion["room_name"], suggestion["start_time"]) for suggestion in suggestions] == [
+        ("A102", "2026-01-06T08:00:00"),
+        ("A102", "2026-01-06T08:15:00"),
+        ("A102", "2026-01-06T08:30:00"),
+    ]
+    # A suggestion is a valid ratrapage as it is
+    response = client.post(
+        "/add_ratrappage",
+        json={key: value for key, value in suggestions[0].items() if key != "room_name"},
+        headers=auth_header(department.admin.user_id, "administrative")
+    )
+    assert response.status_code == 200, response.text
@@ -0,0 +1,37 @@
+import pytest
+from tests.factories import add_subjects, auth_header, query_count
+
+# Endpoint, role calling it, statements per request whatever the number of subjects
+SUBJECT_LISTINGS = [
+    ("/fetch_subjects_with_professors/{department_id}", "director", 2),
+    ("/fetch_subjects_with_professors/{department_id}", "administrative", 2),
+    ("/fetch_subject/{department_id}", "administrative", 2),
+    ("/fetch_classes_for_subject/{department_id}", "administrative", 2),
+]
+
+
+@pytest.mark.parametrize("count", [0, 20])
+@pytest.mark.parametrize("path, role, statements", SUBJECT_LISTINGS)
+def test_subject_listing_query_count(client, db, department, count, path, role, statements):
+    add_subjects(db, department, count)
+    caller = department.director if role == "director" else department.admin
+
+    response = client.get(
+        path.format(department_id=department.department.id),
+        headers=auth_header(caller.user_id, role)
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) == count + 1
+    assert query_count(response) == statements
+
+
+def test_subjects_with_professors_names_the_professor(client, db, department):
+    response = client.get(
+        f"/fetch_subjects_with_professors/{department.department.id}",
+        headers=auth_header(department.admin.user_id, "administrative")
+    )
+
+    [subject] = response.json()
+    professor = department.professor
+    assert subject["professor_name"] == f"{professor.first_name} {professor.last_name}"
@@ -0,0 +1,36 @@
+import os
+from Database.connection import SessionLocal
+from Models.Import_job import Import_job
+from Utils import user_import
+from Utils.user_import import run_user_import
+
+
+def test_unknown_job_is_skipped(capsys):
+    run_user_import("no-such-job")
+
+    assert "no-such-job skipped: no such job" in capsys.readouterr().out
+
+
+def test_job_deleted_during_import_keeps_the_original_error(db, department, tmp_path, monkeypatch, capsys):
+    upload = tmp_path / "users.csv"
+    upload.write_text("first_name,last_name,email,password_hashed,role\n")
+    db.add(Import_job(id="deleted-job", admin_id=department.admin.user_id, file_path=str(upload)))
+    db.commit()
+
+    def delete_job_then_fail(file_path):
+        other = SessionLocal()
+        try:
+            other.delete(other.get(Import_job, "deleted-job"))
+            other.commit()
+        finally:
+            other.close()
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(user_import, "count_csv_rows", delete_job_then_fail)
+
+    run_user_import("deleted-job")
+
+    out = capsys.readouterr().out
+    assert "User import deleted-job failed: disk on fire" in out
+    assert "deleted-job no longer exists" in out
+    assert os.path.exists(upload)
@@ -1,6 +1,7 @@
 'use client'
 
 import { useEffect, useState } from 'react'
+import { useConversation } from '../../lib/conversation'
 import Directive_navbar from '../components/directive_navbar'
 
 interface Student {
@@ -19,23 +20,13 @@ interface Message {
   timestamp: Date
 }
 
-interface BackendMessage {
-  id: number
-  sender_id: number
-  receiver_id: number
-  content: string
-  sent_at: string
-}
-
 export default function MessageDirector() {
   const [students, setStudents] = useState<Student[]>([])
   const [selectedStudent, setSelectedStudent] = useState<Student | null>(null)
-  const [messages, setMessages] = useState<Message[]>([])
   const [newMessage, setNewMessage] = useState('')
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const [currentUserId, setCurrentUserId] = useState<number | null>(null)
-  const [messagesLoading, setMessagesLoading] = useState(false)
   const [editingMessageId, setEditingMessageId] = useState<number | null>(null)
   const [editedContent, setEditedContent] = useState('')
   const [searchQuery, setSearchQuery] = useState('')
@@ -70,85 +61,16 @@ export default function MessageDirector() {
     fetchStudents()
   }, [])
 
-  const fetchMessagesForConversation = async () => {
-    if (!selectedStudent || !currentUserId) {
-      console.log('Cannot fetch: selectedStudent or currentUserId missing', { selectedStudent, currentUserId })
-      return
-    }
-    
-    try {
-      setMessagesLoading(true)
-      const token = localStorage.getItem('token')
-      console.log('Fetching messages for student:', selectedStudent.user_id, 'current user:', currentUserId)
-      
-      const response = await fetch('http://127.0.0.1:8000/fetch_messages', {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      })
-
-      if (!response.ok) {
-        const errorText = await response.text()
-        console.error('Response not ok:', response.status, errorText)
-        throw new Error('Failed to fetch messages')
-      }
-
-      const data = await response.json()
-      console.log('All messages from API:', data)
-      console.log('Current user ID type:', typeof currentUserId, 'value:', currentUserId)
-      console.log('Selected student ID type:', typeof selectedStudent.user_id, 'value:', selectedStudent.user_id)
-      
-      // Filter messages for the selected student conversation
-      // Convert IDs to numbers to ensure proper comparison
-      const currentUserIdNum = Number(currentUserId)
-      const studentIdNum = Number(selectedStudent.user_id)
-      
-      const conversationMessages = data.messages.filter((msg: BackendMessage) => {
-        const msgSenderId = Number(msg.sender_id)
-        const msgReceiverId = Number(msg.receiver_id)
-        
-        const isMatch = (msgSenderId === currentUserIdNum && msgReceiverId === studentIdNum) ||
-                       (msgSenderId === studentIdNum && msgReceiverId === currentUserIdNum)
-        
-        console.log(`Message ${msg.id}: sender=${msgSenderId}, receiver=${msgReceiverId}, matches=${isMatch}`)
-        return isMatch
-      })
-
-      console.log('Filtered conversation messages:', conversationMessages)
-
-      // Transform to display format
-      const displayMessages: Message[] = conversationMessages.map((msg: BackendMessage) => {
-        const msgSenderId = Number(msg.sender_id)
-        const sender = msgSenderId === currentUserIdNum ? 'director' : 'student'
-        console.log(`Message ${msg.id}: sender_id=${msgSenderId}, currentUser=${currentUserIdNum}, determined sender=${sender}`)
-        
-        return {
-          id: msg.id,
-          text: msg.content,
-          sender: sender,
-          timestamp: new Date(msg.sent_at)
-        }
-      })
-
-      console.log('Display messages:', displayMessages)
-      setMessages(displayMessages)
-    } catch (err) {
-      console.error('Error fetching messages:', err)
-      alert('Error loading messages. Check console for details.')
-    } finally {
-      setMessagesLoading(false)
-    }
-  }
-
-  useEffect(() => {
-    if (selectedStudent && currentUserId) {
-      fetchMessagesForConversation()
-      
-      // Poll for new messages every 3 seconds
-      const interval = setInterval(fetchMessagesForConversation, 3000)
-      return () => clearInterval(interval)
-    }
-  }, [selectedStudent, currentUserId])
+  // Latest page of the conversation, older pages load when the messages are scrolled to the top
+  const conversation = useConversation(selectedStudent && currentUserId ? selectedStudent.user_id : null)
+  const fetchMessagesForConversation = conversation.refresh
+  const messagesLoading = conversation.loading
+  const messages = conversation.messages.map((msg): Message => ({
+    id: msg.id,
+    text: msg.content,
+    sender: Number(msg.sender_id) === Number(currentUserId) ? 'director' : 'student',
+    timestamp: msg.sent_at ? new Date(msg.sent_at) : new Date()
+  }))
 
   const handleSelectStudent = (student: Student) => {
     setSelectedStudent(student)
@@ -207,8 +129,7 @@ export default function MessageDirector() {
         throw new Error('Failed to delete message')
       }
 
-      // Fetch messages immediately after deleting to update the conversation
-      await fetchMessagesForConversation()
+      conversation.removeMessage(messageId)
     } catch (err) {
       console.error('Error deleting message:', err)
       alert('Failed to delete message')
@@ -248,8 +169,7 @@ export default function MessageDirector() {
 
       setEditingMessageId(null)
       setEditedContent('')
-      // Fetch messages immediately after editing to update the conversation
-      await fetchMessagesForConversation()
+      conversation.replaceContent(messageId, editedContent)
     } catch (err) {
       console.error('Error editing message:', err)
       alert('Failed to edit message')
@@ -373,7 +293,18 @@ export default function MessageDirector() {
             </div>
 
             {/* Messages Area */}
-            <div className="flex-1 overflow-y-auto p-4 space-y-4 bg-gray-50">
+            <div ref={conversation.scrollRef} onScroll={conversation.handleScroll} className="flex-1 overflow-y-auto p-4 space-y-4 bg-gray-50">
+              {conversation.hasOlder && (
+                <div className="text-center">
+                  <button
+                    onClick={conversation.loadOlder}
+                    disabled={conversation.loadingOlder}
+                    className="text-sm text-gray-500 hover:text-gray-700 disabled:text-gray-300"
+                  >
+                    {conversation.loadingOlder ? 'Loading older messages...' : 'Load older messages'}
+                  </button>
+                </div>
+              )}
               {messagesLoading && messages.length === 0 ? (
                 <div className="text-center text-gray-500 mt-10">
                   Loading messages...
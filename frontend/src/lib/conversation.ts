@@ -0,0 +1,144 @@
+import { UIEvent, useCallback, useEffect, useLayoutEffect, useRef, useState } from 'react'
+
+const API_URL = 'http://127.0.0.1:8000'
+const PAGE_SIZE = 50
+const POLL_INTERVAL_MS = 3000
+// Older messages are fetched once the list is scrolled this close to its top
+const LOAD_OLDER_THRESHOLD_PX = 40
+
+export interface ConversationMessage {
+  id: number
+  sender_id: number
+  receiver_id: number
+  content: string
+  sent_at: string | null
+  is_read: boolean
+}
+
+interface ConversationPage {
+  messages: ConversationMessage[]
+  next_cursor: string | null
+}
+
+// GET /conversations/{peer_id} pages newest first, next_cursor points to older messages
+async function fetchConversationPage(peerId: number, cursor: string | null): Promise<ConversationPage> {
+  const params = new URLSearchParams({ page_size: String(PAGE_SIZE) })
+  if (cursor) params.set('cursor', cursor)
+  const response = await fetch(`${API_URL}/conversations/${peerId}?${params}`, {
+    headers: {
+      'Authorization': `Bearer ${localStorage.getItem('token')}`
+    }
+  })
+
+  if (!response.ok) {
+    const errorText = await response.text()
+    console.error('Response not ok:', response.status, errorText)
+    throw new Error('Failed to fetch messages')
+  }
+
+  return response.json()
+}
+
+/**
+ * The messages exchanged with peerId, oldest first.
+ *
+ * Only the latest page is loaded and polled. Older pages are fetched by
+ * loadOlder(), which handleScroll calls when the list behind scrollRef
+ * reaches its top; the scroll position is kept while they are prepended.
+ */
+export function useConversation(peerId: number | null) {
+  const [messages, setMessages] = useState<ConversationMessage[]>([])
+  const [olderCursor, setOlderCursor] = useState<string | null>(null)
+  const [loading, setLoading] = useState(false)
+  const [loadingOlder, setLoadingOlder] = useState(false)
+  const scrollRef = useRef<HTMLDivElement>(null)
+  const scrollHeightBeforeOlder = useRef<number | null>(null)
+  // Responses for a conversation that is no longer selected are dropped
+  const currentPeerId = useRef(peerId)
+
+  const refresh = useCallback(async () => {
+    if (peerId === null) return
+    try {
+      const page = await fetchConversationPage(peerId, null)
+      if (currentPeerId.current !== peerId) return
+      const latest = [...page.messages].reverse()
+      // The latest page replaces what it covers, the older pages already loaded are kept
+      setMessages(loaded => latest.length === 0 ? [] : [...loaded.filter(message => message.id < latest[0].id), ...latest])
+    } catch (err) {
+      console.error('Error fetching messages:', err)
+    }
+  }, [peerId])
+
+  useEffect(() => {
+    currentPeerId.current = peerId
+    setMessages([])
+    setOlderCursor(null)
+    if (peerId === null) return
+
+    setLoading(true)
+    fetchConversationPage(peerId, null)
+      .then(page => {
+        if (currentPeerId.current !== peerId) return
+        setMessages([...page.messages].reverse())
+        setOlderCursor(page.next_cursor)
+      })
+      .catch(err => console.error('Error fetching messages:', err))
+      .finally(() => {
+        if (currentPeerId.current === peerId) setLoading(false)
+      })
+
+    // Poll for new messages every 3 seconds
+    const interval = setInterval(refresh, POLL_INTERVAL_MS)
+    return () => clearInterval(interval)
+  }, [peerId, refresh])
+
+  const loadOlder = useCallback(async () => {
+    if (peerId === null || olderCursor === null || loadingOlder) return
+    setLoadingOlder(true)
+    try {
+      const page = await fetchConversationPage(peerId, olderCursor)
+      if (currentPeerId.current !== peerId) return
+      scrollHeightBeforeOlder.current = scrollRef.current?.scrollHeight ?? null
+      setMessages(loaded => [...[...page.messages].reverse(), ...loaded])
+      setOlderCursor(page.next_cursor)
+    } catch (err) {
+      console.error('Error fetching older messages:', err)
+    } finally {
+      setLoadingOlder(false)
+    }
+  }, [peerId, olderCursor, loadingOlder])
+
+  // Keep the messages on screen where they were once older ones are prepended above them
+  useLayoutEffect(() => {
+    const container = scrollRef.current
+    if (container && scrollHeightBeforeOlder.current !== null) {
+      container.scrollTop += container.scrollHeight - scrollHeightBeforeOlder.current
+      scrollHeightBeforeOlder.current = null
+    }
+  }, [messages])
+
+  const handleScroll = (event: UIEvent<HTMLDivElement>) => {
+    if (event.currentTarget.scrollTop <= LOAD_OLDER_THRESHOLD_PX) loadOlder()
+  }
+
+  const removeMessage = (messageId: number) => {
+    setMessages(loaded => loaded.filter(message => message.id !== messageId))
+  }
+
+  const replaceContent = (messageId: number, content: string) => {
+    setMessages(loaded => loaded.map(message => message.id === messageId ? { ...message, content } : message))
+  }
+
+  return {
+    messages,
+    loading,
+    hasOlder: olderCursor !== null,
+    loadingOlder,
+    loadOlder,
+    refresh,
+    handleScroll,
+    scrollRef,
+    removeMessage,
+    replaceContent
+  }
+}